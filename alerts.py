@@ -0,0 +1,273 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+from bisect import bisect_left, bisect_right, insort
+
+from price_sources import normalize_symbol
+
+logger = logging.getLogger(__name__)
+fired_logger = logging.getLogger("alerts.fired")  # Left out of log dedup, a rule may rightly fire again within a minute
+
+PORTFOLIO_KEY = "PORTFOLIO"
+METRICS = ("price", "profit", "net_value")
+KINDS = ("above", "below", "move")
+
+
+class AlertRule:
+    """A level on one metric of one symbol (or of the whole portfolio for net_value).
+
+    "above" and "below" fire when the value crosses the threshold in that direction and re-arm when it
+    crosses back. "move" fires when the value moves threshold percent away from its reference and then
+    re-anchors on the value it fired at.
+    """
+
+    def __init__(self, rule_id, metric, key, kind, threshold, reference=None):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown alert metric: {metric}")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown alert kind: {kind}")
+        self.rule_id = rule_id
+        self.metric = metric
+        self.key = PORTFOLIO_KEY if metric == "net_value" else normalize_symbol(key)
+        self.kind = kind
+        self.threshold = float(threshold)
+        self.reference = reference
+
+    def levels(self):
+        """[(direction, level)] this rule currently listens on; move rules need a reference first."""
+        if self.kind == "above":
+            return [("up", self.threshold)]
+        if self.kind == "below":
+            return [("down", self.threshold)]
+        if self.reference is None:
+            return []
+        offset = abs(self.reference) * self.threshold / 100
+        return [("up", self.reference + offset), ("down", self.reference - offset)]
+
+    def describe(self):
+        target = "net value" if self.metric == "net_value" else f"{self.key} {self.metric}"
+        if self.kind == "move":
+            return f"{target} moved {self.threshold:g}%"
+        return f"{target} {self.kind} {self.threshold:,.8g}"
+
+    def to_dict(self):
+        return {"id": self.rule_id, "metric": self.metric, "key": self.key, "kind": self.kind,
+                "threshold": self.threshold, "reference": self.reference}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["metric"], data.get("key", PORTFOLIO_KEY), data["kind"], data["threshold"],
+                   data.get("reference"))
+
+    @classmethod
+    def parse(cls, rule_id, text):
+        """Parse "BTCUSDT price above 70000", "ETHUSDT profit below -200", "SOLUSDT price move 5%" or
+        "net_value below 1000"."""
+        words = text.replace("%", "").split()
+        if len(words) == 3 and words[0].lower() == "net_value":
+            words = [PORTFOLIO_KEY] + words
+        if len(words) != 4:
+            raise ValueError("Expected: <symbol> <price|profit> <above|below|move> <value>")
+        key, metric, kind, threshold = words
+        try:
+            threshold = float(threshold.replace(",", "").replace("$", ""))
+        except ValueError:
+            raise ValueError(f"Not a number: {threshold}")
+        return cls(rule_id, metric.lower(), key, kind.lower(), threshold)
+
+
+class Alert:
+    def __init__(self, rule, value, previous, timestamp):
+        self.rule = rule
+        self.value = value
+        self.previous = previous
+        self.timestamp = timestamp
+
+    @property
+    def message(self):
+        return f"{self.rule.describe()} (now {self.value:,.8g}, was {self.previous:,.8g})"
+
+
+class AlertEngine:
+    """Evaluates alert rules incrementally on every tick.
+
+    Levels are kept per (metric, key) in two sorted lists, one for upward and one for downward
+    crossings. A tick only bisects the span between the previous and the new value, so the cost
+    depends on how many levels were crossed, not on how many rules exist.
+    """
+
+    def __init__(self, sinks=(), clock=time.time):
+        self.sinks = list(sinks)
+        self.clock = clock
+        self.rules = {}  # rule id -> AlertRule
+        self.up_levels = {}  # (metric, key) -> sorted [(level, rule id)]
+        self.down_levels = {}
+        self.last_values = {}  # (metric, key) -> last value seen
+        self.watched = {}  # (metric, key) -> number of rules on it, including move rules not anchored yet
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def add_rule(self, rule):
+        with self.lock:
+            self.rules[rule.rule_id] = rule
+            self.next_id = max(self.next_id, rule.rule_id + 1)
+            series = (rule.metric, rule.key)
+            self.watched[series] = self.watched.get(series, 0) + 1
+            self._index(rule)
+        return rule
+
+    def create_rule(self, text):
+        return self.add_rule(AlertRule.parse(self.next_id, text))
+
+    def remove_rule(self, rule_id):
+        with self.lock:
+            rule = self.rules.pop(rule_id, None)
+            if rule is not None:
+                self._unindex(rule)
+                series = (rule.metric, rule.key)
+                self.watched[series] -= 1
+                if not self.watched[series]:
+                    del self.watched[series]
+
+    def load_rules(self, rule_dicts):
+        with self.lock:
+            self.rules.clear()
+            self.up_levels.clear()
+            self.down_levels.clear()
+            self.last_values.clear()
+            self.watched.clear()
+        for data in rule_dicts or []:
+            try:
+                self.add_rule(AlertRule.from_dict(data))
+            except (KeyError, ValueError) as e:
+                logger.warning("Skipping invalid alert rule %s: %s", data, e)
+
+    def rule_dicts(self):
+        return [rule.to_dict() for rule in self.rules.values()]
+
+    def _index(self, rule):
+        for direction, level in rule.levels():
+            levels = self.up_levels if direction == "up" else self.down_levels
+            insort(levels.setdefault((rule.metric, rule.key), []), (level, rule.rule_id))
+
+    def _unindex(self, rule):
+        for direction, level in rule.levels():
+            levels = (self.up_levels if direction == "up" else self.down_levels).get((rule.metric, rule.key), [])
+            position = bisect_left(levels, (level, rule.rule_id))
+            if position < len(levels) and levels[position] == (level, rule.rule_id):
+                del levels[position]
+
+    def watched_keys(self, metric):
+        return {key for rule_metric, key in list(self.watched) if rule_metric == metric}
+
+    def on_tick(self, metric, key, value, timestamp=None):
+        """Feed one new value; returns the alerts it fired."""
+        if value is None:
+            return []
+        timestamp = self.clock() if timestamp is None else timestamp
+        series = (metric, key)
+        fired = []
+        with self.lock:
+            previous = self.last_values.get(series)
+            self.last_values[series] = value
+            if previous is None:
+                self._anchor_moves(series, value)
+                return []
+            if value > previous:
+                levels = self.up_levels.get(series, [])
+                crossed = levels[bisect_right(levels, (previous, float("inf"))):bisect_right(levels, (value, float("inf")))]
+            elif value < previous:
+                levels = self.down_levels.get(series, [])
+                crossed = levels[bisect_left(levels, (value, float("-inf"))):bisect_left(levels, (previous, float("-inf")))]
+            else:
+                crossed = []
+            for _, rule_id in crossed:
+                rule = self.rules[rule_id]
+                fired.append(Alert(rule, value, previous, timestamp))
+                if rule.kind == "move":
+                    self._unindex(rule)
+                    rule.reference = value
+                    self._index(rule)
+        for alert in fired:
+            self.dispatch(alert)
+        return fired
+
+    def _anchor_moves(self, series, value):
+        for rule in self.rules.values():
+            if rule.kind == "move" and rule.reference is None and (rule.metric, rule.key) == series:
+                rule.reference = value
+                self._index(rule)
+
+    def on_valuation(self, valuation, entry_data, price_cache, deposited_value=0.0):
+        """Evaluate price, profit and net value rules after a fetch sweep."""
+        timestamp = self.clock()
+        for symbol in self.watched_keys("price"):
+            self.on_tick("price", symbol, price_cache.price(symbol), timestamp)
+        profit_keys = self.watched_keys("profit")
+        if profit_keys:
+            profits = {}
+            for row in valuation.counted.nonzero()[0].tolist():
+                symbol = normalize_symbol(str(entry_data.get(f"row_{row}_name", "")))
+                if symbol in profit_keys:
+                    profits[symbol] = profits.get(symbol, 0.0) + float(valuation.profit[row])
+            for symbol, profit in profits.items():
+                self.on_tick("profit", symbol, profit, timestamp)
+        if deposited_value is not None and self.watched_keys("net_value"):
+            self.on_tick("net_value", PORTFOLIO_KEY, valuation.total_profit - deposited_value, timestamp)
+
+    def dispatch(self, alert):
+        for sink in self.sinks:
+            try:
+                sink.send(alert)
+            except Exception as e:
+                logger.error("Alert sink %s failed: %s", type(sink).__name__, e)
+
+
+class LogSink:
+    def send(self, alert):
+        fired_logger.warning("ALERT %s: %s", time.strftime('%H:%M:%S', time.localtime(alert.timestamp)), alert.message,
+                             extra={"rule": alert.rule.rule_id, "value": alert.value, "previous": alert.previous})
+
+
+class DesktopSink:
+    """Shows each alert as a small always-on-top toast in the corner of the Tk window."""
+
+    def __init__(self, root, duration_ms=8000):
+        self.root = root
+        self.duration_ms = duration_ms
+
+    def send(self, alert):
+        self.root.after(0, self._show, alert.message)
+
+    def _show(self, message):
+        import tkinter as tk
+        toast = tk.Toplevel(self.root)
+        toast.overrideredirect(True)
+        toast.attributes("-topmost", True)
+        tk.Label(toast, text=message, font=("Arial", 18, "bold"), bg="gold", fg="black", padx=20, pady=12).pack()
+        toast.update_idletasks()
+        x = self.root.winfo_screenwidth() - toast.winfo_width() - 20
+        toast.geometry(f"+{x}+20")
+        toast.after(self.duration_ms, toast.destroy)
+
+
+class WebhookSink:
+    """POSTs each alert as JSON, e.g. to a local relay standing in for a chat or push service."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        payload = json.dumps({"rule": alert.rule.to_dict(), "message": alert.message, "value": alert.value,
+                              "previous": alert.previous, "timestamp": alert.timestamp}).encode("utf-8")
+        threading.Thread(target=self._post, args=(payload,), daemon=True).start()
+
+    def _post(self, payload):
+        request = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            logger.error("Alert webhook %s failed: %s", self.url, e)
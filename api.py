@@ -1,45 +1,91 @@
+import logging
+import time
+
 from binance.client import Client
 
+from price_sources import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
 
 class BinanceAPI:
-    def __init__(self, api_key, api_secret):
+    def __init__(self, api_key, api_secret, client=None, exchange_info_max_age=3600, request_timeout=10):
         self.api_key = api_key
         self.api_secret = api_secret
         # Initialize the Binance client using the API key and secret
-        self.client = Client(self.api_key, self.api_secret)
+        # request_timeout bounds every HTTP call, so a call abandoned by the fetch loop still ends
+        self.client = client if client is not None else Client(self.api_key, self.api_secret,
+                                                               requests_params={"timeout": request_timeout})
+        self.exchange_info_max_age = exchange_info_max_age
+        self._exchange_info = None
+        self._exchange_info_time = 0.0
+        self._symbols = set()
+
+    def get_exchange_info(self, force=False):
+        """Return exchange info, downloading it at most once per exchange_info_max_age seconds."""
+        now = time.time()
+        if force or self._exchange_info is None or now - self._exchange_info_time > self.exchange_info_max_age:
+            self.load_exchange_info(self.client.get_exchange_info(), now)
+        return self._exchange_info
+
+    def load_exchange_info(self, exchange_info, timestamp=None):
+        """Adopt exchange info downloaded elsewhere (e.g. by the price engine process)."""
+        self._exchange_info = exchange_info
+        self._exchange_info_time = time.time() if timestamp is None else timestamp
+        self._symbols = {symbol['symbol'] for symbol in exchange_info.get('symbols', [])}
+
+    def known_symbols(self):
+        """Symbols from the last downloaded exchange info, empty until it has been fetched."""
+        return self._symbols
+
+    def get_all_prices(self):
+        """Fetch the latest price of every symbol in a single request."""
+        tickers = self.client.get_all_tickers()
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker['symbol']] = float(ticker['price'])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return prices
+
+    def get_klines(self, symbol, interval, start_time, end_time=None, limit=1000):
+        """One page of up to `limit` raw klines opening at or after start_time (milliseconds)."""
+        params = {"symbol": symbol, "interval": interval, "startTime": int(start_time), "limit": limit}
+        if end_time is not None:
+            params["endTime"] = int(end_time)
+        return self.client.get_klines(**params)
 
     def is_valid_coin_pair(self, coin_pair):
         """Check if the coin pair is valid on Binance."""
         try:
-            exchange_info = self.client.get_exchange_info()  # Fetch exchange info
-            symbols = exchange_info.get('symbols', [])
-            print(f"Total available symbols: {len(symbols)}")  # Debugging the number of available symbols
+            self.get_exchange_info()  # Served from cache when fresh
+            logger.debug("Total available symbols: %d", len(self._symbols))
 
             coin_pair = coin_pair.upper()  # Ensure the coin pair is in uppercase
-            is_valid = any(symbol['symbol'] == coin_pair for symbol in symbols)
+            is_valid = coin_pair in self._symbols
 
             if not is_valid:
-                print(f"Coin pair {coin_pair} not found in available symbols.")  # Debug print
+                logger.debug("Coin pair %s not found in available symbols", coin_pair)
             else:
-                print(f"Coin pair {coin_pair} is valid.")  # Debug print
+                logger.debug("Coin pair %s is valid", coin_pair)
 
             return is_valid
 
         except Exception as e:
-            print(f"Error while checking coin pair {coin_pair}: {e}")
+            logger.error("Error while checking coin pair %s: %s", coin_pair, e)
             return False
 
     def get_coin_price(self, coin_pair):
         """Get the current price for the given coin pair from Binance."""
         try:
-            coin_pair = coin_pair.upper().replace(" ", "")  # Ensure the symbol is in uppercase
+            coin_pair = normalize_symbol(coin_pair)
             price = self.client.get_symbol_ticker(symbol=coin_pair)
             if price and 'price' in price:
                 return float(price['price'])
             else:
-                print(f"Error fetching price for {coin_pair}")
+                logger.warning("No price returned for %s", coin_pair)
                 return None
         except Exception as e:
-            print(f"Error while fetching price for {coin_pair}: {e}")
+            logger.error("Error while fetching price for %s: %s", coin_pair, e)
             return None
-
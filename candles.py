@@ -0,0 +1,251 @@
+import logging
+import os
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Interval label -> length in milliseconds, for the Binance intervals the app backfills
+INTERVALS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+DAY_MS = 86_400_000
+# (interval, lookback in days) backfilled for every tracked symbol at startup
+DEFAULT_BACKFILL = (("1h", 30), ("1d", 365))
+
+
+class CandleSeries:
+    """Klines of one symbol at one interval as parallel columns, oldest first.
+
+    On disk every column is its own append-only file of packed values; new candles are appended to
+    each file, so a later start writes only what it fetched. A crash between column writes leaves
+    columns of different lengths, which load() cuts back to the shortest.
+    """
+
+    COLUMNS = (("open_time", "q"), ("open", "d"), ("high", "d"), ("low", "d"), ("close", "d"), ("volume", "d"))
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.columns = {name: array(typecode) for name, typecode in self.COLUMNS}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.columns["open_time"])
+
+    @property
+    def first_open(self):
+        return self.columns["open_time"][0] if len(self) else None
+
+    @property
+    def last_open(self):
+        return self.columns["open_time"][-1] if len(self) else None
+
+    def load(self):
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        loaded = {}
+        for name, typecode in self.COLUMNS:
+            column = array(typecode)
+            path = self._path(name)
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    data = file.read()
+                column.frombytes(data[:len(data) - len(data) % column.itemsize])
+            loaded[name] = column
+        count = min(len(column) for column in loaded.values())
+        for column in loaded.values():
+            del column[count:]
+        with self.lock:
+            self.columns = loaded
+
+    def append(self, rows):
+        """Add (open_time, open, high, low, close, volume) rows newer than the last candle; returns the count."""
+        with self.lock:
+            last_open = self.last_open
+            rows = [row for row in rows if last_open is None or row[0] > last_open]
+            if not rows:
+                return 0
+            rows.sort(key=lambda row: row[0])
+            new_columns = {name: array(typecode, (row[index] for row in rows))
+                           for index, (name, typecode) in enumerate(self.COLUMNS)}
+            for name, column in new_columns.items():
+                self.columns[name].extend(column)
+            if self.directory is not None:
+                os.makedirs(self.directory, exist_ok=True)
+                for name, column in new_columns.items():
+                    with open(self._path(name), "ab") as file:
+                        column.tofile(file)
+            return len(rows)
+
+    def prepend(self, rows):
+        """Add candles older than the first one, e.g. after the lookback grew; rewrites the column files."""
+        with self.lock:
+            first_open = self.first_open
+            rows = sorted((row for row in rows if first_open is None or row[0] < first_open), key=lambda row: row[0])
+            if not rows:
+                return 0
+            for index, (name, typecode) in enumerate(self.COLUMNS):
+                self.columns[name] = array(typecode, (row[index] for row in rows)) + self.columns[name]
+            if self.directory is not None:
+                os.makedirs(self.directory, exist_ok=True)
+                for name, column in self.columns.items():
+                    temporary_path = self._path(name) + ".tmp"
+                    with open(temporary_path, "wb") as file:
+                        column.tofile(file)
+                    os.replace(temporary_path, self._path(name))
+            return len(rows)
+
+    def range(self, start=None, end=None):
+        """NumPy copies of every column for candles opening in [start, end] (milliseconds)."""
+        with self.lock:
+            open_times = self.columns["open_time"]
+            first = 0 if start is None else bisect_left(open_times, start)
+            last = len(open_times) if end is None else bisect_right(open_times, end)
+            return {name: np.frombuffer(column, dtype=np.int64 if typecode == "q" else np.float64)[first:last].copy()
+                    for (name, typecode), column in zip(self.COLUMNS, self.columns.values())}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+
+def parse_kline(kline):
+    """(open_time, open, high, low, close, volume) from one raw Binance kline."""
+    return int(kline[0]), float(kline[1]), float(kline[2]), float(kline[3]), float(kline[4]), float(kline[5])
+
+
+class CandleService:
+    """Backfills klines for tracked symbols into a local CandleSeries cache and serves them from memory.
+
+    A backfill asks only for what the cache is missing: candles after the last stored one, plus older
+    ones when the requested lookback reaches further back than the cache. Each gap is fetched in pages
+    of page_limit klines, one bulk request per page. Only closed candles are stored, so the last
+    cached candle never has to be corrected.
+    """
+
+    def __init__(self, binance_api, directory=None, clock=time.time, page_limit=1000):
+        self.binance_api = binance_api
+        self.directory = directory
+        self.clock = clock
+        self.page_limit = page_limit
+        self.series = {}  # (symbol, interval) -> CandleSeries
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def get_series(self, symbol, interval):
+        key = (symbol.upper(), interval)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                directory = os.path.join(self.directory, f"{key[0]}@{interval}") if self.directory else None
+                series = self.series[key] = CandleSeries(directory)
+                series.load()
+            return series
+
+    def candles(self, symbol, interval, start=None, end=None):
+        """Cached candles as NumPy columns (see CandleSeries.range); start and end are in seconds."""
+        return self.get_series(symbol, interval).range(
+            None if start is None else int(start * 1000), None if end is None else int(end * 1000)
+        )
+
+    def closes(self, symbol, interval, start=None, end=None):
+        candles = self.candles(symbol, interval, start, end)
+        return candles["open_time"] // 1000, candles["close"]
+
+    def missing_ranges(self, series, interval, lookback_days):
+        """[(start, end)] in milliseconds of closed candles the cache doesn't have yet."""
+        step = INTERVALS[interval]
+        now = int(self.clock() * 1000)
+        last_closed = now - now % step - step  # Open time of the newest closed candle
+        start = last_closed - int(lookback_days * DAY_MS)
+        start -= start % step
+        if not len(series):
+            return [(start, last_closed)]
+        ranges = []
+        if start < series.first_open:
+            ranges.append((start, series.first_open - step))
+        if series.last_open < last_closed:
+            ranges.append((series.last_open + step, last_closed))
+        return ranges
+
+    def fetch_range(self, symbol, interval, start, end):
+        """Every kline opening in [start, end], fetched page by page."""
+        step = INTERVALS[interval]
+        rows = []
+        while start <= end:
+            page = self.binance_api.get_klines(symbol, interval, start, end, self.page_limit)
+            self.requests += 1
+            if not page:
+                break
+            rows.extend(parse_kline(kline) for kline in page)
+            start = int(page[-1][0]) + step
+            if len(page) < self.page_limit:
+                break
+        return rows
+
+    def backfill(self, symbol, interval, lookback_days):
+        """Bring one symbol's cache up to date; returns the number of new candles."""
+        series = self.get_series(symbol, interval)
+        added = 0
+        for start, end in self.missing_ranges(series, interval, lookback_days):
+            rows = self.fetch_range(symbol.upper(), interval, start, end)
+            if series.first_open is not None and end < series.first_open:
+                added += series.prepend(rows)
+            else:
+                added += series.append(rows)
+        return added
+
+    def backfill_all(self, symbols, plan=DEFAULT_BACKFILL):
+        """Backfill every symbol for every (interval, lookback) in plan; failures are reported per symbol."""
+        added = 0
+        for symbol in sorted(symbols):
+            for interval, lookback_days in plan:
+                try:
+                    added += self.backfill(symbol, interval, lookback_days)
+                except Exception as e:
+                    logger.warning("Error backfilling %s %s candles: %s", symbol, interval, e)
+                    break  # Most likely an unlisted symbol, skip its other intervals
+        return added
+
+    def backfill_async(self, symbols_source, plan=DEFAULT_BACKFILL):
+        """Run backfill_all in a daemon thread; symbols_source is called there to get the symbols."""
+        thread = threading.Thread(target=lambda: self.backfill_all(symbols_source(), plan), daemon=True)
+        thread.start()
+        return thread
+
+
+class FakeKlineClient:
+    """Stands in for the Binance client's get_klines with a deterministic random walk per symbol.
+
+    Honours startTime, endTime and limit like the exchange, never returns the still-open candle, and
+    counts calls so tests can check that a warm cache only asks for the missing ranges.
+    """
+
+    def __init__(self, clock=time.time, delay=0.0):
+        self.clock = clock
+        self.delay = delay
+        self.calls = 0
+
+    def price_at(self, symbol, interval, open_time):
+        walk = random.Random(f"{symbol}:{interval}:{open_time}")
+        return 100.0 * (1 + 0.5 * random.Random(symbol).random()) * (1 + walk.uniform(-0.01, 0.01))
+
+    def get_klines(self, symbol, interval, startTime, endTime=None, limit=500):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        step = INTERVALS[interval]
+        now = int(self.clock() * 1000)
+        end = now - now % step - step if endTime is None else min(endTime, now - now % step - step)
+        open_time = startTime + (-startTime) % step
+        klines = []
+        while open_time <= end and len(klines) < min(limit, 1000):
+            close = self.price_at(symbol, interval, open_time)
+            open_price = self.price_at(symbol, interval, open_time - step)
+            klines.append([open_time, f"{open_price:.8f}", f"{max(open_price, close) * 1.002:.8f}",
+                           f"{min(open_price, close) * 0.998:.8f}", f"{close:.8f}", "12.5", open_time + step - 1,
+                           "1250.0", 10, "6.0", "600.0", "0"])
+            open_time += step
+        return klines
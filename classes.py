@@ -1,9 +1,13 @@
 import json
+import logging
 import os
 import tkinter as tk
 from functools import partial
 import threading
 import queue
+from number_format import format_money, format_threshold, format_trimmed, parse_number
+
+logger = logging.getLogger(__name__)
 
 
 class UIHelper:
@@ -87,29 +91,21 @@ class EntryCreator:
         entry.place(x=int(col * col_width_middle), y=int(self.config.strip_height + row * entry_height),
                     width=int(col_width_middle), height=int(entry_height))
         entry.column_idx = column_id
-        saved_value = entry_data.get(f"row_{row}_column_{column_id}", "")
-        saved_value_cleaned = ""
-        if saved_value:
-            saved_value_cleaned = saved_value.replace("$", "").replace(",", "")
-            if column_id == 6:
-                try:
-                    saved_value = f"${float(saved_value_cleaned):,.2f}"
-                except ValueError:
-                    saved_value = "$0"
-            elif column_id == 7:
-                try:
-                    saved_value = f"{float(saved_value_cleaned):,.2f}"
-                except ValueError:
-                    saved_value = "0"
-        if saved_value_cleaned:
-            saved_value = DecimalHelper(self.config).apply_decimal_threshold(float(saved_value_cleaned))
-        if column_id == 6 and not saved_value.startswith("$"):
-            saved_value = "$" + saved_value
-        entry.insert(0, saved_value)
+        entry.insert(0, self.saved_entry_text(entry_data, row, column_id))
         entries.append(entry)
         entry.bind("<Return>", partial(on_enter, row=row, column=column_id))
         entry.bind("<FocusOut>", lambda event: self.enforce_dollar_sign(entry))  # Enforce dollar sign
         UIHelper.adjust_font_color(entry, row_color)
+        return entry
+
+    @staticmethod
+    def saved_entry_text(entry_data, row, column_id):
+        saved_value = entry_data.get(f"row_{row}_column_{column_id}", "")
+        if saved_value:
+            saved_value = format_threshold(parse_number(saved_value))
+        if column_id == 6 and not saved_value.startswith("$"):
+            saved_value = "$" + saved_value
+        return saved_value
 
     def enforce_dollar_sign(self, entry):
         text = entry.get()
@@ -125,33 +121,15 @@ class EntryCreator:
     def format_dollar_entry(self, entry, text):
         if not text.startswith("$"):
             text = "$" + text
-        raw_text = text[1:].replace(",", "")
-        try:
-            if raw_text.replace(".", "", 1).isdigit():
-                value = float(raw_text)
-                formatted_text = f"${value:,.8f}".rstrip('0').rstrip('.')
-                if value == 0:
-                    formatted_text = "$0"
-            else:
-                formatted_text = "$"
-        except ValueError:
-            formatted_text = "$"
+        value = parse_number(text, None)
+        formatted_text = format_trimmed(value, symbol="$") if value is not None and value >= 0 else "$"
 
         entry.delete(0, tk.END)
         entry.insert(0, formatted_text)
 
     def format_general_entry(self, entry, text):
-        raw_text = text.replace(",", "")
-        try:
-            if raw_text.replace(".", "", 1).isdigit():
-                value = float(raw_text)
-                formatted_text = f"{value:,.8f}".rstrip('0').rstrip('.')
-                if formatted_text == "":
-                    formatted_text = "0"
-            else:
-                formatted_text = ""
-        except ValueError:
-            formatted_text = ""
+        value = parse_number(text, None)
+        formatted_text = (format_trimmed(value) or "0") if value is not None and value >= 0 else ""
 
         entry.delete(0, tk.END)
         entry.insert(0, formatted_text)
@@ -160,16 +138,9 @@ class EntryCreator:
 class DecimalHelper:
     def __init__(self, config):
         self.config = config
-        self.thresholds = [
-            (1, 2), (0.01, 3), (0.001, 4), (0.0001, 5), (0.00001, 6), (0.000001, 7), (0.0000001, 8)
-        ]
 
     def apply_decimal_threshold(self, value):
-        for threshold_value, decimals in self.thresholds:
-            if value >= threshold_value:
-                formatted_value = f"{value:,.{decimals}f}"
-                return formatted_value.rstrip('0').rstrip('.')
-        return f"{value:,.8f}".rstrip('0').rstrip('.')
+        return format_threshold(value)
 
 
 class UIGridHelper:
@@ -179,6 +150,7 @@ class UIGridHelper:
         self.on_focus_in = on_focus_in
         self.on_focus_out = on_focus_out
         self.existing_labels = {}  # Initialize the dictionary to store existing labels
+        self.flash_after_ids = {}  # (row, col) -> pending after id restoring the label after a flash
 
     def create_default_label(self, row, col, row_color):
         entry_height = (self.config.screen_height - 2 * self.config.strip_height) / 30
@@ -221,24 +193,31 @@ class UIGridHelper:
         else:
             previous_price = self.config.entry_data_middle.get(f"row_{row}_price", None)
             if previous_price is not None:
-                try:
-                    current_price = float(text[1:])
-                    previous_price_value = previous_price if isinstance(previous_price, float) else float(previous_price[1:])
-                    if current_price > previous_price_value:
-                        flash_color = "green"
-                    elif current_price < previous_price_value:
-                        flash_color = "red"
-                    else:
-                        flash_color = "yellow"
-                except ValueError:
+                current_price = parse_number(text, None)
+                previous_price_value = parse_number(previous_price, None)
+                if current_price is None or previous_price_value is None:
+                    flash_color = "yellow"
+                elif current_price > previous_price_value:
+                    flash_color = "green"
+                elif current_price < previous_price_value:
+                    flash_color = "red"
+                else:
                     flash_color = "yellow"
             else:
                 flash_color = "yellow"
+        # One pending restore per label: a newer flash replaces it instead of queueing another closure
+        pending_id = self.flash_after_ids.pop((row, col), None)
+        if pending_id is not None:
+            self.root.after_cancel(pending_id)
         original_color = price_label.cget("bg")
         price_label.config(bg=flash_color)
-        self.root.after(75, lambda: price_label.config(bg=original_color))
+        self.flash_after_ids[(row, col)] = self.root.after(75, self.end_flash, row, col, price_label, original_color)
         self.config.entry_data_middle[f"row_{row}_price"] = text
 
+    def end_flash(self, row, col, price_label, original_color):
+        self.flash_after_ids.pop((row, col), None)
+        price_label.config(bg=original_color)
+
     def create_wallet_entry_middle(self, row, col, entry_data_middle, wallet_colors, entries, on_enter_middle,
                                    on_focus_out):
         # Original entry creation logic
@@ -269,6 +248,7 @@ class UIGridHelper:
 
         # Adjust font color based on background
         UIHelper.adjust_font_color(entry, color)
+        return entry
 
 
 class ButtonHandler:
@@ -281,12 +261,25 @@ class ButtonHandler:
         self.strip_height = strip_height
         self.price_fetcher = price_fetcher
         self.grid_manager = grid_manager
+        self.gmt_view = None
+        self.exit_callbacks = []  # Run once on exit, after the fetch thread is told to stop
         self.root.after(100, self.process_queue)
 
+    def add_exit_callback(self, callback):
+        self.exit_callbacks.append(callback)
+
+    def set_gmt_view(self, gmt_view):
+        self.gmt_view = gmt_view
+
     def stop_all_threads(self):
-        print("Stopping all threads...")
+        logger.info("Stopping all threads")
         if self.price_fetcher:
             self.price_fetcher.stop_fetching_prices()
+        for callback in self.exit_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error during shutdown in %s: %s", callback, e)
 
     def on_enter(self, event, button):
         button.config(bg="#cc3333", fg="white")
@@ -301,7 +294,7 @@ class ButtonHandler:
         button.config(bg="#4d94ff", fg="white")
 
     def exit_program(self):
-        print("Exit button clicked, stopping threads...")
+        logger.info("Exit button clicked, stopping threads")
         self.stop_all_threads()
         # Small after delay or immediate cleanup:
         self.root.after(200, self.cleanup)
@@ -324,17 +317,14 @@ class ButtonHandler:
         self.root.after(100, self.process_queue)
 
     def gmt_mode(self):
-        """Switch to GMT mode after stopping all ongoing processes."""
-        print("Switching to GMT mode, stopping ongoing processes...")
-        self.stop_all_threads()  # Stop any ongoing threads or processes
-        self.root.after(200, self.cleanup_gmt_mode)
-
-    def cleanup_gmt_mode(self):
-        """Clean up resources and transition to GMT mode."""
-        for widget in self.root.winfo_children():
-            widget.place_forget()  # Clear existing widgets
-        self.create_exit_button(self.screen_width, self.screen_height,
-                                self.column_width_bottom, self.strip_height)
+        """Show the prebuilt GMT view; price fetching keeps running underneath."""
+        if self.gmt_view is not None:
+            self.gmt_view.show()
+
+    def dashboard_mode(self):
+        """Hide the GMT view and reveal the dashboard again."""
+        if self.gmt_view is not None:
+            self.gmt_view.hide()
 
     def on_deposited_keyrelease(self, event, entry_widget):
         text = entry_widget.get()
@@ -380,17 +370,25 @@ class ButtonHandler:
 
 
 class DataHandler:
+    DERIVED_KEY_SUFFIXES = ("_widget", "_price", "_profit")  # Rebuilt at runtime, never saved
+
     def __init__(self, api_key=None, api_secret=None):
         self.api_key = api_key
         self.api_secret = api_secret
         self.middle_grid_file_path = r"C:\Users\lette\PycharmProjects\IndoVaultTrippleGrid\middle_grid_data.json"
         self.bottom_grid_file_path = r"C:\Users\lette\PycharmProjects\IndoVaultTrippleGrid\bottom_grid_data.json"
+        self.vaults_dir = os.path.join(os.path.dirname(self.middle_grid_file_path), "vaults")
         if self.api_key and self.api_secret:
             from api import BinanceAPI
             self.binance_api = BinanceAPI(api_key=self.api_key, api_secret=self.api_secret)
         else:
             self.binance_api = None
 
+    def set_file_paths(self, middle_grid_file_path, bottom_grid_file_path):
+        """Point loads and saves at another vault's files."""
+        self.middle_grid_file_path = middle_grid_file_path
+        self.bottom_grid_file_path = bottom_grid_file_path
+
     def load_data(self, grid_type='middle'):
         file_path = self.middle_grid_file_path if grid_type == 'middle' else self.bottom_grid_file_path
         if not os.path.exists(file_path):
@@ -402,18 +400,27 @@ class DataHandler:
         except Exception:
             return {}
 
+    @staticmethod
+    def persistable(entry_data):
+        """Entry data without widget references and values derived from prices on every sweep."""
+        return {key: value for key, value in entry_data.items()
+                if not isinstance(value, tk.Entry) and not key.endswith(DataHandler.DERIVED_KEY_SUFFIXES)}
+
     def save_data(self, entry_data, grid_type='middle'):
         file_path = self.middle_grid_file_path if grid_type == 'middle' else self.bottom_grid_file_path
-        cleaned_data = {key: value for key, value in entry_data.items() if not isinstance(value, tk.Entry)}
+        cleaned_data = self.persistable(entry_data)
 
         for key, value in cleaned_data.items():
             if "column_6" in key:
                 if isinstance(value, str) and not value.startswith("$"):
                     cleaned_data[key] = f"${value}"
 
+        # Written beside the target and swapped in, so a bulk import lands whole or not at all
+        temporary_path = file_path + ".tmp"
         try:
-            with open(file_path, "w", encoding="utf-8") as file:
+            with open(temporary_path, "w", encoding="utf-8") as file:
                 json.dump(cleaned_data, file, ensure_ascii=False, indent=4)
+            os.replace(temporary_path, file_path)
         except Exception:
             pass
 
@@ -434,11 +441,7 @@ class DataHandler:
                         entries[row][col].insert(0, f"DEPOSITED ${value}")
 
                     elif col == 7:
-                        try:
-                            value = float(value.replace(",", "")) if isinstance(value, str) else float(value)
-                            formatted_value = f"{value:,.0f}"
-                        except ValueError:
-                            formatted_value = "0"
+                        formatted_value = format_money(parse_number(value), symbol="", decimals=0)
                         entries[row][col].delete(0, tk.END)
                         entries[row][col].insert(0, formatted_value)
 
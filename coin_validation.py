@@ -0,0 +1,85 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from price_sources import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+PENDING_TEXT = "Checking..."
+INVALID_TEXT = "Invalid coin pair"
+NO_PRICE_TEXT = "Error fetching price"
+
+
+class CoinValidator:
+    """Checks a newly entered coin pair and looks up its first price off the Tk thread.
+
+    validate() returns at once after showing a pending cell. When the symbol is already known and
+    priced (cached exchange info and the shared price cache) the answer is painted straight away
+    without a thread. Otherwise the exchange-info check and the ticker request run on a small pool
+    and the result is handed back through root.after. Every edit bumps the row's generation, so a
+    newer edit cancels a check that hasn't started yet and drops the answer of one already running.
+    """
+
+    def __init__(self, root, binance_api, price_cache, max_workers=2):
+        self.root = root
+        self.binance_api = binance_api
+        self.price_cache = price_cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coin-check")
+        self.generations = {}  # row -> generation of the latest edit
+        self.pending = {}  # row -> future of the check in flight
+        self.lock = threading.Lock()
+
+    def validate(self, row, coin_pair, on_result):
+        """Check coin_pair for row; on_result(row, symbol, valid, price) runs on the Tk thread if still current."""
+        symbol = normalize_symbol(coin_pair)
+        with self.lock:
+            generation = self.generations.get(row, 0) + 1
+            self.generations[row] = generation
+            previous = self.pending.pop(row, None)
+        if previous is not None:
+            previous.cancel()  # Only succeeds while it is still queued; a running one is dropped on arrival
+        if not symbol:
+            on_result(row, symbol, False, None)
+            return None
+        known_symbols = self.binance_api.known_symbols()
+        cached_price = self.price_cache.price(symbol)
+        if symbol in known_symbols and cached_price is not None:
+            on_result(row, symbol, True, cached_price)
+            return None
+        future = self.executor.submit(self.check, symbol)
+        with self.lock:
+            self.pending[row] = future
+        future.add_done_callback(lambda done: self.deliver(row, generation, symbol, done, on_result))
+        return future
+
+    def check(self, symbol):
+        """(valid, price) from the exchange; runs on the pool."""
+        if not self.binance_api.is_valid_coin_pair(symbol):
+            return False, None
+        price = self.price_cache.price(symbol)
+        if price is None:
+            price = self.binance_api.get_coin_price(symbol)
+            if price is not None:
+                self.price_cache.update({symbol: price})
+        return True, price
+
+    def deliver(self, row, generation, symbol, future, on_result):
+        if future.cancelled():
+            return
+        try:
+            valid, price = future.result()
+        except Exception as e:
+            logger.error("Error checking coin pair %s: %s", symbol, e)
+            valid, price = False, None
+        self.root.after(0, self.apply, row, generation, symbol, valid, price, on_result)
+
+    def apply(self, row, generation, symbol, valid, price, on_result):
+        with self.lock:
+            if self.generations.get(row) != generation:
+                return  # The cell was edited again since this check started
+            self.pending.pop(row, None)
+        on_result(row, symbol, valid, price)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
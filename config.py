@@ -14,7 +14,8 @@ class Config:
                  entry_data_bottom: dict,
                  data_handler=None,
                  focus_handler=None,
-                 button_handler=None):
+                 button_handler=None,
+                 currency_prefix="$"):
         # Initialize configuration data
         self.root = root
         self.screen_width = screen_width
@@ -29,6 +30,7 @@ class Config:
         self.data_handler = data_handler
         self.focus_handler = focus_handler
         self.button_handler = button_handler
+        self.currency_prefix = currency_prefix  # Of the reporting currency, for balances, profit and net value
 
         # Validate the configuration
         self.validate()
@@ -0,0 +1,143 @@
+from collections import deque
+
+from price_sources import normalize_symbol
+
+
+class CurrencyGraph:
+    """Converts amounts between assets by walking the trading pairs listed in exchange info.
+
+    Every symbol is an edge between its base and quote asset. Conversion paths are found with a
+    breadth-first search and memoized, so only the rates along a path are looked up on each call.
+    Rates come from the same bulk ticker fetch that prices the grid.
+    """
+
+    # Liquid hubs are tried first so paths go through deep markets where possible
+    HUB_ASSETS = ("USDT", "BTC", "ETH", "BNB", "FDUSD", "USDC")
+
+    CURRENCY_PREFIXES = {
+        "USD": "$", "USDT": "$", "USDC": "$", "FDUSD": "$", "BUSD": "$",
+        "EUR": "€", "IDR": "Rp", "GBP": "£", "JPY": "¥",
+    }
+
+    def __init__(self):
+        self.pairs = {}  # symbol -> (base, quote)
+        self.edges = {}  # asset -> set of neighbouring assets
+        self.rates = {}  # (base, quote) -> price of one base in quote
+        self.path_cache = {}
+        self._exchange_info = None
+
+    def load_exchange_info(self, exchange_info):
+        """Build the edges from exchange info; a no-op when the same info was already loaded."""
+        if exchange_info is None or exchange_info is self._exchange_info:
+            return
+        self._exchange_info = exchange_info
+        for symbol in exchange_info.get('symbols', []):
+            if symbol.get('status', 'TRADING') != 'TRADING':
+                continue
+            base, quote = symbol.get('baseAsset'), symbol.get('quoteAsset')
+            if base and quote:
+                self.add_pair(symbol['symbol'], base, quote)
+
+    def add_pair(self, symbol, base, quote):
+        if self.pairs.get(symbol) == (base, quote):
+            return
+        self.pairs[symbol] = (base, quote)
+        self.edges.setdefault(base, set()).add(quote)
+        self.edges.setdefault(quote, set()).add(base)
+        self.path_cache.clear()  # Topology changed, memoized paths may no longer be shortest
+
+    def set_rate(self, base, quote, rate):
+        """Register a manual rate, e.g. a fiat rate that is not listed on the exchange."""
+        if quote not in self.edges.get(base, ()):
+            self.edges.setdefault(base, set()).add(quote)
+            self.edges.setdefault(quote, set()).add(base)
+            self.path_cache.clear()
+        self.rates[(base, quote)] = rate
+
+    def update_prices(self, prices):
+        """Refresh edge rates from a {symbol: price} mapping."""
+        for symbol, price in prices.items():
+            pair = self.pairs.get(symbol)
+            if pair is not None and price:
+                self.rates[pair] = price
+
+    def split_symbol(self, symbol):
+        """Return (base, quote) for a symbol, or None when it is not a known pair."""
+        return self.pairs.get(normalize_symbol(symbol))
+
+    def quote_asset(self, symbol):
+        pair = self.split_symbol(symbol)
+        return pair[1] if pair else None
+
+    def find_path(self, source, target):
+        """Return the list of assets from source to target, or None if they are not connected."""
+        key = (source, target)
+        if key in self.path_cache:
+            return self.path_cache[key]
+        path = self._search(source, target)
+        self.path_cache[key] = path
+        return path
+
+    def _search(self, source, target):
+        if source == target:
+            return [source]
+        if source not in self.edges or target not in self.edges:
+            return None
+        previous = {source: None}
+        pending = deque([source])
+        while pending:
+            asset = pending.popleft()
+            for neighbour in self._ordered_neighbours(asset):
+                if neighbour in previous:
+                    continue
+                previous[neighbour] = asset
+                if neighbour == target:
+                    path = [target]
+                    while previous[path[-1]] is not None:
+                        path.append(previous[path[-1]])
+                    return path[::-1]
+                pending.append(neighbour)
+        return None
+
+    def _ordered_neighbours(self, asset):
+        neighbours = self.edges.get(asset, ())
+        hubs = [hub for hub in self.HUB_ASSETS if hub in neighbours]
+        return hubs + sorted(neighbours.difference(hubs))
+
+    def rate(self, source, target):
+        """Price of one unit of source expressed in target, or None when no rate is available."""
+        path = self.find_path(source, target)
+        if path is None:
+            return None
+        rate = 1.0
+        for asset, next_asset in zip(path, path[1:]):
+            if (asset, next_asset) in self.rates:
+                rate *= self.rates[(asset, next_asset)]
+            elif (next_asset, asset) in self.rates:
+                rate /= self.rates[(next_asset, asset)]
+            else:
+                return None
+        return rate
+
+    def convert(self, amount, source, target):
+        rate = self.rate(source, target)
+        return amount * rate if rate is not None else None
+
+    @classmethod
+    def currency_prefix(cls, asset):
+        prefix = cls.CURRENCY_PREFIXES.get(asset)
+        return prefix if prefix is not None else f"{asset} "
+
+    @staticmethod
+    def parse_fiat_rates(text):
+        """Parse "IDR=16250,EUR=0.92" (units per USDT) into {"IDR": 16250.0, "EUR": 0.92}."""
+        rates = {}
+        for item in (text or "").split(","):
+            if "=" not in item:
+                continue
+            asset, value = item.split("=", 1)
+            try:
+                rates[asset.strip().upper()] = float(value)
+            except ValueError:
+                continue
+        return rates
@@ -0,0 +1,260 @@
+import hashlib
+import html
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from number_format import format_money, format_price, format_trimmed, parse_number
+from price_sources import normalize_symbol
+
+KEEPALIVE_SECONDS = 15.0
+
+PAGE_SCRIPT = """
+<script>
+const source = new EventSource("/events");
+source.addEventListener("snapshot", event => {
+  const snapshot = JSON.parse(event.data);
+  document.getElementById("grid").innerHTML = snapshot.html;
+});
+</script>
+"""
+
+
+def _number(value):
+    """Float for JSON, None for NaN or missing values."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class DashboardSnapshot:
+    """One serialized view of the grid: JSON, HTML and the server-sent event, each encoded once."""
+
+    def __init__(self, version, data, currency_prefix="$"):
+        self.version = version
+        self.data = data
+        table = self.render_table(data, currency_prefix)
+        self.json = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.html = self.render_page(table).encode("utf-8")
+        self.etags = {"json": self.make_etag(self.json), "html": self.make_etag(self.html)}
+        event_data = json.dumps({"version": version, "data": data, "html": table}, separators=(",", ":"))
+        self.event = f"id: {version}\nevent: snapshot\ndata: {event_data}\n\n".encode("utf-8")
+
+    @staticmethod
+    def make_etag(body):
+        return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+    @staticmethod
+    def render_table(data, prefix):
+        def money(value):
+            return "" if value is None else format_money(value, prefix)
+
+        def quote_money(value):
+            # Price, invested and break even stay in the pair's quote asset, shown with "$" like the grid
+            return "" if value is None else format_money(value)
+
+        lines = ["<table><tr><th>Coin</th><th>Wallet</th><th>Price</th><th>Holdings</th><th>Invested</th>"
+                 "<th>Break even</th><th>Balance</th><th>Profit</th></tr>"]
+        for row in data["rows"]:
+            price = row["price"]
+            profit_class = "up" if (row["profit"] or 0) >= 0 else "down"
+            lines.append(
+                f"<tr><td>{html.escape(row['symbol'])}</td><td>{html.escape(row['wallet'])}</td>"
+                f"<td>{'' if price is None else '$' + (format_price(price) or format_trimmed(price))}</td>"
+                f"<td>{format_trimmed(row['holdings'])}</td><td>{quote_money(row['invested'])}</td>"
+                f"<td>{quote_money(row['break_even'])}</td><td>{money(row['balance'])}</td>"
+                f"<td class='{profit_class}'>{money(row['profit'])}</td></tr>"
+            )
+        totals = data["totals"]
+        lines.append("</table>")
+        lines.append(
+            f"<p>Balance {money(totals['balance'])} &middot; Invested {money(totals['invested'])} &middot; "
+            f"Profit {money(totals['profit'])} &middot; Deposited {money(totals['deposited'])} &middot; "
+            f"<b>Net value {money(totals['net_value'])}</b></p>"
+        )
+        updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(data["timestamp"]))
+        lines.append(f"<p class='updated'>Updated {updated}</p>")
+        return "".join(lines)
+
+    @staticmethod
+    def render_page(table):
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            "<meta name='viewport' content='width=device-width, initial-scale=1'><title>Crypto Tracker</title>"
+            "<style>body{font-family:Helvetica,sans-serif;background:lavender}table{border-collapse:collapse}"
+            "td,th{padding:4px 10px;text-align:right}td:first-child,td:nth-child(2){text-align:left}"
+            ".up{color:green}.down{color:red}.updated{color:grey}</style></head>"
+            f"<body><div id='grid'>{table}</div>{PAGE_SCRIPT}</body></html>"
+        )
+
+
+class Dashboard:
+    """Read-only localhost view of the portfolio over HTTP.
+
+    publish() is called once per valuation from the fetch thread: it builds the snapshot, serializes it
+    and wakes the server-sent event streams. Requests only ever copy those pre-encoded bytes, so each
+    extra browser costs a socket write per update and never another API call. GET / and
+    /snapshot.json answer 304 when the client's If-None-Match still matches.
+    """
+
+    def __init__(self, address=("127.0.0.1", 8765), currency_prefix="$", max_clients=32,
+                 keepalive=KEEPALIVE_SECONDS):
+        self.address = address
+        self.currency_prefix = currency_prefix
+        self.max_clients = max_clients
+        self.keepalive = keepalive
+        self.snapshot = DashboardSnapshot(0, self.empty_data(), currency_prefix)
+        self.condition = threading.Condition()
+        self.clients = 0
+        self.running = False
+        self.server = None
+
+    @staticmethod
+    def empty_data():
+        totals = dict.fromkeys(("balance", "invested", "profit", "deposited", "net_value"))
+        return {"timestamp": time.time(), "rows": [], "totals": totals}
+
+    def start(self):
+        # A subclass per server, so the handler finds this dashboard without a global
+        Handler = type("Handler", (DashboardRequestHandler,), {"dashboard": self})
+        self.server = ThreadingHTTPServer(self.address, Handler)
+        self.server.daemon_threads = True
+        self.running = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2] if self.server is not None else self.address
+        return f"http://{host}:{port}/"
+
+    def build_data(self, valuation, entry_data, price_cache, deposited_value=0.0):
+        rows = []
+        for row in range(len(valuation.balance)):
+            symbol = normalize_symbol(str(entry_data.get(f"row_{row}_name", "")))
+            if not symbol:
+                continue
+            rows.append({
+                "row": row,
+                "symbol": symbol,
+                "wallet": str(entry_data.get(f"row_{row}_column_8_middle", "")).strip().upper(),
+                "price": _number(price_cache.price(symbol)) if price_cache is not None else None,
+                "holdings": parse_number(entry_data.get(f"row_{row}_holdings", 0)),
+                "invested": parse_number(entry_data.get(f"row_{row}_invested", 0)),
+                "break_even": _number(valuation.break_even[row]),
+                "balance": _number(valuation.balance[row]),
+                "profit": _number(valuation.profit[row]),
+            })
+        totals = {
+            "balance": _number(valuation.total_balance),
+            "invested": _number(valuation.total_invested),
+            "profit": _number(valuation.total_profit),
+            "deposited": deposited_value,  # In the reporting currency, None while it has no rate
+            "net_value": _number(valuation.total_profit - deposited_value) if deposited_value is not None else None,
+        }
+        return {"timestamp": time.time(), "rows": rows, "totals": totals}
+
+    def publish(self, valuation, entry_data, price_cache=None, deposited_value=0.0):
+        data = self.build_data(valuation, entry_data, price_cache, deposited_value)
+        with self.condition:
+            version = self.snapshot.version + 1
+        snapshot = DashboardSnapshot(version, data, self.currency_prefix)
+        with self.condition:
+            self.snapshot = snapshot
+            self.condition.notify_all()
+
+    def wait_for_update(self, seen_version):
+        """Latest snapshot once it is newer than seen_version, None on keepalive timeout or shutdown."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.snapshot.version > seen_version or not self.running,
+                                    self.keepalive)
+            if not self.running or self.snapshot.version <= seen_version:
+                return None
+            return self.snapshot
+
+    def acquire_client(self):
+        with self.condition:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def release_client(self):
+        with self.condition:
+            self.clients -= 1
+
+
+class DashboardRequestHandler(BaseHTTPRequestHandler):
+    dashboard = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/index.html"):
+            self.send_snapshot("html", "text/html; charset=utf-8")
+        elif path == "/snapshot.json":
+            self.send_snapshot("json", "application/json")
+        elif path == "/events":
+            self.stream_events()
+        else:
+            self.send_error(404)
+
+    def send_snapshot(self, attribute, content_type):
+        snapshot = self.dashboard.snapshot
+        etag = snapshot.etags[attribute]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = getattr(snapshot, attribute)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        dashboard = self.dashboard
+        if not dashboard.acquire_client():
+            self.send_error(503, "Too many dashboard clients")
+            return
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            snapshot = dashboard.snapshot
+            self.wfile.write(snapshot.event)
+            self.wfile.flush()
+            seen_version = snapshot.version
+            while dashboard.running:
+                snapshot = dashboard.wait_for_update(seen_version)
+                if snapshot is None:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(snapshot.event)
+                    seen_version = snapshot.version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Browser tab closed
+        finally:
+            dashboard.release_client()
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass  # One line per request would flood the console with every SSE reconnect
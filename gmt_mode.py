@@ -0,0 +1,78 @@
+import time
+import tkinter as tk
+
+from classes import UIHelper
+
+
+class GMTModeView:
+    """Full-screen GMT clock laid over the dashboard.
+
+    The frame is built once at startup and only placed or forgotten when the mode changes, so the
+    dashboard widgets, the price fetcher and the data model keep running underneath.
+    """
+
+    def __init__(self, root, screen_width, screen_height, strip_height, on_back, on_exit, summary_source=None):
+        self.root = root
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.strip_height = strip_height
+        self.summary_source = summary_source  # Callable returning the text shown under the clock
+        self.visible = False
+        self._tick_id = None
+
+        self.frame = tk.Frame(root, bg="black")
+        self.time_label = tk.Label(self.frame, text="", font=("Arial", 160, "bold"), bg="black", fg="white",
+                                   anchor="center")
+        self.time_label.place(x=0, y=strip_height, width=screen_width, height=(screen_height - 2 * strip_height) // 2)
+        self.date_label = tk.Label(self.frame, text="", font=("Arial", 40), bg="black", fg="lavender",
+                                   anchor="center")
+        self.date_label.place(x=0, y=strip_height + (screen_height - 2 * strip_height) // 2,
+                              width=screen_width, height=strip_height)
+        self.summary_label = tk.Label(self.frame, text="", font=("Arial", 35), bg="purple", fg="white",
+                                      anchor="center", bd=2, relief="solid")
+        self.summary_label.place(x=0, y=screen_height - strip_height, width=2 * screen_width / 4, height=strip_height)
+        UIHelper.adjust_font_color(self.summary_label, "purple")
+
+        column_width = screen_width / 4
+        back_button = tk.Button(self.frame, text="Dashboard", font=("Arial", 30), bg="#4d94ff", fg="white",
+                                relief="raised", bd=8, command=on_back, activebackground="#66b3ff",
+                                activeforeground="white")
+        back_button.place(x=2 * column_width, y=screen_height - strip_height, width=column_width, height=strip_height)
+        exit_button = tk.Button(self.frame, text="EXIT", font=("Arial", 30), bg="#ff4d4d", fg="white",
+                                relief="raised", bd=8, command=on_exit, activebackground="#ff6666",
+                                activeforeground="white")
+        exit_button.place(x=3 * column_width, y=screen_height - strip_height, width=column_width, height=strip_height)
+
+    def show(self):
+        if self.visible:
+            return
+        self.frame.place(x=0, y=0, width=self.screen_width, height=self.screen_height)
+        self.frame.lift()
+        self.visible = True
+        self._tick()
+
+    def hide(self):
+        if not self.visible:
+            return
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
+        self.frame.place_forget()
+        self.visible = False
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def _tick(self):
+        now = time.time()
+        gmt = time.gmtime(now)
+        self.time_label.config(text=time.strftime("%H:%M:%S", gmt))
+        self.date_label.config(text=time.strftime("%A %d %B %Y  GMT", gmt))
+        if self.summary_source is not None:
+            self.summary_label.config(text=self.summary_source())
+        # Re-align to the next whole second so the clock doesn't drift
+        delay = max(int((1 - (now % 1)) * 1000), 1)
+        self._tick_id = self.root.after(delay, self._tick)
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+from collections import OrderedDict
+
+from classes import DataHandler
+from price_sources import normalize_symbol
+
+
+class Vault:
+    """One named portfolio: a middle and bottom grid data file, loaded only when the vault is opened."""
+
+    def __init__(self, name, middle_file_path, bottom_file_path):
+        self.name = name
+        self.middle_file_path = middle_file_path
+        self.bottom_file_path = bottom_file_path
+        self.middle = None
+        self.bottom = None
+
+    @property
+    def loaded(self):
+        return self.middle is not None
+
+    def load(self):
+        if not self.loaded:
+            self.middle = self._read(self.middle_file_path)
+            self.bottom = self._read(self.bottom_file_path)
+        return self
+
+    def store(self, middle, bottom):
+        """Take a copy of the latest grid contents, dropping widget references and derived values."""
+        self.middle = self._persistable(middle)
+        self.bottom = self._persistable(bottom)
+
+    def save(self):
+        if not self.loaded:
+            return
+        self._write(self.middle_file_path, self._persistable(self.middle))
+        self._write(self.bottom_file_path, self._persistable(self.bottom))
+
+    def page_out(self):
+        """Write the vault to disk and release its data; it is read back on the next open."""
+        self.save()
+        self.middle = None
+        self.bottom = None
+
+    def symbols(self):
+        data = self.middle if self.loaded else {}
+        return {normalize_symbol(data[f"row_{row}_name"]) for row in range(30)
+                if isinstance(data.get(f"row_{row}_name"), str) and data[f"row_{row}_name"].strip()}
+
+    @staticmethod
+    def _persistable(data):
+        return DataHandler.persistable(data)
+
+    @staticmethod
+    def _read(file_path):
+        if not os.path.exists(file_path):
+            return {}
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _write(file_path, data):
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        try:
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+        except Exception:
+            pass
+
+
+class VaultManager:
+    """Keeps the named portfolios on disk and at most max_resident of them in memory.
+
+    Vaults are loaded lazily on open and the least recently used inactive ones are paged out. All
+    vaults are priced from one shared PriceCache filled by the single fetch loop, so opening another
+    vault never adds API calls.
+    """
+
+    DEFAULT_VAULT = "personal"
+
+    def __init__(self, vaults_dir, default_middle_file_path, default_bottom_file_path, price_cache,
+                 max_resident=2):
+        self.vaults_dir = vaults_dir
+        self.price_cache = price_cache
+        self.max_resident = max(max_resident, 1)
+        self.vaults = {self.DEFAULT_VAULT: Vault(self.DEFAULT_VAULT, default_middle_file_path,
+                                                 default_bottom_file_path)}
+        self.resident = OrderedDict()  # name -> Vault, least recently used first
+        self.active = None
+        self.discover()
+
+    def discover(self):
+        if not os.path.isdir(self.vaults_dir):
+            return
+        for name in sorted(os.listdir(self.vaults_dir)):
+            if os.path.isdir(os.path.join(self.vaults_dir, name)) and name not in self.vaults:
+                self.vaults[name] = self._new_vault(name)
+
+    def names(self):
+        return list(self.vaults)
+
+    def create(self, name):
+        name = self.clean_name(name)
+        if not name:
+            raise ValueError("Vault name must contain letters or digits")
+        if name not in self.vaults:
+            os.makedirs(os.path.join(self.vaults_dir, name), exist_ok=True)
+            self.vaults[name] = self._new_vault(name)
+        return self.vaults[name]
+
+    def open(self, name):
+        """Make a vault active, loading it if needed, and page out vaults beyond max_resident."""
+        vault = self.vaults[name].load()
+        self.resident[name] = vault
+        self.resident.move_to_end(name)
+        self.active = vault
+        while len(self.resident) > self.max_resident:
+            oldest_name = next(iter(self.resident))
+            if oldest_name == name:
+                break
+            self.resident.pop(oldest_name).page_out()
+        return vault
+
+    def watched_symbols(self):
+        """Symbols of every resident vault, so switching back shows prices that are already fresh."""
+        symbols = set()
+        for vault in list(self.resident.values()):  # Called from the fetch thread
+            symbols.update(vault.symbols())
+        return symbols
+
+    def save_all(self):
+        for vault in self.resident.values():
+            vault.save()
+
+    def _new_vault(self, name):
+        directory = os.path.join(self.vaults_dir, name)
+        return Vault(name, os.path.join(directory, "middle_grid_data.json"),
+                     os.path.join(directory, "bottom_grid_data.json"))
+
+    @staticmethod
+    def clean_name(name):
+        return re.sub(r"[^A-Za-z0-9_-]+", "_", (name or "").strip()).strip("_").lower()
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Attributes every LogRecord has; anything else on a record came in through `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class DedupFilter(logging.Filter):
+    """Lets the first of a run of identical messages through and drops repeats for `interval` seconds.
+
+    Messages are identical when logger, level and formatted message match, so the same error for
+    another symbol still gets through. The first message let through after a quiet spell carries a
+    `repeated` count of what was dropped. Loggers in `exempt` (e.g. fired alerts, where every record
+    matters) are never dropped. It runs on the QueueHandler, so dropped records are never queued.
+    """
+
+    def __init__(self, interval=60.0, clock=time.monotonic, max_keys=1024, exempt=()):
+        super().__init__()
+        self.interval = interval
+        self.clock = clock
+        self.max_keys = max_keys
+        self.exempt = frozenset(exempt)
+        self.seen = {}  # key -> [time let through, suppressed count]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.name in self.exempt:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = self.clock()
+        with self.lock:
+            entry = self.seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+            if entry is not None and entry[1]:
+                record.repeated = entry[1]
+            if entry is None and len(self.seen) >= self.max_keys:
+                # Drop the keys that have been quiet longest rather than growing without bound
+                for stale in sorted(self.seen, key=lambda item: self.seen[item][0])[:self.max_keys // 4]:
+                    del self.seen[stale]
+            self.seen[key] = [now, 0]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        text = super().format(record)
+        repeated = getattr(record, "repeated", None)
+        return f"{text} (repeated {repeated} times)" if repeated else text
+
+
+class _EnqueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Resolve the message and traceback text now, while the objects they reference are unchanged;
+        # extra fields stay on the record for the JSON file
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(log_dir=None, level=None, console=True, max_bytes=2_000_000, backup_count=5, dedup_interval=60.0,
+                  dedup_exempt=("alerts.fired",)):
+    """Route the root logger through a queue to a background writer; returns the QueueListener.
+
+    Callers only pay for the filter check and a queue put. The listener thread writes JSON lines to
+    log_dir/indovault.log, rotated at max_bytes, and readable text to stderr. Call listener.stop()
+    at exit to flush what is still queued.
+    """
+    level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+    handlers = []
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(os.path.join(log_dir, "indovault.log"), maxBytes=max_bytes,
+                                           backupCount=backup_count, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(ConsoleFormatter())
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    queue_handler = _EnqueueHandler(records)
+    queue_handler.addFilter(DedupFilter(dedup_interval, exempt=dedup_exempt))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
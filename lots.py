@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+
+from price_sources import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+FIFO = "fifo"
+LIFO = "lifo"
+AVERAGE = "average"
+METHODS = (FIFO, LIFO, AVERAGE)
+
+
+class Lot:
+    __slots__ = ("quantity", "price", "timestamp")
+
+    def __init__(self, quantity, price, timestamp):
+        self.quantity = quantity  # Still open
+        self.price = price  # Cost per unit, fees included
+        self.timestamp = timestamp
+
+
+class LotLedger:
+    """Open lots of one position with cost basis, break-even and realized P&L kept up to date per trade.
+
+    FIFO and LIFO keep the open lots in a heap ordered by buy time (oldest or newest on top), so a
+    buy is one push and a sell pops only the lots it closes: O(log n) per lot, whatever the number of
+    open lots. A partly sold lot stays on top with its quantity reduced. AVERAGE keeps no lots at
+    all, only the running quantity and cost. Open quantity, open cost and realized P&L are updated
+    by each trade, so break_even() and unrealized() are O(1).
+    """
+
+    def __init__(self, method=FIFO):
+        if method not in METHODS:
+            raise ValueError(f"Unknown cost basis method: {method}")
+        self.method = method
+        self.heap = []  # [sort key, sequence, Lot]
+        self.sequence = itertools.count()
+        self.open_quantity = 0.0
+        self.open_cost = 0.0
+        self.realized = 0.0
+        self.trades = 0
+
+    def buy(self, quantity, price, fee=0.0, timestamp=None):
+        if quantity <= 0 or price < 0:
+            raise ValueError("A buy needs a positive quantity and a price")
+        timestamp = time.time() if timestamp is None else timestamp
+        cost = quantity * price + fee
+        self.open_quantity += quantity
+        self.open_cost += cost
+        self.trades += 1
+        if self.method != AVERAGE:
+            key = timestamp if self.method == FIFO else -timestamp
+            order = next(self.sequence)
+            heapq.heappush(self.heap, [key, order if self.method == FIFO else -order, Lot(quantity, cost / quantity, timestamp)])
+
+    def sell(self, quantity, price, fee=0.0, timestamp=None):
+        """Close quantity against the open lots; returns the realized P&L of this sell."""
+        if quantity <= 0 or price < 0:
+            raise ValueError("A sell needs a positive quantity and a price")
+        if quantity > self.open_quantity * (1 + 1e-12):
+            raise ValueError(f"Cannot sell {quantity:g}, only {self.open_quantity:g} held")
+        quantity = min(quantity, self.open_quantity)
+        if self.method == AVERAGE:
+            cost = self.open_cost * quantity / self.open_quantity
+        else:
+            cost = 0.0
+            remaining = quantity
+            while remaining > 0 and self.heap:
+                lot = self.heap[0][2]
+                used = min(lot.quantity, remaining)
+                cost += used * lot.price
+                lot.quantity -= used
+                remaining -= used
+                if lot.quantity <= 1e-15:
+                    heapq.heappop(self.heap)
+        realized = quantity * price - fee - cost
+        self.open_quantity -= quantity
+        self.open_cost -= cost
+        if self.open_quantity <= 1e-15:
+            self.open_quantity = self.open_cost = 0.0  # Closed out, drop rounding leftovers
+        self.realized += realized
+        self.trades += 1
+        return realized
+
+    def break_even(self):
+        return self.open_cost / self.open_quantity if self.open_quantity else 0.0
+
+    def unrealized(self, price):
+        return price * self.open_quantity - self.open_cost
+
+    def open_lots(self):
+        """Open lots in matching order (next to be sold first)."""
+        return [entry[2] for entry in sorted(self.heap)]
+
+
+class LotBook:
+    """Lot ledgers of every (symbol, wallet) position in a vault, backed by an append-only trade log.
+
+    Each trade is appended to a JSON Lines file as it is recorded and replayed on load, so a ledger
+    never has to be rewritten and switching the cost basis method is just a replay.
+    """
+
+    def __init__(self, path=None, method=FIFO):
+        self.path = path
+        self.method = method
+        self.ledgers = {}  # (symbol, wallet) -> LotLedger
+        self.load()
+
+    @staticmethod
+    def key(symbol, wallet=""):
+        return normalize_symbol(symbol), (wallet or "").strip().upper()
+
+    def ledger(self, symbol, wallet=""):
+        key = self.key(symbol, wallet)
+        ledger = self.ledgers.get(key)
+        if ledger is None:
+            ledger = self.ledgers[key] = LotLedger(self.method)
+        return ledger
+
+    def record(self, side, symbol, quantity, price, fee=0.0, wallet="", timestamp=None):
+        """Apply a trade and append it to the log; returns the ledger it went to."""
+        timestamp = time.time() if timestamp is None else timestamp
+        ledger = self.apply(side, symbol, quantity, price, fee, wallet, timestamp)
+        if self.path is not None:
+            symbol, wallet = self.key(symbol, wallet)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"side": side.upper(), "symbol": symbol, "wallet": wallet, "quantity": quantity,
+                                       "price": price, "fee": fee, "timestamp": timestamp}) + "\n")
+        return ledger
+
+    def seed(self, symbol, quantity, cost, wallet="", timestamp=None):
+        """Log a position tracked before its ledger as one opening lot at its cost basis.
+
+        Does nothing once the ledger has trades, so it is safe to call before every trade.
+        """
+        ledger = self.ledgers.get(self.key(symbol, wallet))
+        if (ledger is not None and ledger.trades) or quantity <= 0:
+            return ledger
+        return self.record("BUY", symbol, quantity, max(cost, 0.0) / quantity, 0.0, wallet, timestamp)
+
+    def apply(self, side, symbol, quantity, price, fee=0.0, wallet="", timestamp=None):
+        ledger = self.ledger(symbol, wallet)
+        side = side.upper()
+        if side == "BUY":
+            ledger.buy(quantity, price, fee, timestamp)
+        elif side == "SELL":
+            ledger.sell(quantity, price, fee, timestamp)
+        else:
+            raise ValueError(f"Unknown trade side: {side}")
+        return ledger
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    trade = json.loads(line)
+                    self.apply(trade["side"], trade["symbol"], trade["quantity"], trade["price"], trade.get("fee", 0.0),
+                               trade.get("wallet", ""), trade.get("timestamp"))
+                except (ValueError, KeyError) as e:
+                    logger.warning("Skipping trade log line: %s", e)
+
+    def set_method(self, method):
+        """Rebuild every ledger with another cost basis method by replaying the trade log."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown cost basis method: {method}")
+        self.method = method
+        self.ledgers = {}
+        self.load()
+
+    def positions(self):
+        """{(symbol, wallet): [open cost, open quantity]}, the shape portfolio_io.merge_positions takes."""
+        return {key: [ledger.open_cost, ledger.open_quantity] for key, ledger in self.ledgers.items()}
+
+    def realized(self):
+        return sum(ledger.realized for ledger in self.ledgers.values())
+
+
+def parse_trade(text):
+    """(side, symbol, quantity, price, fee, wallet) from "BUY 0.5 BTCUSDT @ 60000 fee 5 wallet TREZOR"."""
+    words = text.replace("@", " @ ").split()
+    if len(words) < 5 or words[0].upper() not in ("BUY", "SELL") or words[3] != "@":
+        raise ValueError("Expected 'BUY|SELL <quantity> <symbol> @ <price> [fee <fee>] [wallet <wallet>]'")
+    options = dict(zip(words[5::2], words[6::2]))
+    try:
+        quantity, price = float(words[1].replace(",", "")), float(words[4].replace(",", ""))
+        fee = float(options.get("fee", 0.0))
+    except ValueError:
+        raise ValueError(f"Not a number in '{text}'")
+    return words[0].upper(), words[2].upper(), quantity, price, fee, options.get("wallet", "").upper()
@@ -1,13 +1,43 @@
+import logging
 import os
 import threading
+import time
 import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog
 from functools import partial
 from config import Config
 from api import BinanceAPI
 from classes import ButtonHandler, DataHandler, UIHelper, UIGridHelper, EntryCreator
+from currency_graph import CurrencyGraph
+from gmt_mode import GMTModeView
+from number_format import format_money, format_price, format_trimmed, format_whole_or_cents, parse_number
+from price_sources import PriceSourceEngine
+from price_process import PriceEngineProcess, build_price_engine
+from price_cache import PriceCache
+from price_snapshot import SharedPriceSnapshot
+from price_bus import PriceBus, parse_address
+from indo_vault import VaultManager
+from pnl_history import PnLHistory
+from candles import CandleService
+from risk import BENCHMARK, RiskWorker
+from scenarios import ScenarioEngine, parse_scenarios
+from lots import LotBook, parse_trade
+from dashboard import Dashboard
+from logging_setup import setup_logging
+from alerts import AlertEngine, LogSink, DesktopSink, WebhookSink
+from symbol_index import SymbolIndex, SymbolAutocomplete
+from coin_validation import CoinValidator, INVALID_TEXT, NO_PRICE_TEXT, PENDING_TEXT
+from wallet_aggregates import WalletBreakdownPanel
+import portfolio_io
 from price_fetcher import PriceFetcher
 from price_updater import PriceUpdater
 
+logger = logging.getLogger(__name__)
+
+
+LAST_PRICES_SAVE_INTERVAL = 60.0  # Seconds between last-known price snapshots
+LAST_PRICES_MAX_AGE = 7 * 86400  # Older saved prices are too far off to show at startup
+
 
 class NetValueCalculator:
     @staticmethod
@@ -16,10 +46,7 @@ class NetValueCalculator:
         for row in range(start_row, end_row):
             # Ensure to get the latest profit value from entry_data
             profit = entry_data.get(f"row_{row}_profit", 0.0)
-            try:
-                total_profit += float(profit)  # Sum the profit for each row
-            except ValueError:
-                pass  # If it's not a valid number, skip it
+            total_profit += parse_number(profit)  # Invalid values count as 0
         return total_profit
 
     @staticmethod
@@ -29,45 +56,42 @@ class NetValueCalculator:
         return total_profit - deposited_value
 
     @staticmethod
-    def format_net_value(net_value):
+    def format_net_value(net_value, currency_prefix="$"):
         if net_value is None:
-            return "NET VALUE - $0.00"
-        formatted_value = f"NET VALUE - ${net_value:,.2f}" if not net_value.is_integer() else f"NET VALUE - ${int(net_value):,}"
-        return formatted_value
+            return "NET VALUE - No rate"
+        return format_whole_or_cents(net_value, prefix=f"NET VALUE - {currency_prefix}")
 
     @staticmethod
     def update_net_value(net_value_label, deposited_value, total_profit, config):
         net_value = NetValueCalculator.calculate_net_value(total_profit, deposited_value)
-        net_value_display = NetValueCalculator.format_net_value(net_value)
+        net_value_display = NetValueCalculator.format_net_value(net_value, config.currency_prefix)
         if net_value_label is not None:
             net_value_label.config(text=net_value_display)
-            print(f"Updated Net Value Label: {net_value_display}")
+            logger.debug("Updated net value label: %s", net_value_display)
 
     @staticmethod
     def get_deposited_value(deposited_entry):
         # Ensure you are getting the correct value from the Entry widget
-        deposited_text = deposited_entry.get().strip("DEPOSITED $").replace(",", "").strip()
-        try:
-            return float(deposited_text)  # Convert it to float after cleaning
-        except ValueError:
-            return 0.0  # Default if conversion fails
+        return parse_number(deposited_entry.get())
 
 
 class EntryHandler:
-    def __init__(self, data_handler, entry_data_middle, entry_data_bottom, binance_api, middle_grid_manager, entry_formatter):
+    def __init__(self, data_handler, entry_data_middle, entry_data_bottom, binance_api, middle_grid_manager, entry_formatter,
+                 coin_validator=None):
         self.data_handler = data_handler
         self.entry_data_middle = entry_data_middle
         self.entry_data_bottom = entry_data_bottom
         self.binance_api = binance_api
         self.middle_grid_manager = middle_grid_manager
         self.entry_formatter = entry_formatter
+        self.column_handler = ColumnHandler(self.binance_api, self.middle_grid_manager, self.entry_data_middle,
+                                            self.entry_formatter, self.data_handler, coin_validator)
 
     def on_enter_middle(self, event, row, column=None):
         entry_widget = event.widget
         entry_text = entry_widget.get().strip()
 
-        column_handler = ColumnHandler(self.binance_api, self.middle_grid_manager, self.entry_data_middle, self.entry_formatter, self.data_handler)
-        column_handler.handle_column(entry_widget, entry_text, row, column)
+        self.column_handler.handle_column(entry_widget, entry_text, row, column)
 
         self.save_entry_data(self.entry_data_middle, "middle", entry_widget)
 
@@ -88,12 +112,14 @@ class EntryHandler:
 
 
 class ColumnHandler:
-    def __init__(self, binance_api, middle_grid_manager, entry_data_middle, entry_formatter, data_handler):
+    def __init__(self, binance_api, middle_grid_manager, entry_data_middle, entry_formatter, data_handler,
+                 coin_validator=None):
         self.binance_api = binance_api
         self.middle_grid_manager = middle_grid_manager
         self.entry_data_middle = entry_data_middle
         self.entry_formatter = entry_formatter
         self.data_handler = data_handler
+        self.coin_validator = coin_validator
 
     def handle_column(self, entry_widget, entry_text, row, column):
         if column == 1:  # Coin column
@@ -109,13 +135,21 @@ class ColumnHandler:
 
     def handle_coin_column(self, entry_widget, entry_text, row):
         coin_pair = entry_text
-        if self.binance_api.is_valid_coin_pair(coin_pair):
-            price = self.binance_api.get_coin_price(coin_pair)
-            price_text = f"${price}" if price else "Error fetching price"
-            self.entry_data_middle[f"row_{row}_price"] = price
-            self.middle_grid_manager.create_value_label(row, 2, text=price_text)
-        else:
-            self.middle_grid_manager.create_value_label(row, 2, text="Invalid coin pair")
+        if self.coin_validator is None:
+            valid = self.binance_api.is_valid_coin_pair(coin_pair)
+            self.show_coin_result(row, coin_pair, valid, self.binance_api.get_coin_price(coin_pair) if valid else None)
+            return
+        # The cell says it is checking right away; the answer is painted when the background check returns
+        self.middle_grid_manager.create_value_label(row, 2, text=PENDING_TEXT)
+        self.coin_validator.validate(row, coin_pair, self.show_coin_result)
+
+    def show_coin_result(self, row, coin_pair, valid, price):
+        if not valid:
+            self.middle_grid_manager.create_value_label(row, 2, text=INVALID_TEXT)
+            return
+        price_text = f"${format_price(price) or price}" if price else NO_PRICE_TEXT
+        self.entry_data_middle[f"row_{row}_price"] = price
+        self.middle_grid_manager.create_value_label(row, 2, text=price_text)
 
     def handle_value_column(self, entry_widget, entry_text, row, column_key, formatter_method):
         formatted_text = formatter_method(entry_text)
@@ -133,10 +167,10 @@ class ColumnHandler:
         self.entry_data_middle[f"row_{row}_column_{column}"] = entry_text
 
     def save_invested_and_holdings(self, row):
-        invested = self.entry_data_middle.get(f"row_{row}_column_6", "$0").lstrip("$").replace(",", "")
-        holdings = self.entry_data_middle.get(f"row_{row}_column_7", "0").replace(",", "")
+        invested = self.entry_data_middle.get(f"row_{row}_column_6", "$0")
+        holdings = self.entry_data_middle.get(f"row_{row}_column_7", "0")
         invested, holdings = self.format_values(invested, holdings)
-        self.entry_data_middle[f"row_{row}_invested"] = f"${invested:,.2f}"
+        self.entry_data_middle[f"row_{row}_invested"] = format_money(invested)
         self.entry_data_middle[f"row_{row}_holdings"] = holdings
         self.data_handler.save_data(self.entry_data_middle, grid_type="middle")
 
@@ -146,10 +180,7 @@ class ColumnHandler:
         return invested, holdings
 
     def safe_float_conversion(self, value):
-        try:
-            return float(value) if value else 0.0
-        except ValueError:
-            return 0.0
+        return parse_number(value)
 
 
 class DepositHandler:
@@ -158,18 +189,17 @@ class DepositHandler:
         self.entry_data_bottom = entry_data_bottom
 
     def handle(self, entry_widget, entry_text, row):
-        deposited_amount = entry_text.strip("DEPOSITED $").strip()
+        deposited_amount = parse_number(entry_text, None)
         formatted_deposit = self.format_deposit(deposited_amount)
-        self.entry_data_bottom[f"row_{row}_column_6"] = float(deposited_amount)
+        self.entry_data_bottom[f"row_{row}_column_6"] = deposited_amount or 0.0
         entry_widget.config(bg="lightgreen")
         entry_widget.delete(0, tk.END)
         entry_widget.insert(0, formatted_deposit)
 
     def format_deposit(self, deposited_amount):
-        try:
-            return f"DEPOSITED ${float(deposited_amount):,.2f}"
-        except ValueError:
+        if deposited_amount is None:
             return "Invalid deposit"
+        return format_money(deposited_amount, symbol="DEPOSITED $")
 
 
 class EntryFormatter:
@@ -178,18 +208,10 @@ class EntryFormatter:
 
     def format_value(self, entry_text, precision=8, symbol="$"):
         """Generic method to format values, including precision handling."""
-        try:
-            value = float(entry_text.replace(",", ""))
-            formatted_value = f"{symbol}{value:,.{precision}f}"
-
-            if formatted_value.endswith('.00'):
-                formatted_value = formatted_value[:-3]
-            elif formatted_value.endswith('0'):
-                formatted_value = formatted_value.rstrip('0')
-
-            return formatted_value
-        except ValueError:
+        value = parse_number(entry_text, None)
+        if value is None:
             return f"{symbol}0.00"
+        return format_trimmed(value, precision, symbol)
 
     def format_invested_value(self, entry_text):
         return self.format_value(entry_text)
@@ -217,14 +239,7 @@ class EntryFormatter:
 
 
 def format_deposit(value):
-    try:
-        value = float(value) if value else 0.0
-    except ValueError:
-        value = 0.0
-    if value.is_integer():
-        return f"DEPOSITED ${int(value):,}"
-    else:
-        return f"DEPOSITED ${value:,.2f}"
+    return format_whole_or_cents(parse_number(value), prefix="DEPOSITED $")
 
 
 class GridManagerBase:
@@ -234,7 +249,7 @@ class GridManagerBase:
         self.entry_creator = EntryCreator(self.config.root, self.config, self.config.focus_handler.on_focus_in, self.config.focus_handler.on_focus_out)
         self.entries_middle = []
         self.entries_bottom = []
-        self.net_value_label = self.create_value_label(row=0, col=0, text="NET VALUE - $0.00")
+        self.net_value_label = self.create_value_label(row=0, col=0, text=f"NET VALUE - {self.config.currency_prefix}0.00")
 
     def create_value_label(self, row, col, text="", bg_color=None):
         return self.ui_grid_helper.create_value_label(row, col, text=text, bg_color=bg_color)
@@ -270,6 +285,8 @@ class MiddleGridManager(GridManagerBase):
     def __init__(self, config, deposited_entry=None):
         super().__init__(config)
         self.deposited_entry = deposited_entry  # Store deposited_entry if passed
+        self.entry_widgets = {}  # (row, col) -> Entry, used to repaint the grid when another vault opens
+        self.symbol_autocomplete = None  # Attached to every coin entry when set before setup_middle_grid
 
     def setup_middle_grid(self, on_enter_middle):
         total_height = self.config.screen_height - 2 * self.config.strip_height
@@ -299,15 +316,18 @@ class MiddleGridManager(GridManagerBase):
         elif col in [3, 4, 5]:
             self.create_value_label(row, col, text="$0.00", bg_color=row_color)
         elif col == 6:
-            self.entry_creator.create_entry(row, col, 6, self.config.entry_data_middle, self.entries_middle,
-                                            self.entry_creator.enforce_dollar_sign, on_enter_middle)
+            self.entry_widgets[(row, col)] = self.entry_creator.create_entry(
+                row, col, 6, self.config.entry_data_middle, self.entries_middle,
+                self.entry_creator.enforce_dollar_sign, on_enter_middle)
         elif col == 7:
-            self.entry_creator.create_entry(row, col, 7, self.config.entry_data_middle, self.entries_middle,
-                                            self.entry_creator.enforce_dollar_sign, on_enter_middle)
+            self.entry_widgets[(row, col)] = self.entry_creator.create_entry(
+                row, col, 7, self.config.entry_data_middle, self.entries_middle,
+                self.entry_creator.enforce_dollar_sign, on_enter_middle)
         elif col == 8:
-            self.create_wallet_entry(row, col, self.config.entry_data_middle, self.entries_middle,
-                                     self.config.wallet_colors, on_enter_middle,
-                                     self.config.focus_handler.on_focus_out)
+            self.entry_widgets[(row, col)] = self.create_wallet_entry(
+                row, col, self.config.entry_data_middle, self.entries_middle,
+                self.config.wallet_colors, on_enter_middle,
+                self.config.focus_handler.on_focus_out)
         else:
             self.create_value_label(row, col, text="", bg_color=row_color)
 
@@ -329,10 +349,28 @@ class MiddleGridManager(GridManagerBase):
         if f"row_{row}_name" in self.config.entry_data_middle:
             entry.insert(0, self.config.entry_data_middle[f"row_{row}_name"])
         self.entries_middle.append(entry)
+        self.entry_widgets[(row, 0)] = entry
         entry.bind("<Return>", partial(on_enter_middle, row=row, column=1))
         UIHelper.adjust_font_color(entry, row_color)
         entry.bind("<FocusIn>", partial(self.config.focus_handler.on_focus_in, entry=entry))
         entry.bind("<FocusOut>", lambda event: self.config.focus_handler.on_focus_out(row=row, column=1, entry=entry))
+        if self.symbol_autocomplete is not None:
+            self.symbol_autocomplete.attach(entry)
+
+
+    def refresh_entries(self):
+        """Reload every entry widget from entry_data_middle without rebuilding the grid."""
+        entry_data = self.config.entry_data_middle
+        for (row, col), entry in self.entry_widgets.items():
+            if col == 0:
+                text = entry_data.get(f"row_{row}_name", "")
+            elif col == 8:
+                text = entry_data.get(f"row_{row}_column_8_middle", "")
+                UIHelper.adjust_entry_bg_color(entry, text.strip().upper(), self.config.wallet_colors)
+            else:
+                text = self.entry_creator.saved_entry_text(entry_data, row, col)
+            entry.delete(0, tk.END)
+            entry.insert(0, text)
 
 
 class BottomGridManager(GridManagerBase):
@@ -344,6 +382,9 @@ class BottomGridManager(GridManagerBase):
         self.price_updater = price_updater
         self.net_value_calculator = net_value_calculator
         self.first_update = True  # Flag for first update
+        self.deposit_converter = None  # USD deposit -> reporting currency, set once the price updater exists
+        self.summary_label = None
+        self.summary_parts = {}  # key -> text, shown in insertion order under the net value
 
     def set_updater_and_calculator(self, price_updater, net_value_calculator):
         # This method sets the updater and calculator after initialization
@@ -352,20 +393,17 @@ class BottomGridManager(GridManagerBase):
 
     def setup_bottom_grid(self, on_enter_bottom):
         # Setup net value label and deposited entry
-        self.net_value_label = tk.Label(self.config.root, bg="purple", text="NET VALUE - $0", font=("Arial", 35),
+        self.net_value_label = tk.Label(self.config.root, bg="purple", text=f"NET VALUE - {self.config.currency_prefix}0",
+                                        font=("Arial", 35),
                                         fg="white", anchor="center", bd=2, relief="solid",
                                         highlightbackground="lavender",
                                         highlightthickness=1)
         self.net_value_label.place(x=0, y=self.config.screen_height - self.config.strip_height,
                                    width=self.config.column_width_bottom, height=self.config.strip_height)
         UIHelper.adjust_font_color(self.net_value_label, "purple")
+        self.create_summary_label()
 
-        deposited_value = self.config.entry_data_bottom.get("row_1_column_6", 0.0)
-        try:
-            deposited_value = float(deposited_value)
-        except ValueError:
-            deposited_value = 0.0
-        deposited_value_display = f"DEPOSITED ${deposited_value:,.2f}" if not deposited_value.is_integer() else f"DEPOSITED ${int(deposited_value):,}"
+        deposited_value_display = format_deposit(self.config.entry_data_bottom.get("row_1_column_6", 0.0))
         self.deposited_entry = tk.Entry(self.config.root, font=("Arial", 35), fg="black", bg="lime", justify="center",
                                         relief="solid", bd=2)
         self.deposited_entry.insert(0, deposited_value_display)
@@ -384,6 +422,20 @@ class BottomGridManager(GridManagerBase):
 
         self.update_net_value()  # Initially called here
 
+    def create_summary_label(self):
+        summary_height = self.config.strip_height // 4
+        self.summary_label = tk.Label(self.config.root, bg="purple", text="", font=("Arial", 13), fg="white",
+                                      anchor="center")
+        self.summary_label.place(x=2, y=self.config.screen_height - summary_height - 2,
+                                 width=self.config.column_width_bottom - 4, height=summary_height)
+        UIHelper.adjust_font_color(self.summary_label, "purple")
+
+    def set_summary(self, key, text):
+        """Show a short keyed figure (e.g. period P&L) in the strip under the net value."""
+        self.summary_parts[key] = text
+        if self.summary_label is not None:
+            self.summary_label.config(text="   ".join(part for part in self.summary_parts.values() if part))
+
     def update_net_value(self, deposited_value=None, total_profit=None):
         if self.first_update:
             self.first_update = False  # Set flag to False after first update
@@ -397,6 +449,8 @@ class BottomGridManager(GridManagerBase):
     def _do_update_net_value(self, deposited_value=None, total_profit=None):
         if deposited_value is None:
             deposited_value = NetValueCalculator.get_deposited_value(self.deposited_entry)
+            if self.deposit_converter is not None:
+                deposited_value = self.deposit_converter(deposited_value)
         if total_profit is None:
             total_profit = self.net_value_calculator.calculate_total_profit(self.config.entry_data_bottom)
 
@@ -419,7 +473,7 @@ class EntryFocusHandler:
     def on_focus_out(self, row, column, entry):
         value = entry.get().strip()
         caret_position = entry.index(tk.INSERT)
-        original_bg_color = self.original_bg_colors.get(entry, entry.cget("bg"))
+        original_bg_color = self.original_bg_colors.pop(entry, entry.cget("bg"))
         self.entry_data_updater.update_entry_data(row, column, value)
         self.restore_caret_position(entry, caret_position)
         self.restore_background_color(row, column, entry, original_bg_color)
@@ -496,37 +550,50 @@ class EntryDataUpdater:
         return value
 
     def format_invested_value(self, value):
-        raw_value = value.lstrip("$").replace(",", "")
-        try:
-            value_float = float(raw_value)
-            return f"${value_float:,.2f}".rstrip("0").rstrip(".")
-        except ValueError:
-            return "$0.00"
+        value_float = parse_number(value, None)
+        return format_trimmed(value_float, 2, "$") if value_float is not None else "$0.00"
 
     def format_holdings_value(self, value):
-        raw_value = value.replace(",", "")
-        try:
-            value_float = float(raw_value)
-            return f"{value_float:,.2f}".rstrip("0").rstrip(".")
-        except ValueError:
-            return "0"
+        value_float = parse_number(value, None)
+        return format_trimmed(value_float, 2) if value_float is not None else "0"
 
 
 class CryptoTrackerAppCore:
     def __init__(self, root):
         self.root = root
+        self.initialize_logging()
         self.configure_root()  # Make sure this is called to set fullscreen
         self.load_api_keys()
+        self.load_reporting_currency()
         self.initialize_binance_api()
+        self.initialize_currency_graph()
+        self.initialize_price_engine()
+        self.initialize_price_snapshot()
+        self.initialize_price_bus()
         self.initialize_data_handler()
+        self.initialize_vaults()
         self.load_entry_data()
         self.set_wallet_colors()
         self.configure_screen_dimensions()
         self.initialize_config()
         self.initialize_grid_managers()
+        self.initialize_symbol_index()
+        self.initialize_coin_validator()
         self.initialize_price_fetcher()
+        self.initialize_pnl_history()
+        self.initialize_lot_book()
+        self.price_fetcher.add_valuation_listener(self.save_last_prices_periodically)
+        self.initialize_candles()
+        self.initialize_risk()
+        self.initialize_alerts()
+        self.initialize_dashboard()
         self.initialize_button_handler()
 
+    def initialize_logging(self):
+        # Records are queued and written by a background thread, so the fetch loop never waits on disk
+        log_dir = os.getenv("LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
+        self.log_listener = setup_logging(log_dir=log_dir)
+
     def configure_root(self):
         self.root.attributes("-fullscreen", True)  # Ensure fullscreen is enabled here
         self.root.title("Crypto Tracker - Static Grids")
@@ -536,19 +603,114 @@ class CryptoTrackerAppCore:
         self.api_key = os.getenv("BINANCE_API_KEY")
         self.api_secret = os.getenv("BINANCE_API_SECRET")
         if not self.api_key or not self.api_secret:
-            print("Error: API key or secret is not set in environment variables.")
+            logger.error("API key or secret is not set in environment variables")
         else:
-            print("API key and secret successfully loaded.")
+            logger.info("API key and secret loaded")
+
+    def load_reporting_currency(self):
+        # Positions are valued in REPORTING_CURRENCY; FIAT_RATES ("IDR=16250,EUR=0.92", units per USDT)
+        # bridges fiat currencies that are not listed as pairs on the exchange
+        self.reporting_currency = os.getenv("REPORTING_CURRENCY", "USDT").strip().upper()
+        self.fiat_rates = CurrencyGraph.parse_fiat_rates(os.getenv("FIAT_RATES", ""))
 
     def initialize_binance_api(self):
         self.binance_api = BinanceAPI(api_key=self.api_key, api_secret=self.api_secret)
 
+    def initialize_currency_graph(self):
+        self.currency_graph = CurrencyGraph()
+        for asset, rate in self.fiat_rates.items():
+            self.currency_graph.set_rate("USDT", asset, rate)
+
+    def initialize_price_engine(self):
+        # Binance stays the primary source; EXTRA_PRICE_SOURCES ("name=url,...") adds Binance-style ticker
+        # endpoints that fill in symbols Binance doesn't list and keep the grid priced during an outage
+        # PRICE_HEDGE_AFTER (seconds) sends a duplicate request to a source that is slower than that
+        hedge_after = os.getenv("PRICE_HEDGE_AFTER")
+        options = {
+            "extra_sources": os.getenv("EXTRA_PRICE_SOURCES", ""),
+            "strategy": os.getenv("PRICE_SOURCE_STRATEGY", PriceSourceEngine.PRIORITY).strip().lower(),
+            "hedge_after": float(hedge_after) if hedge_after else None,
+        }
+        if os.getenv("PRICE_ENGINE_PROCESS"):
+            # Requests and response parsing move to a supervised child process that hands prices back
+            # through shared memory, so they never hold the GIL the Tk loop needs
+            options.update(api_key=self.api_key, api_secret=self.api_secret)
+            self.price_engine = PriceEngineProcess(options, binance_api=self.binance_api)
+        else:
+            self.price_engine = build_price_engine(self.binance_api, options)
+        # A sweep waits at most PRICE_CYCLE_BUDGET seconds; rows still unpriced keep their last price, marked stale
+        self.price_cycle_budget = float(os.getenv("PRICE_CYCLE_BUDGET", "4.0"))
+
+    def initialize_price_snapshot(self):
+        # With PRICE_SNAPSHOT_PATH set, running instances share one fetcher through a memory-mapped file
+        snapshot_path = os.getenv("PRICE_SNAPSHOT_PATH")
+        self.price_snapshot = None
+        if snapshot_path:
+            try:
+                self.price_snapshot = SharedPriceSnapshot(snapshot_path)
+            except OSError as e:
+                logger.warning("Shared price snapshot unavailable, fetching locally: %s", e)
+
+    def initialize_price_bus(self):
+        # With PRICE_BUS_PATH set, other local processes can subscribe to this instance's prices
+        bus_address = os.getenv("PRICE_BUS_PATH")
+        self.price_bus = None
+        if bus_address:
+            try:
+                self.price_bus = PriceBus(parse_address(bus_address))
+                self.price_bus.start()
+            except OSError as e:
+                logger.warning("Price bus unavailable: %s", e)
+                self.price_bus = None
+
     def initialize_data_handler(self):
         self.data_handler = DataHandler(api_key=self.api_key, api_secret=self.api_secret)
 
+    def initialize_vaults(self):
+        # Every vault is priced from this one cache, filled by the single fetch loop
+        self.price_cache = PriceCache()
+        # Last known prices from the previous run paint a valued grid before the first sweep returns
+        self.last_prices_path = os.path.join(os.path.dirname(self.data_handler.vaults_dir), "last_prices.bin")
+        self.last_prices_saved = time.time()
+        self.price_cache.load(self.last_prices_path, max_age=LAST_PRICES_MAX_AGE)
+        self.vault_manager = VaultManager(
+            self.data_handler.vaults_dir, self.data_handler.middle_grid_file_path,
+            self.data_handler.bottom_grid_file_path, self.price_cache
+        )
+
     def load_entry_data(self):
-        self.entry_data_middle = self.data_handler.load_data(grid_type='middle')
-        self.entry_data_bottom = self.data_handler.load_data(grid_type='bottom')
+        vault_name = os.getenv("INDOVAULT_VAULT", VaultManager.DEFAULT_VAULT)
+        if vault_name not in self.vault_manager.vaults:
+            vault_name = VaultManager.DEFAULT_VAULT
+        vault = self.vault_manager.open(vault_name)
+        self.data_handler.set_file_paths(vault.middle_file_path, vault.bottom_file_path)
+        # The app edits the active vault's dicts in place; other components keep references to them
+        self.entry_data_middle = vault.middle
+        self.entry_data_bottom = vault.bottom
+
+    def open_vault(self, name):
+        """Swap another vault into the shared grid dicts; returns False when it is already active."""
+        current = self.vault_manager.active
+        if current is not None and current.name == name:
+            return False
+        widgets = {key: value for key, value in self.entry_data_middle.items() if key.endswith("_widget")}
+        self.entry_data_middle["alerts"] = self.alert_engine.rule_dicts()
+        current.store(self.entry_data_middle, self.entry_data_bottom)
+        current.save()
+
+        vault = self.vault_manager.open(name)
+        self.data_handler.set_file_paths(vault.middle_file_path, vault.bottom_file_path)
+        for live, loaded in ((self.entry_data_middle, vault.middle), (self.entry_data_bottom, vault.bottom)):
+            live.clear()
+            live.update(loaded)
+        self.entry_data_middle.update(widgets)
+        vault.middle, vault.bottom = self.entry_data_middle, self.entry_data_bottom
+        self.pnl_history.flush()
+        self.pnl_history = self.open_pnl_history()
+        self.lot_book = self.open_lot_book()
+        self.alert_engine.load_rules(self.entry_data_middle.get("alerts", []))
+        self.root.title(f"Crypto Tracker - {vault.name}")
+        return True
 
     def set_wallet_colors(self):
         self.wallet_colors = {
@@ -574,7 +736,8 @@ class CryptoTrackerAppCore:
             self.root, self.screen_width, self.screen_height, self.strip_height,
             self.screen_width / 9, self.screen_width / 9, self.screen_width / 4,
             self.wallet_colors, self.entry_data_middle, self.entry_data_bottom,
-            self.data_handler, self.entry_focus_handler, None
+            self.data_handler, self.entry_focus_handler, None,
+            CurrencyGraph.currency_prefix(self.reporting_currency)
         )
 
     def initialize_grid_managers(self):
@@ -594,14 +757,168 @@ class CryptoTrackerAppCore:
         # Set PriceUpdater and NetValueCalculator in BottomGridManager
         self.bottom_grid_manager.set_updater_and_calculator(self.price_updater, self.net_value_calculator)
 
+    def initialize_coin_validator(self):
+        self.coin_validator = CoinValidator(self.root, self.binance_api, self.price_cache)
+
+    def initialize_symbol_index(self):
+        # The on-disk symbol table serves autocomplete straight away (and offline); fresh exchange info
+        # replaces it in the background
+        cache_path = os.path.join(os.path.dirname(self.data_handler.vaults_dir), "symbol_cache.json")
+        self.symbol_index = SymbolIndex(cache_path, preferred_quote=self.reporting_currency)
+        self.symbol_index.load_cache()
+        if self.binance_api is not None:
+            self.symbol_index.refresh_async(self.binance_api)
+        self.middle_grid_manager.symbol_autocomplete = SymbolAutocomplete(self.root, self.symbol_index)
+
     def initialize_price_fetcher(self):
         self.price_fetcher = PriceFetcher(
             self.binance_api,
             self.entry_data_middle,
             self.middle_grid_manager,
             self.data_handler,
-            self.root
+            self.root,
+            currency_graph=self.currency_graph,
+            reporting_currency=self.reporting_currency,
+            price_engine=self.price_engine,
+            price_cache=self.price_cache,
+            watched_symbols=self.vault_manager.watched_symbols,
+            price_snapshot=self.price_snapshot,
+            price_bus=self.price_bus,
+            cycle_budget=self.price_cycle_budget
         )
+        self.bottom_grid_manager.deposit_converter = self.price_fetcher.price_updater.to_reporting_currency
+
+    def reporting_deposit(self):
+        """The deposit (entered in USD) in the reporting currency, None while there is no rate for it."""
+        return self.price_fetcher.price_updater.to_reporting_currency(
+            parse_number(self.entry_data_bottom.get("row_1_column_6", 0.0))
+        )
+
+    def save_last_prices(self):
+        try:
+            self.price_cache.save(self.last_prices_path)
+        except OSError as e:
+            logger.error("Could not save last known prices: %s", e)
+
+    def save_last_prices_periodically(self, valuation):
+        # Runs on the fetch thread, so the write never lands on the Tk loop
+        if time.time() - self.last_prices_saved >= LAST_PRICES_SAVE_INTERVAL:
+            self.last_prices_saved = time.time()
+            self.save_last_prices()
+
+    def initialize_pnl_history(self):
+        self.pnl_history = self.open_pnl_history()
+        self.price_fetcher.add_valuation_listener(self.record_pnl_history)
+
+    def open_pnl_history(self):
+        # Each vault keeps its history next to its grid files
+        vault = self.vault_manager.active
+        return PnLHistory(os.path.join(os.path.dirname(vault.middle_file_path), "history", vault.name))
+
+    def initialize_lot_book(self):
+        # COST_BASIS_METHOD picks how sells are matched against buys: fifo (default), lifo or average
+        self.cost_basis_method = os.getenv("COST_BASIS_METHOD", "fifo").strip().lower()
+        self.lot_book = self.open_lot_book()
+
+    def open_lot_book(self):
+        # Each vault keeps its trade log next to its grid files
+        vault = self.vault_manager.active
+        return LotBook(os.path.join(os.path.dirname(vault.middle_file_path), "lots.jsonl"), self.cost_basis_method)
+
+    def record_trade(self, text):
+        """Record a trade in its position's lot ledger and write the resulting cost basis into the grid."""
+        side, symbol, quantity, price, fee, wallet = parse_trade(text)
+        key = LotBook.key(symbol, wallet)
+        portfolio_io.merge_positions(self.entry_data_middle, {key: [0.0, 0.0]})  # Fails before logging if no row is free
+        for row in range(portfolio_io.ROWS):
+            if LotBook.key(str(self.entry_data_middle.get(f"row_{row}_name", "")),
+                           str(self.entry_data_middle.get(f"row_{row}_column_8_middle", ""))) == key:
+                # A row entered by hand opens its ledger, so the trade adds to what it already holds
+                self.lot_book.seed(symbol, parse_number(self.entry_data_middle.get(f"row_{row}_holdings", 0)),
+                                   parse_number(self.entry_data_middle.get(f"row_{row}_invested", 0)), wallet)
+                break
+        ledger = self.lot_book.record(side, symbol, quantity, price, fee, wallet)
+        merged = portfolio_io.merge_positions(self.entry_data_middle, {key: [ledger.open_cost, ledger.open_quantity]})
+        self.data_handler.save_data(merged, 'middle')
+        self.entry_data_middle.update(merged)
+        return ledger
+
+    def record_pnl_history(self, valuation):
+        self.pnl_history.record_valuation(valuation, self.entry_data_middle, self.reporting_deposit())
+
+    def initialize_candles(self):
+        # Klines of every tracked symbol and the risk benchmark are cached next to the vaults; each start
+        # only fetches the gap since the last run, in the background
+        candles_dir = os.path.join(os.path.dirname(self.data_handler.vaults_dir), "candles")
+        self.candle_service = CandleService(self.binance_api, candles_dir)
+        self.candle_service.backfill_async(lambda: self.vault_manager.watched_symbols() | {BENCHMARK})
+
+    def initialize_risk(self):
+        # Volatility, drawdown, beta and VaR over the cached daily candles, computed off both the Tk and
+        # fetch threads and shown next to the net value
+        self.risk_worker = RiskWorker(
+            self.candle_service, self.show_risk_summary,
+            currency_prefix=self.price_fetcher.price_updater.currency_prefix
+        )
+        self.risk_worker.start()
+        self.price_fetcher.add_valuation_listener(
+            lambda valuation: self.risk_worker.submit_valuation(valuation, self.entry_data_middle, self.price_cache)
+        )
+
+    def show_risk_summary(self, text):
+        self.root.after(0, self.bottom_grid_manager.set_summary, "risk", text)
+
+    def initialize_alerts(self):
+        # Rules live in the active vault's middle grid data; ALERT_WEBHOOK_URL adds a sink that POSTs
+        # each alert as JSON, e.g. to a local relay
+        sinks = [LogSink(), DesktopSink(self.root)]
+        webhook_url = os.getenv("ALERT_WEBHOOK_URL")
+        if webhook_url:
+            sinks.append(WebhookSink(webhook_url))
+        self.alert_engine = AlertEngine(sinks)
+        self.alert_engine.load_rules(self.entry_data_middle.get("alerts", []))
+        self.price_fetcher.add_valuation_listener(self.evaluate_alerts)
+
+    def evaluate_alerts(self, valuation):
+        self.alert_engine.on_valuation(valuation, self.entry_data_middle, self.price_cache, self.reporting_deposit())
+
+    def save_alerts(self):
+        self.entry_data_middle["alerts"] = self.alert_engine.rule_dicts()
+        self.data_handler.save_data(self.entry_data_middle, 'middle')
+
+    def initialize_dashboard(self):
+        # With DASHBOARD_PORT set, a read-only view of the grid is served on localhost at that port
+        port = os.getenv("DASHBOARD_PORT")
+        self.dashboard = None
+        if not port:
+            return
+        try:
+            self.dashboard = Dashboard(("127.0.0.1", int(port)),
+                                       currency_prefix=self.price_fetcher.price_updater.currency_prefix)
+            self.dashboard.start()
+        except (OSError, ValueError) as e:
+            logger.warning("Dashboard unavailable: %s", e)
+            self.dashboard = None
+            return
+        logger.info("Dashboard at %s", self.dashboard.url)
+        self.price_fetcher.add_valuation_listener(self.publish_dashboard)
+
+    def publish_dashboard(self, valuation):
+        self.dashboard.publish(valuation, self.entry_data_middle, self.price_cache, self.reporting_deposit())
+
+    def import_positions(self, path):
+        """Stream an exchange/wallet export into the active vault's grid and save it in one write."""
+        # The cached symbol table validates each distinct symbol once; with no table yet nothing is dropped
+        known_symbols = self.binance_api.known_symbols() if self.binance_api is not None else None
+        result = portfolio_io.import_positions(path, known_symbols or self.symbol_index.info,
+                                               default_quote=self.reporting_currency)
+        merged = portfolio_io.merge_positions(self.entry_data_middle, result.positions)
+        self.data_handler.save_data(merged, 'middle')
+        self.entry_data_middle.update(merged)
+        return result
+
+    def export_positions(self, path):
+        return portfolio_io.export_positions(self.entry_data_middle, path, self.price_cache.price)
 
     def initialize_button_handler(self):
         self.config.button_handler = ButtonHandler(
@@ -609,6 +926,15 @@ class CryptoTrackerAppCore:
             self.strip_height, self.entry_focus_handler,
             self.price_fetcher, self.middle_grid_manager
         )
+        self.config.button_handler.add_exit_callback(lambda: self.pnl_history.flush())
+        self.config.button_handler.add_exit_callback(self.save_alerts)  # Keeps re-anchored move references
+        self.config.button_handler.add_exit_callback(self.save_last_prices)
+        self.config.button_handler.add_exit_callback(self.price_engine.shutdown)  # Frees the engine's shared memory
+        self.config.button_handler.add_exit_callback(self.coin_validator.shutdown)
+        self.config.button_handler.add_exit_callback(self.risk_worker.stop)
+        if self.dashboard is not None:
+            self.config.button_handler.add_exit_callback(self.dashboard.stop)
+        self.config.button_handler.add_exit_callback(self.log_listener.stop)  # Last, flushes what the others logged
 
 
 class CryptoTrackerAppUI:
@@ -629,7 +955,7 @@ class CryptoTrackerAppUI:
             self.core_initializer.data_handler, self.core_initializer.entry_data_middle,
             self.core_initializer.entry_data_bottom, self.core_initializer.binance_api,
             self.core_initializer.middle_grid_manager,
-            self.entry_formatter
+            self.entry_formatter, self.core_initializer.coin_validator
         )
 
     def setup_grid(self):
@@ -645,6 +971,213 @@ class CryptoTrackerAppUI:
                                                                      self.core_initializer.screen_height,
                                                                      self.core_initializer.screen_width / 4,
                                                                      self.core_initializer.strip_height)
+        self.create_gmt_view()
+        self.root.bind("<F2>", self.show_vault_menu)
+        self.root.bind("<F3>", self.show_alert_menu)
+        self.root.bind("<F5>", self.show_positions_menu)
+        self.root.bind("<F6>", self.run_scenarios)
+        self.root.bind("<F7>", self.record_trade)
+        self.create_wallet_panel()
+        self.show_realized_profit()
+        self.paint_last_prices()
+        self.refresh_pnl_summary()
+
+    def paint_last_prices(self):
+        """Value the grid from the previous run's prices, all marked stale until the first sweep lands."""
+        core = self.core_initializer
+        core.price_fetcher.paint_from_cache(stale_after=0)
+        core.bottom_grid_manager.update_net_value()
+
+    def refresh_pnl_summary(self):
+        """Show 24h and 7d net value change from the P&L history, refreshed every 30 seconds."""
+        history = self.core_initializer.pnl_history
+        parts = []
+        for label, period in (("24H", 86400), ("7D", 7 * 86400)):
+            change = history.change("net_value", period)
+            if change is not None:
+                parts.append(f"{label} {'+' if change >= 0 else '-'}{format_money(abs(change))}")
+        self.core_initializer.bottom_grid_manager.set_summary("pnl", "   ".join(parts))
+        self.root.after(30000, self.refresh_pnl_summary)
+
+    def show_vault_menu(self, event):
+        """Pop up the list of vaults (F2); the active one is ticked."""
+        vault_manager = self.core_initializer.vault_manager
+        menu = tk.Menu(self.root, tearoff=0, font=("Arial", 16))
+        for name in vault_manager.names():
+            label = f"✓ {name}" if vault_manager.active and vault_manager.active.name == name else f"   {name}"
+            menu.add_command(label=label, command=partial(self.open_vault, name))
+        menu.add_separator()
+        menu.add_command(label="New vault...", command=self.create_vault)
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def show_alert_menu(self, event):
+        """Pop up the alert rules of the active vault (F3); picking one removes it."""
+        alert_engine = self.core_initializer.alert_engine
+        menu = tk.Menu(self.root, tearoff=0, font=("Arial", 16))
+        for rule in alert_engine.rules.values():
+            menu.add_command(label=f"✕ {rule.describe()}", command=partial(self.remove_alert, rule.rule_id))
+        menu.add_separator()
+        menu.add_command(label="New alert...", command=self.create_alert)
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def create_alert(self):
+        text = simpledialog.askstring(
+            "New alert", "e.g. BTCUSDT price above 70000, ETHUSDT profit below -200,\n"
+                         "SOLUSDT price move 5%, net_value below 1000", parent=self.root
+        )
+        if not text:
+            return
+        try:
+            self.core_initializer.alert_engine.create_rule(text)
+        except ValueError as e:
+            logger.warning("Could not create alert: %s", e)
+            return
+        self.core_initializer.save_alerts()
+
+    def remove_alert(self, rule_id):
+        self.core_initializer.alert_engine.remove_rule(rule_id)
+        self.core_initializer.save_alerts()
+
+    def show_positions_menu(self, event):
+        """Pop up position import/export (F5)."""
+        menu = tk.Menu(self.root, tearoff=0, font=("Arial", 16))
+        menu.add_command(label="Import positions...", command=self.import_positions)
+        menu.add_command(label="Export positions...", command=self.export_positions)
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def import_positions(self):
+        path = filedialog.askopenfilename(
+            parent=self.root, title="Import positions",
+            filetypes=(("Exports", "*.csv *.json *.jsonl"), ("All files", "*.*"))
+        )
+        if not path:
+            return
+        core = self.core_initializer
+        try:
+            result = core.import_positions(path)
+        except (OSError, ValueError) as e:
+            logger.error("Could not import positions: %s", e)
+            return
+        logger.info("Imported %s", result.summary())
+        core.middle_grid_manager.refresh_entries()
+        core.price_fetcher.paint_from_cache()
+        core.bottom_grid_manager.update_net_value()
+
+    def export_positions(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title="Export positions", defaultextension=".csv",
+            filetypes=(("CSV", "*.csv"), ("JSON Lines", "*.jsonl"))
+        )
+        if not path:
+            return
+        try:
+            count = self.core_initializer.export_positions(path)
+        except (OSError, ValueError) as e:
+            logger.error("Could not export positions: %s", e)
+            return
+        logger.info("Exported %d positions to %s", count, path)
+
+    def run_scenarios(self, event=None):
+        """Ask for price shocks (F6) and show the net value each scenario would leave, without touching the grid."""
+        text = simpledialog.askstring(
+            "What if", "e.g. BTC -30%, alts -50%; all -20%; ETHUSDT +10%\n"
+                       "(';' separates scenarios; targets are symbols, base assets, alts, stables or all)",
+            parent=self.root
+        )
+        if not text:
+            return
+        try:
+            scenarios = parse_scenarios(text)
+        except ValueError as e:
+            messagebox.showerror("What if", str(e), parent=self.root)
+            return
+        core = self.core_initializer
+        deposited_value = core.reporting_deposit()
+        if deposited_value is None:
+            messagebox.showerror("What if", f"No rate yet to value the deposit in {core.reporting_currency}",
+                                 parent=self.root)
+            return
+        engine = ScenarioEngine.from_updater(core.price_fetcher.price_updater, deposited_value)
+        result = engine.evaluate([{}] + scenarios)  # Unshocked first, as the baseline
+        prefix = core.price_fetcher.price_updater.currency_prefix
+        baseline = float(result.net_value[0])
+        lines = [f"Now: {format_money(baseline, prefix)}"]
+        labels = [part.strip() for part in text.split(";") if part.strip()]
+        for label, net_value in zip(labels, result.net_value[1:].tolist()):
+            change = net_value - baseline
+            lines.append(f"{label}: {format_money(net_value, prefix)} "
+                         f"({'+' if change >= 0 else '-'}{format_money(abs(change), prefix)})")
+        messagebox.showinfo("What if", "\n".join(lines), parent=self.root)
+
+    def record_trade(self, event=None):
+        """Record a buy or sell (F7) against the position's lots; invested becomes the open cost basis."""
+        text = simpledialog.askstring(
+            "Record trade", "e.g. BUY 0.5 BTCUSDT @ 60000 fee 5 wallet TREZOR\n"
+                            "     SELL 0.2 BTCUSDT @ 70000", parent=self.root
+        )
+        if not text:
+            return
+        core = self.core_initializer
+        try:
+            ledger = core.record_trade(text)
+        except ValueError as e:
+            messagebox.showerror("Record trade", str(e), parent=self.root)
+            return
+        logger.info("Recorded %s: %g held, break even %g, realized %.2f", text.strip(), ledger.open_quantity,
+                    ledger.break_even(), ledger.realized)
+        core.middle_grid_manager.refresh_entries()
+        core.price_fetcher.paint_from_cache()
+        core.bottom_grid_manager.update_net_value()
+        self.show_realized_profit()
+
+    def show_realized_profit(self):
+        realized = self.core_initializer.lot_book.realized()
+        prefix = self.core_initializer.price_fetcher.price_updater.currency_prefix
+        text = f"REALIZED {'-' if realized < 0 else ''}{format_money(abs(realized), prefix)}" if realized else ""
+        self.core_initializer.bottom_grid_manager.set_summary("realized", text)
+
+    def create_vault(self):
+        name = simpledialog.askstring("New vault", "Vault name:", parent=self.root)
+        if not name:
+            return
+        try:
+            vault = self.core_initializer.vault_manager.create(name)
+        except ValueError as e:
+            logger.warning("Could not create vault: %s", e)
+            return
+        self.open_vault(vault.name)
+
+    def open_vault(self, name):
+        core = self.core_initializer
+        if not core.open_vault(name):
+            return
+        core.middle_grid_manager.refresh_entries()
+        core.bottom_grid_manager.deposited_entry.delete(0, tk.END)
+        core.bottom_grid_manager.deposited_entry.insert(0, format_deposit(core.entry_data_bottom.get("row_1_column_6", 0.0)))
+        core.price_fetcher.paint_from_cache()  # Prices come from the shared cache, no extra requests
+        core.bottom_grid_manager.update_net_value()
+        self.show_realized_profit()
+
+    def create_wallet_panel(self):
+        # F4 toggles the per-wallet breakdown; it redraws after each sweep only while shown
+        price_fetcher = self.core_initializer.price_fetcher
+        self.wallet_panel = WalletBreakdownPanel(
+            self.root, price_fetcher.price_updater.wallet_aggregates, self.core_initializer.wallet_colors,
+            price_fetcher.price_updater.currency_prefix, width=self.core_initializer.screen_width / 2
+        )
+        self.root.bind("<F4>", self.wallet_panel.toggle)
+        price_fetcher.add_valuation_listener(lambda valuation: self.root.after(0, self.wallet_panel.refresh))
+
+    def create_gmt_view(self):
+        # Built up front and hidden, so switching modes is a single place/place_forget
+        button_handler = self.core_initializer.config.button_handler
+        net_value_label = self.core_initializer.bottom_grid_manager.net_value_label
+        gmt_view = GMTModeView(
+            self.root, self.core_initializer.screen_width, self.core_initializer.screen_height,
+            self.core_initializer.strip_height, button_handler.dashboard_mode, button_handler.exit_program,
+            summary_source=lambda: net_value_label.cget("text")
+        )
+        button_handler.set_gmt_view(gmt_view)
 
     def start_fetching_prices(self):
         threading.Thread(target=self.core_initializer.price_fetcher.start_fetching_prices, daemon=True).start()
@@ -0,0 +1,132 @@
+import time
+from functools import lru_cache
+
+# Decimal places per magnitude tier, shared by price and amount formatting
+PRICE_TIERS = ((1, 2), (0.01, 3), (0.001, 4), (0.0001, 5), (0.00001, 6), (0.000001, 7), (0.0000001, 8))
+MAX_DECIMALS = 8
+
+# Format specs are built once per precision instead of on every call
+GROUPED_SPECS = tuple(f",.{decimals}f" for decimals in range(MAX_DECIMALS + 1))
+PLAIN_SPECS = tuple(f".{decimals}f" for decimals in range(MAX_DECIMALS + 1))
+
+# Everything format_* may add around a number, removed in a single translate pass when parsing
+_STRIP_TABLE = str.maketrans("", "", "$,€£¥ ~")
+_TEXT_PREFIXES = ("DEPOSITED", "NET VALUE -", "Rp")
+
+
+def tier_decimals(value):
+    """Decimal places for a value's magnitude, or None when it is below the smallest tier."""
+    if value >= 1:  # Fast path, most prices and every balance
+        return 2
+    for threshold, decimals in PRICE_TIERS[1:]:
+        if value >= threshold:
+            return decimals
+    return None
+
+
+@lru_cache(maxsize=4096)
+def format_price(raw_price):
+    """Price cell text without the currency symbol, None below the smallest tier."""
+    decimals = tier_decimals(raw_price)
+    if decimals is None:
+        return None
+    rounded = round(raw_price, decimals)
+    return format(rounded, GROUPED_SPECS[2] if rounded >= 1 else PLAIN_SPECS[2])
+
+
+@lru_cache(maxsize=4096)
+def format_trimmed(value, decimals=MAX_DECIMALS, symbol=""):
+    """Grouped number with trailing zeros and a dangling decimal point removed."""
+    return symbol + format(value, GROUPED_SPECS[decimals]).rstrip("0").rstrip(".")
+
+
+@lru_cache(maxsize=4096)
+def format_threshold(value):
+    """Trimmed number using as many decimals as the value's magnitude tier needs."""
+    decimals = tier_decimals(value)
+    return format_trimmed(value, MAX_DECIMALS if decimals is None else decimals)
+
+
+def format_money(value, symbol="$", decimals=2):
+    return symbol + format(value, GROUPED_SPECS[decimals])
+
+
+def format_whole_or_cents(value, prefix="$"):
+    """Whole numbers without decimals, everything else with cents."""
+    if float(value).is_integer():
+        return f"{prefix}{int(value):,}"
+    return prefix + format(value, GROUPED_SPECS[2])
+
+
+@lru_cache(maxsize=4096)
+def parse_number(text, default=0.0):
+    """Inverse of the format_* helpers: reads back any text they produce, default when it isn't a number."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    text = str(text).strip()
+    for prefix in _TEXT_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    text = text.translate(_STRIP_TABLE)
+    if not text:
+        return default
+    try:
+        return float(text)
+    except ValueError:
+        return default
+
+
+def _legacy_format_price(raw_price):
+    for threshold, decimals in PRICE_TIERS:
+        if raw_price >= threshold:
+            truncated_price = round(raw_price, decimals)
+            return f"{truncated_price:,.2f}" if truncated_price >= 1 else f"{truncated_price:.2f}"
+    return None
+
+
+def _legacy_apply_decimal_threshold(value):
+    for threshold_value, decimals in PRICE_TIERS:
+        if value >= threshold_value:
+            formatted_value = f"{value:,.{decimals}f}"
+            return formatted_value.rstrip('0').rstrip('.')
+    return f"{value:,.8f}".rstrip('0').rstrip('.')
+
+
+def _legacy_parse(value):
+    try:
+        value = str(value).strip().replace('$', '').replace(',', '')
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def benchmark(count=200_000, distinct=500):
+    """Compare the cached formatters with the per-call implementations they replaced.
+
+    The value stream repeats `distinct` values, which is what a grid re-rendering between ticks sees.
+    """
+    values = [((index * 7919) % distinct + 1) * 0.73 for index in range(count)]
+    texts = [f"${value:,.2f}" for value in values]
+    cases = (
+        ("format_price", _legacy_format_price, format_price, values),
+        ("apply_decimal_threshold", _legacy_apply_decimal_threshold, format_threshold, values),
+        ("parse", _legacy_parse, parse_number, texts),
+    )
+    print(f"{'function':<24} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    for name, legacy, current, inputs in cases:
+        for function in (format_price, format_threshold, format_trimmed, parse_number):
+            function.cache_clear()
+        start = time.perf_counter()
+        for value in inputs:
+            legacy(value)
+        legacy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for value in inputs:
+            current(value)
+        current_ms = (time.perf_counter() - start) * 1000
+        print(f"{name:<24} {legacy_ms:>10.1f} {current_ms:>10.1f} {legacy_ms / current_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,261 @@
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from price_sources import normalize_symbol
+
+
+class BucketSeries:
+    """Open/high/low/close buckets of one series at one resolution, oldest first, capped at retention."""
+
+    RECORD = struct.Struct("<ddddd")  # bucket start, open, high, low, close
+
+    def __init__(self, step, retention):
+        self.step = step
+        self.retention = retention
+        self.starts = array("d")
+        self.opens = array("d")
+        self.highs = array("d")
+        self.lows = array("d")
+        self.closes = array("d")
+        self.written = 0  # Buckets already in the file
+        self.last_written = None  # Last bucket as it was written; it may have changed since if it was still open
+        self.compact = False  # The file holds trimmed buckets and is rewritten on the next flush
+        self.trims = 0  # Bumped on every trim, so a write planned before one isn't marked as current
+
+    def add(self, timestamp, value):
+        start = timestamp - timestamp % self.step
+        if self.starts and self.starts[-1] == start:
+            self.highs[-1] = max(self.highs[-1], value)
+            self.lows[-1] = min(self.lows[-1], value)
+            self.closes[-1] = value
+            return
+        if self.starts and start < self.starts[-1]:
+            return  # Out-of-order sample, buckets only grow forwards
+        for column, item in zip(self._columns(), (start, value, value, value, value)):
+            column.append(item)
+        # Trim in chunks so the arrays aren't shifted on every new bucket
+        excess = len(self.starts) - self.retention
+        if excess >= max(self.retention // 10, 1):
+            for column in self._columns():
+                del column[:excess]
+            self.written = max(self.written - excess, 0)
+            self.compact = True
+            self.trims += 1
+
+    def covers(self, timestamp):
+        return bool(self.starts) and self.starts[0] <= timestamp
+
+    def range(self, start, end):
+        """[(bucket start, close)] for buckets starting in [start, end]."""
+        first = bisect_left(self.starts, start - start % self.step)
+        last = bisect_right(self.starts, end)
+        return list(zip(self.starts[first:last], self.closes[first:last]))
+
+    def value_at(self, timestamp):
+        """Close of the bucket containing timestamp (or the latest one before it)."""
+        position = bisect_right(self.starts, timestamp) - 1
+        return self.closes[position] if position >= 0 else None
+
+    def to_bytes(self, first=0):
+        return self._pack(max(first, len(self.starts) - self.retention, 0))
+
+    def pending_write(self):
+        """(offset, data, state): bytes to write at offset in the file, or the whole file when offset is None.
+
+        The last bucket written is written over in place if it changed since, e.g. it was still open, so
+        the file holds each bucket once. Pass state to mark_written once the write succeeded.
+        """
+        state = (len(self.starts), self._record(-1) if self.starts else None, self.trims)
+        if self.compact:
+            return None, self.to_bytes(), state
+        first = self.written
+        if first and self.last_written != self._record(first - 1):
+            first -= 1
+        return first * self.RECORD.size, self._pack(first), state
+
+    def mark_written(self, state):
+        written, last_written, trims = state
+        if trims != self.trims:
+            return  # Trimmed since the write was planned, compact stays set and the next flush rewrites
+        self.written = written
+        self.last_written = last_written
+        self.compact = False
+
+    def load_bytes(self, data):
+        records = 0
+        for record in self.RECORD.iter_unpack(data[:len(data) - len(data) % self.RECORD.size]):
+            records += 1
+            if self.starts and record[0] <= self.starts[-1]:
+                if record[0] == self.starts[-1]:
+                    for column, item in zip(self._columns(), record):
+                        column[-1] = item  # A later copy of a bucket that was still open when first written
+                continue
+            for column, item in zip(self._columns(), record):
+                column.append(item)
+        excess = len(self.starts) - self.retention
+        if excess > 0:
+            for column in self._columns():
+                del column[:excess]
+        self.written = len(self.starts)
+        self.last_written = self._record(self.written - 1) if self.starts else None
+        self.compact = records > self.written  # Repeated or trimmed buckets, rewrite the file compacted
+
+    def _pack(self, first):
+        return b"".join(self.RECORD.pack(*record) for record in zip(*(column[first:] for column in self._columns())))
+
+    def _record(self, position):
+        return tuple(column[position] for column in self._columns())
+
+    def _columns(self):
+        return self.starts, self.opens, self.highs, self.lows, self.closes
+
+
+class PnLHistory:
+    """Downsampled on-disk history of portfolio and per-position values.
+
+    Every sample goes into 1m, 1h and 1d buckets at once, each with a bounded retention, so raw ticks
+    are never kept. Range queries bisect the finest resolution that reaches back far enough without
+    exceeding max_points. A flush writes only the buckets that changed, overwriting the still-open
+    last bucket in place; a file is rewritten only once its series has trimmed old buckets, or at load
+    when it holds repeats.
+    """
+
+    RESOLUTIONS = (("1m", 60, 2 * 24 * 60), ("1h", 3600, 120 * 24), ("1d", 86400, 5 * 365))
+
+    def __init__(self, directory, clock=time.time, flush_interval=60.0):
+        self.directory = directory
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.last_flush = clock()
+        self.series = {}  # name -> {resolution label: BucketSeries}
+        self.dirty = set()
+        self.lock = threading.Lock()
+        self.load()
+
+    def _new_series(self):
+        return {label: BucketSeries(step, retention) for label, step, retention in self.RESOLUTIONS}
+
+    def record(self, name, value, timestamp=None):
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self.lock:
+            buckets = self.series.get(name)
+            if buckets is None:
+                buckets = self.series[name] = self._new_series()
+            for series in buckets.values():
+                series.add(timestamp, value)
+            self.dirty.add(name)
+
+    def record_many(self, values, timestamp=None):
+        timestamp = self.clock() if timestamp is None else timestamp
+        for name, value in values.items():
+            self.record(name, value, timestamp)
+
+    def record_valuation(self, valuation, entry_data, deposited_value=0.0, timestamp=None):
+        """Record portfolio totals and per-symbol profit from a Valuation, flushing every flush_interval.
+
+        deposited_value is in the valuation's currency; net value is skipped while it is None (no rate).
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        values = {
+            "total_profit": valuation.total_profit,
+            "total_balance": valuation.total_balance,
+        }
+        if deposited_value is not None:
+            values["net_value"] = valuation.total_profit - deposited_value
+        for row in valuation.counted.nonzero()[0].tolist():
+            symbol = normalize_symbol(str(entry_data.get(f"row_{row}_name", "")))
+            if symbol:
+                key = f"profit.{symbol}"
+                values[key] = values.get(key, 0.0) + float(valuation.profit[row])
+        self.record_many(values, timestamp)
+        if timestamp - self.last_flush >= self.flush_interval:
+            self.last_flush = timestamp
+            self.flush()
+
+    def query(self, name, start, end=None, max_points=2000):
+        """[(timestamp, value)] between start and end from the finest resolution within max_points."""
+        end = self.clock() if end is None else end
+        with self.lock:
+            buckets = self.series.get(name)
+            if buckets is None:
+                return []
+            now = self.clock()
+            for label, step, retention in self.RESOLUTIONS:
+                # Finest resolution whose retention window reaches back to start
+                if now - step * retention <= start and (end - start) / step <= max_points:
+                    return buckets[label].range(start, end)
+            return buckets[self.RESOLUTIONS[-1][0]].range(start, end)
+
+    def value_at(self, name, timestamp):
+        with self.lock:
+            buckets = self.series.get(name)
+            if buckets is None:
+                return None
+            for label, _, _ in self.RESOLUTIONS:
+                if buckets[label].covers(timestamp):
+                    return buckets[label].value_at(timestamp)
+            return None
+
+    def change(self, name, period, now=None):
+        """Value now minus value `period` seconds ago, or None without enough history."""
+        now = self.clock() if now is None else now
+        current = self.value_at(name, now)
+        previous = self.value_at(name, now - period)
+        if current is None or previous is None:
+            return None
+        return current - previous
+
+    def flush(self):
+        """Write the buckets changed since the last flush; files holding trimmed buckets are rewritten.
+
+        A series that fails to write stays dirty, so the next flush tries it again.
+        """
+        with self.lock:
+            names, self.dirty = self.dirty, set()
+            pending = [(name, label, series, *series.pending_write())
+                       for name in names for label, series in self.series[name].items()]
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, label, series, offset, data, state in pending:
+                self._write(self._path(name, label), offset, data)
+                with self.lock:
+                    series.mark_written(state)
+        except BaseException:
+            with self.lock:
+                self.dirty.update(names)
+            raise
+
+    @staticmethod
+    def _write(path, offset, data):
+        if offset is None:
+            temporary_path = path + ".tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, path)
+        elif data:
+            with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+                file.seek(offset)
+                file.write(data)
+                file.truncate()  # Drops a torn record a crash may have left past the last bucket
+
+    def load(self):
+        if not os.path.isdir(self.directory):
+            return
+        labels = {label for label, _, _ in self.RESOLUTIONS}
+        for file_name in os.listdir(self.directory):
+            name, _, label = file_name[:-len(".bin")].rpartition("@")
+            if not file_name.endswith(".bin") or label not in labels:
+                continue
+            with open(os.path.join(self.directory, file_name), "rb") as file:
+                data = file.read()
+            series = self.series.setdefault(name, self._new_series())[label]
+            series.load_bytes(data)
+            if series.compact:
+                self.dirty.add(name)
+
+    def _path(self, name, label):
+        return os.path.join(self.directory, f"{name}@{label}.bin")
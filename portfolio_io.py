@@ -0,0 +1,292 @@
+import csv
+import itertools
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from number_format import format_money, format_trimmed, parse_number
+from price_sources import normalize_symbol
+
+ROWS = 30
+
+# Header aliases, lower-cased, seen in Binance trade history exports and common wallet exports
+SYMBOL_FIELDS = ("pair", "market", "symbol", "coin pair")
+ASSET_FIELDS = ("coin", "asset", "currency")
+SIDE_FIELDS = ("side", "type")
+QUANTITY_FIELDS = ("executed", "amount", "quantity", "qty", "holdings", "balance")
+TOTAL_FIELDS = ("total", "quote amount", "invested", "cost")
+FEE_FIELDS = ("fee",)
+FEE_ASSET_FIELDS = ("fee coin", "fee asset")
+WALLET_FIELDS = ("wallet", "account")
+TIME_FIELDS = ("date(utc)", "date (utc)", "date", "time", "timestamp")
+
+# An exponent needs digits after the "e", so the E of ETH, EOS or EUR stays with the asset
+_AMOUNT_WITH_ASSET = re.compile(r"^\s*([-+]?[0-9.,]*[0-9](?:[eE][-+]?[0-9]+)?)\s*([A-Za-z]*)\s*$")
+
+
+class ImportResult:
+    def __init__(self):
+        self.lines = 0
+        self.skipped = 0
+        self.positions = {}  # (symbol, wallet) -> [invested, holdings]
+        self.unknown_symbols = set()
+
+    def summary(self):
+        text = f"{self.lines} lines, {len(self.positions)} positions"
+        if self.skipped:
+            text += f", {self.skipped} lines skipped"
+        if self.unknown_symbols:
+            text += f", unknown symbols: {', '.join(sorted(self.unknown_symbols))}"
+        return text
+
+
+def iter_records(path):
+    """Yield one dict per line of a CSV, JSON Lines or JSON array file without loading it whole."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        if extension == ".csv":
+            yield from csv.DictReader(file)
+        elif extension == ".jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == ".json":
+            yield from _iter_json_array(file)
+        else:
+            raise ValueError(f"Unsupported import format: {extension or path}")
+
+
+def _iter_json_array(file, chunk_size=1 << 16):
+    """Stream the objects of a top-level JSON array (or of the first array value of a top-level object)."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size)
+    start = buffer.find("[")
+    while start < 0:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+        start = buffer.find("[")
+    buffer = buffer[start + 1:]
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                if buffer.strip():
+                    raise ValueError("Truncated JSON array")
+                return
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+
+
+def normalize_record(record):
+    return {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+
+
+def _first(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _amount(text):
+    """(number, asset) from "0.5", "0.5BTC" or "1,234.5 USDT"; asset is "" when not given."""
+    if isinstance(text, (int, float)):
+        return float(text), ""
+    match = _AMOUNT_WITH_ASSET.match(str(text or ""))
+    if not match:
+        return None, ""
+    return parse_number(match.group(1), None), match.group(2).upper()
+
+
+def parse_record(record, default_quote="USDT"):
+    """Turn one normalized line into (symbol, wallet, side, quantity, total, fee, fee asset), None if unusable.
+
+    Trade lines have a side; position lines (wallet exports) don't and give holdings and invested.
+    """
+    wallet = str(_first(record, WALLET_FIELDS) or "").strip().upper()
+    symbol = _first(record, SYMBOL_FIELDS)
+    if symbol is None:
+        asset = _first(record, ASSET_FIELDS)
+        if asset is None:
+            return None
+        symbol = f"{asset}{default_quote}"
+    symbol = normalize_symbol(str(symbol))
+    side = str(_first(record, SIDE_FIELDS) or "").strip().upper()
+    if record.get("executed") not in (None, ""):
+        # Newer Binance trade history: Executed is the base quantity and Amount the quote total
+        quantity, _ = _amount(record["executed"])
+        total, _ = _amount(_first(record, ("amount",) + TOTAL_FIELDS) or 0)
+    else:
+        quantity, _ = _amount(_first(record, QUANTITY_FIELDS))
+        total, _ = _amount(_first(record, TOTAL_FIELDS) or 0)
+    if not symbol or quantity is None or total is None:
+        return None
+    fee, fee_asset = _amount(_first(record, FEE_FIELDS) or 0)
+    fee_asset = str(_first(record, FEE_ASSET_FIELDS) or fee_asset).strip().upper()
+    return symbol, wallet, side, quantity, total, fee or 0.0, fee_asset
+
+
+def record_time(record):
+    """Sort key from a line's date or time column (ISO text or an epoch number), None without one."""
+    value = _first(record, TIME_FIELDS)
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        moment = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return parse_number(str(value), None)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # Binance exports are in UTC
+    return moment.timestamp()
+
+
+def in_time_order(timed_lines):
+    """Parsed lines oldest first when every usable line has a time, otherwise in file order.
+
+    Binance trade history exports are newest first, and a sell before its buys would be clamped away.
+    Files without a time column are still streamed; timed ones are held as parsed tuples to sort them.
+    """
+    lines = iter(timed_lines)
+    first = next(lines, None)
+    if first is None:
+        return iter(())
+    if first[0] is None and first[1] is not None:
+        return itertools.chain((first[1],), (parsed for _, parsed in lines))
+    buffered = [first, *lines]
+    if all(time is not None for time, parsed in buffered if parsed is not None):
+        buffered.sort(key=lambda line: line[0] if line[0] is not None else float("-inf"))
+    return (parsed for _, parsed in buffered)
+
+
+def aggregate(parsed_lines, result):
+    """Fold trade and position lines into result.positions at average cost; memory grows per position only."""
+    positions = result.positions
+    for parsed in parsed_lines:
+        result.lines += 1
+        if parsed is None:
+            result.skipped += 1
+            continue
+        symbol, wallet, side, quantity, total, fee, fee_asset = parsed
+        position = positions.setdefault((symbol, wallet), [0.0, 0.0])
+        if side in ("BUY", "B"):
+            # Fees paid in the base asset shrink the position, fees in the quote asset add to its cost;
+            # fees in a third asset (e.g. BNB) can't be priced here and are left out
+            position[0] += total + (fee if fee_asset and symbol.endswith(fee_asset) else 0.0)
+            position[1] += quantity - (fee if fee_asset and symbol.startswith(fee_asset) else 0.0)
+        elif side in ("SELL", "S"):
+            if position[1] > 0:
+                position[0] -= position[0] * min(quantity / position[1], 1.0)
+            position[1] = max(position[1] - quantity, 0.0)
+        elif not side:
+            position[0] += total
+            position[1] += quantity
+        else:
+            result.skipped += 1
+    return result
+
+
+def import_positions(path, known_symbols=None, default_quote="USDT"):
+    """Stream a CSV/JSON export into {(symbol, wallet): [invested, holdings]}.
+
+    Lines are folded oldest first when the file has a time column. known_symbols (e.g. the cached
+    exchange symbol table) is checked once per distinct symbol after aggregation; positions on unknown
+    symbols are dropped and reported.
+    """
+    records = (normalize_record(record) for record in iter_records(path))
+    timed_lines = ((record_time(record), parse_record(record, default_quote)) for record in records)
+    result = aggregate(in_time_order(timed_lines), ImportResult())
+    for symbol, wallet in list(result.positions):
+        invested, holdings = result.positions[(symbol, wallet)]
+        if holdings <= 0:
+            del result.positions[(symbol, wallet)]  # Fully sold
+        elif known_symbols and symbol not in known_symbols:
+            result.unknown_symbols.add(symbol)
+            del result.positions[(symbol, wallet)]
+    return result
+
+
+def merge_positions(entry_data, positions):
+    """New entry data with the positions written into their matching rows, or the first empty ones.
+
+    Nothing is changed when the positions don't fit in the grid, so the caller can commit the result
+    in one write.
+    """
+    merged = dict(entry_data)
+    rows = {}
+    free_rows = []
+    for row in range(ROWS):
+        name = normalize_symbol(str(merged.get(f"row_{row}_name", "")))
+        wallet = str(merged.get(f"row_{row}_column_8_middle", "")).strip().upper()
+        if name:
+            rows.setdefault((name, wallet), row)
+        else:
+            free_rows.append(row)
+    new_positions = [key for key in positions if key not in rows]
+    if len(new_positions) > len(free_rows):
+        raise ValueError(f"Import needs {len(new_positions)} empty rows but only {len(free_rows)} are free")
+    for key, row in zip(new_positions, free_rows):
+        rows[key] = row
+    for (symbol, wallet), (invested, holdings) in positions.items():
+        row = rows[(symbol, wallet)]
+        merged[f"row_{row}_name"] = symbol
+        merged[f"row_{row}_column_8_middle"] = wallet
+        # Same formats EntryFormatter and EntryHandler.save_invested_and_holdings produce
+        merged[f"row_{row}_column_6"] = format_trimmed(invested, 8, "$")
+        merged[f"row_{row}_column_7"] = format_trimmed(holdings, 8, "")
+        merged[f"row_{row}_invested"] = format_money(invested)
+        merged[f"row_{row}_holdings"] = holdings
+    return merged
+
+
+def iter_positions(entry_data, price_lookup=None):
+    """Yield the grid's positions as export rows."""
+    for row in range(ROWS):
+        symbol = normalize_symbol(str(entry_data.get(f"row_{row}_name", "")))
+        if not symbol:
+            continue
+        holdings = parse_number(entry_data.get(f"row_{row}_holdings", 0))
+        invested = parse_number(entry_data.get(f"row_{row}_invested", 0))
+        price = price_lookup(symbol) if price_lookup is not None else None
+        yield {
+            "symbol": symbol,
+            "wallet": str(entry_data.get(f"row_{row}_column_8_middle", "")).strip().upper(),
+            "holdings": holdings,
+            "invested": invested,
+            "price": price,
+            "balance": price * holdings if price is not None else None,
+        }
+
+
+def export_positions(entry_data, path, price_lookup=None):
+    """Write the portfolio as CSV or JSON Lines, row by row, through a temporary file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".csv", ".jsonl"):
+        raise ValueError(f"Unsupported export format: {extension or path}")
+    temporary_path = path + ".tmp"
+    count = 0
+    with open(temporary_path, "w", encoding="utf-8", newline="") as file:
+        writer = None
+        for position in iter_positions(entry_data, price_lookup):
+            if extension == ".jsonl":
+                file.write(json.dumps(position) + "\n")
+            else:
+                if writer is None:
+                    writer = csv.DictWriter(file, fieldnames=list(position))
+                    writer.writeheader()
+                writer.writerow(position)
+            count += 1
+    os.replace(temporary_path, path)
+    return count
@@ -0,0 +1,253 @@
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+# Frame: kind (1 byte), topic length (2 bytes), payload length (4 bytes), topic, payload
+FRAME_HEADER = struct.Struct("<BHI")
+VALUE_PAYLOAD = struct.Struct("<dd")  # value, timestamp
+
+SUBSCRIBE = 1
+UNSUBSCRIBE = 2
+UPDATE = 3
+
+PRICE_TOPIC = "price."
+PORTFOLIO_TOPIC = "portfolio."
+
+
+def encode_frame(kind, topic, payload=b""):
+    topic_bytes = topic.encode("utf-8")
+    return FRAME_HEADER.pack(kind, len(topic_bytes), len(payload)) + topic_bytes + payload
+
+
+def _receive_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("price bus connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_frame(sock):
+    kind, topic_length, payload_length = FRAME_HEADER.unpack(_receive_exactly(sock, FRAME_HEADER.size))
+    topic = _receive_exactly(sock, topic_length).decode("utf-8")
+    payload = _receive_exactly(sock, payload_length) if payload_length else b""
+    return kind, topic, payload
+
+
+def parse_address(text):
+    """"host:port" becomes a TCP address, anything else is a Unix socket path."""
+    host, _, port = text.rpartition(":")
+    if host and port.isdigit() and os.sep not in text:
+        return host, int(port)
+    return text
+
+
+def _make_socket(address):
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # (host, port) where AF_UNIX is missing
+
+
+class _Subscriber:
+    """One connected consumer with a bounded, latest-value-per-topic outbox.
+
+    A new update for a topic that is still waiting replaces the older one, and when max_pending
+    topics are waiting the oldest is dropped, so a slow consumer only ever sees fresh values.
+    """
+
+    def __init__(self, sock, max_pending):
+        self.sock = sock
+        self.max_pending = max_pending
+        self.topics = set()
+        self.prefixes = ()
+        self.pending = OrderedDict()  # topic -> encoded frame
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def wants(self, topic):
+        return topic in self.topics or any(topic.startswith(prefix) for prefix in self.prefixes)
+
+    def subscribe(self, pattern):
+        if pattern.endswith("*"):
+            self.prefixes = tuple(set(self.prefixes) | {pattern[:-1]})
+        else:
+            self.topics.add(pattern)
+
+    def unsubscribe(self, pattern):
+        if pattern.endswith("*"):
+            self.prefixes = tuple(set(self.prefixes) - {pattern[:-1]})
+        else:
+            self.topics.discard(pattern)
+
+    def offer(self, topic, frame):
+        with self.condition:
+            if topic in self.pending:
+                self.dropped += 1  # Stale tick replaced by the newer one
+                del self.pending[topic]
+            elif len(self.pending) >= self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.pending[topic] = frame
+            self.condition.notify()
+
+    def drain(self):
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            frames = b"".join(self.pending.values())
+            self.pending.clear()
+            return frames
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class PriceBus:
+    """Local publish/subscribe bus so one fetch loop feeds any number of consumer processes.
+
+    Listens on a Unix socket path (or a (host, port) pair where Unix sockets are unavailable).
+    Subscribers ask for exact topics such as "price.BTCUSDT" or prefixes such as "price.*"; frames
+    are only encoded when at least one subscriber wants the topic.
+    """
+
+    def __init__(self, address, max_pending=256):
+        self.address = address
+        self.max_pending = max_pending
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.server = None
+        self.running = False
+
+    def start(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # Left behind by an instance that didn't shut down cleanly
+        self.server = _make_socket(self.address)
+        self.server.bind(self.address)
+        self.server.listen()
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="price-bus-accept", daemon=True).start()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                break
+            subscriber = _Subscriber(sock, self.max_pending)
+            with self.lock:
+                self.subscribers.append(subscriber)
+            threading.Thread(target=self._read_loop, args=(subscriber,), daemon=True).start()
+            threading.Thread(target=self._write_loop, args=(subscriber,), daemon=True).start()
+
+    def _read_loop(self, subscriber):
+        try:
+            while not subscriber.closed:
+                kind, topic, _ = read_frame(subscriber.sock)
+                if kind == SUBSCRIBE:
+                    subscriber.subscribe(topic)
+                elif kind == UNSUBSCRIBE:
+                    subscriber.unsubscribe(topic)
+        except (ConnectionError, OSError, struct.error):
+            pass
+        self._remove(subscriber)
+
+    def _write_loop(self, subscriber):
+        try:
+            while not subscriber.closed:
+                frames = subscriber.drain()
+                if frames:
+                    subscriber.sock.sendall(frames)
+        except OSError:
+            pass
+        self._remove(subscriber)
+
+    def _remove(self, subscriber):
+        subscriber.close()
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def publish(self, topic, value, timestamp=None):
+        with self.lock:
+            targets = [subscriber for subscriber in self.subscribers if subscriber.wants(topic)]
+        if not targets:
+            return
+        frame = encode_frame(UPDATE, topic, VALUE_PAYLOAD.pack(value, time.time() if timestamp is None else timestamp))
+        for subscriber in targets:
+            subscriber.offer(topic, frame)
+
+    def publish_prices(self, prices, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for symbol, price in prices.items():
+            self.publish(PRICE_TOPIC + symbol, price, timestamp)
+
+    def publish_valuation(self, valuation, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        self.publish(PORTFOLIO_TOPIC + "total_balance", valuation.total_balance, timestamp)
+        self.publish(PORTFOLIO_TOPIC + "total_invested", valuation.total_invested, timestamp)
+        self.publish(PORTFOLIO_TOPIC + "total_profit", valuation.total_profit, timestamp)
+
+    def close(self):
+        self.running = False
+        if self.server is not None:
+            try:
+                self.server.close()
+            except OSError:
+                pass
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+class PriceBusClient:
+    """Subscriber side of the bus for other Python processes.
+
+        client = PriceBusClient("/tmp/indovault.sock")
+        client.subscribe("price.BTCUSDT", "portfolio.*")
+        for topic, value, timestamp in client:
+            ...
+    """
+
+    def __init__(self, address, timeout=None):
+        self.sock = _make_socket(address)
+        self.sock.connect(address)
+        self.sock.settimeout(timeout)
+
+    def subscribe(self, *topics):
+        self.sock.sendall(b"".join(encode_frame(SUBSCRIBE, topic) for topic in topics))
+
+    def unsubscribe(self, *topics):
+        self.sock.sendall(b"".join(encode_frame(UNSUBSCRIBE, topic) for topic in topics))
+
+    def receive(self):
+        """Block until the next update and return (topic, value, timestamp)."""
+        while True:
+            kind, topic, payload = read_frame(self.sock)
+            if kind == UPDATE:
+                value, timestamp = VALUE_PAYLOAD.unpack(payload)
+                return topic, value, timestamp
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.receive()
+            except (ConnectionError, OSError):
+                return
+
+    def close(self):
+        self.sock.close()
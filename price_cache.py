@@ -0,0 +1,86 @@
+import os
+import struct
+import threading
+import time
+
+from price_sources import normalize_symbol
+
+# Persisted record: symbol (NUL padded), raw price, fetch time
+SNAPSHOT_RECORD = struct.Struct("<16sdd")
+
+
+class PriceCache:
+    """Latest raw price and fetch time per symbol, shared by every vault and view.
+
+    The fetch loop is the only writer; readers get plain tuples so they never hold the lock while
+    painting the grid.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._prices = {}  # symbol -> (price, timestamp)
+        self._lock = threading.Lock()
+
+    def update(self, prices, timestamp=None):
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self._lock:
+            for symbol, price in prices.items():
+                if price:
+                    self._prices[symbol] = (price, timestamp)
+
+    def get(self, symbol):
+        """Return (price, timestamp) for a symbol, or (None, None) when it has never been priced."""
+        with self._lock:
+            return self._prices.get(self.normalize(symbol), (None, None))
+
+    def price(self, symbol):
+        return self.get(symbol)[0]
+
+    def age(self, symbol):
+        timestamp = self.get(symbol)[1]
+        return None if timestamp is None else self.clock() - timestamp
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._prices)
+
+    def save(self, path):
+        """Write the last known prices as fixed-size binary records, swapped in atomically."""
+        records = b"".join(
+            SNAPSHOT_RECORD.pack(symbol.encode("ascii", "ignore")[:16], price, timestamp)
+            for symbol, (price, timestamp) in self.snapshot().items()
+        )
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(records)
+        os.replace(temporary_path, path)
+
+    def load(self, path, max_age=None):
+        """Fill in prices saved by a previous run, keeping any newer ones; returns the number loaded.
+
+        Loaded entries keep their original fetch time, so age() tells a warm-start price from a live one.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return 0
+        now = self.clock()
+        loaded = 0
+        with self._lock:
+            for raw_symbol, price, timestamp in SNAPSHOT_RECORD.iter_unpack(data[:len(data) - len(data) % SNAPSHOT_RECORD.size]):
+                if not price or (max_age is not None and now - timestamp > max_age):
+                    continue
+                symbol = raw_symbol.rstrip(b"\0").decode("ascii", "ignore")
+                current = self._prices.get(symbol)
+                if current is None or current[1] < timestamp:
+                    self._prices[symbol] = (price, timestamp)
+                    loaded += 1
+        return loaded
+
+    def __len__(self):
+        return len(self._prices)
+
+    @staticmethod
+    def normalize(symbol):
+        return normalize_symbol(symbol)
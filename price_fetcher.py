@@ -1,13 +1,20 @@
+import logging
 from price_fetcher_worker import PriceFetcherWorker
 from progress_logger import ProgressLogger
 from price_updater import PriceUpdater
+from price_cache import PriceCache
+from price_sources import SymbolHealthTracker, normalize_symbol
 import threading
 import queue
 import time
 
+logger = logging.getLogger(__name__)
+
 
 class PriceFetcher:
-    def __init__(self, binance_api, entry_data, grid_manager, data_handler, root):
+    def __init__(self, binance_api, entry_data, grid_manager, data_handler, root, currency_graph=None,
+                 reporting_currency="USDT", price_engine=None, price_cache=None, watched_symbols=None,
+                 price_snapshot=None, price_bus=None, cycle_budget=4.0):
         self.binance_api = binance_api
         self.entry_data = entry_data
         self.grid_manager = grid_manager
@@ -16,10 +23,21 @@ class PriceFetcher:
         self.exit_flag = threading.Event()
         self.queue = queue.Queue()
         self.fetch_thread = None
-        self.worker = PriceFetcherWorker(self.binance_api, self.entry_data, self.grid_manager, self.queue)
+        self.currency_graph = currency_graph
+        self.price_cache = price_cache if price_cache is not None else PriceCache()
+        self.watched_symbols = watched_symbols  # Callable returning symbols of other open vaults
+        self.price_bus = price_bus
+        self.valuation_listeners = []  # Called from the fetch thread with each sweep's Valuation
+        self.cycle_budget = cycle_budget  # Seconds a sweep may wait on price sources before going stale
+        self.worker = PriceFetcherWorker(self.binance_api, self.entry_data, self.grid_manager, self.queue,
+                                         currency_graph=currency_graph, price_engine=price_engine,
+                                         price_snapshot=price_snapshot)
         self.logger = ProgressLogger()
+        self.symbol_health = SymbolHealthTracker()
+        self.unresolved_rows = 30  # Named rows the last sweep could neither price nor explain
 
-        self.price_updater = PriceUpdater(entry_data, grid_manager, root)
+        self.price_updater = PriceUpdater(entry_data, grid_manager, root, currency_graph=currency_graph,
+                                          reporting_currency=reporting_currency)
 
     def start_fetching_prices(self):
         if not self.fetch_thread or not self.fetch_thread.is_alive():
@@ -28,19 +46,8 @@ class PriceFetcher:
 
     def fetch_prices(self):
         while not self.exit_flag.is_set():
-            for row in range(30):
-                coin_name = self.entry_data.get(f"row_{row}_name", "").strip()
-                if coin_name:
-                    self.logger.total_attempts_last_minute += 1  # Increment the attempt count
-                    formatted_price, raw_price = self.worker.fetch_coin_price(coin_name)
-                    if formatted_price:
-                        self.logger.total_fetches_last_minute += 1  # Increment successful fetch count
-                        self.price_updater.update_price(row, formatted_price, raw_price)
-                    else:
-                        self.queue.put(('update_price', row, 2, "Invalid"))
-                else:
-                    self.queue.put(('update_price', row, 2, "Loading..."))
-            self.process_queue()
+            if not self.fetch_cycle():
+                break
             if self.all_prices_fetched():
                 self.short_cooldown()
             else:
@@ -50,8 +57,114 @@ class PriceFetcher:
                     time.sleep(0.1)
             self.logger.log_progress()
 
+    def fetch_cycle(self):
+        """Run one sweep: fetch, value and repaint every row. Returns False when cut short by exit."""
+        symbols = {normalize_symbol(self.entry_data.get(f"row_{row}_name", "").strip()) for row in range(30)}
+        if self.watched_symbols is not None:
+            symbols.update(self.watched_symbols())
+        # Negatively cached and circuit-broken symbols sit out until their re-check is due
+        requested = [symbol for symbol in symbols if symbol and self.symbol_health.should_request(symbol)]
+        engine_clock = self.worker.price_engine.clock
+        prices = self.worker.fetch_all_prices(  # One fan-out per sweep, abandoned on exit
+            requested, deadline=engine_clock() + self.cycle_budget, cancel_event=self.exit_flag
+        )
+        if self.exit_flag.is_set():
+            return False
+        if prices:
+            self.price_cache.update(prices)
+            if self.price_bus is not None:
+                self.price_bus.publish_prices(prices)
+            self.record_symbol_health(requested, prices)
+        updates = {}
+        stale_rows = set()
+        unresolved_rows = 0
+        for row in range(30):
+            coin_name = self.entry_data.get(f"row_{row}_name", "").strip()
+            if coin_name:
+                self.logger.total_attempts_last_minute += 1  # Increment the attempt count
+                formatted_price, raw_price = self.worker.lookup_price(coin_name, prices or {})
+                if formatted_price:
+                    self.logger.total_fetches_last_minute += 1  # Increment successful fetch count
+                    updates[row] = (formatted_price, raw_price)
+                    continue
+                symbol = normalize_symbol(coin_name)
+                reason = self.symbol_health.status(symbol)
+                if reason is None:
+                    unresolved_rows += 1
+                # Missed this sweep: keep showing the last known price, marked stale, unless delisted
+                raw_price = None if self.symbol_health.is_invalid(symbol) else self.price_cache.price(coin_name)
+                if raw_price is not None:
+                    updates[row] = (self.worker.format_price(raw_price), raw_price)
+                    stale_rows.add(row)
+                else:
+                    self.price_updater.clear_price(row)
+                    self.queue.put(('update_price', row, 2, reason or "Invalid"))
+            else:
+                self.price_updater.clear_price(row)
+                self.queue.put(('update_price', row, 2, "Loading..."))
+        self.unresolved_rows = unresolved_rows
+        if updates:
+            self.price_updater.update_prices(updates, stale_rows)  # Values the whole sweep in one kernel pass
+            if self.price_bus is not None:
+                self.price_bus.publish_valuation(self.price_updater.last_valuation)
+            self.notify_valuation_listeners(self.price_updater.last_valuation)
+        self.process_queue()
+        return True
+
+    def add_valuation_listener(self, listener):
+        self.valuation_listeners.append(listener)
+
+    def notify_valuation_listeners(self, valuation):
+        for listener in self.valuation_listeners:
+            try:
+                listener(valuation)
+            except Exception as e:
+                logger.exception("Error in valuation listener %s: %s", listener, e)
+
+    def paint_from_cache(self, stale_after=None):
+        """Value every row from cached prices right away, e.g. after switching vaults or at startup.
+
+        With stale_after set, prices older than that many seconds are marked stale until a sweep
+        replaces them.
+        """
+        updates = {}
+        stale_rows = set()
+        now = self.price_cache.clock()
+        for row in range(30):
+            coin_name = self.entry_data.get(f"row_{row}_name", "").strip()
+            raw_price, timestamp = self.price_cache.get(coin_name) if coin_name else (None, None)
+            if raw_price is not None:
+                updates[row] = (self.worker.format_price(raw_price), raw_price)
+                if stale_after is not None and now - timestamp > stale_after:
+                    stale_rows.add(row)
+            else:
+                self.price_updater.clear_price(row)
+                self.grid_manager.create_value_label(row, 2, "Loading...")
+        if updates:
+            self.price_updater.update_prices(updates, stale_rows)
+        else:
+            self.price_updater.update_total_profit()
+
+    def record_symbol_health(self, requested, prices):
+        """Sort this sweep's unpriced symbols into unlisted (negative cache) and failing (breaker).
+
+        With a source besides Binance configured, a symbol Binance doesn't list may still be priced
+        there, so a miss only counts towards its breaker.
+        """
+        known_symbols = self.binance_api.known_symbols() if self.binance_api is not None else set()
+        if self.worker.price_engine.has_unlisted_sources():
+            known_symbols = set()
+        for symbol in requested:
+            if symbol in prices:
+                self.symbol_health.record_priced(symbol)
+            elif known_symbols and symbol not in known_symbols:
+                self.symbol_health.record_invalid(symbol)
+            else:
+                self.symbol_health.record_failure(symbol)
+
     def all_prices_fetched(self):
-        return all(self.entry_data.get(f"row_{row}_price", "") != "" for row in range(30))
+        # Empty rows and symbols known to be bad don't hold the loop back from the short cooldown
+        return self.unresolved_rows == 0
 
     def short_cooldown(self):
         for _ in range(5):
@@ -71,5 +184,8 @@ class PriceFetcher:
 
     def stop_fetching_prices(self):
         self.exit_flag.set()
+        self.worker.price_engine.shutdown()
+        if self.price_bus is not None:
+            self.price_bus.close()
         if self.fetch_thread and self.fetch_thread.is_alive():
             self.fetch_thread.join(timeout=1.0)
@@ -1,36 +1,63 @@
+import logging
+from number_format import format_price
+from price_sources import BinancePriceSource, PriceSourceEngine, normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+
 class PriceFetcherWorker:
-    def __init__(self, binance_api, entry_data, grid_manager, queue):
+    def __init__(self, binance_api, entry_data, grid_manager, queue, currency_graph=None, price_engine=None,
+                 price_snapshot=None):
         self.binance_api = binance_api
         self.entry_data = entry_data
         self.grid_manager = grid_manager  # This will be passed in, no import necessary
         self.queue = queue
-        self.thresholds = [
-            (1, 2),
-            (0.01, 3),
-            (0.001, 4),
-            (0.0001, 5),
-            (0.00001, 6),
-            (0.000001, 7),
-            (0.0000001, 8),
-        ]
+        self.currency_graph = currency_graph
+        self.price_engine = price_engine or PriceSourceEngine([BinancePriceSource(binance_api)])
+        self.price_snapshot = price_snapshot  # SharedPriceSnapshot shared with other running instances
 
-    def fetch_coin_price(self, coin_name):
-        symbol = coin_name.upper().replace(" ", "")
-        try:
-            price = self.binance_api.client.get_symbol_ticker(symbol=symbol)
-            if price and 'price' in price:
-                raw_price = float(price['price'])
-                return self.format_price(raw_price), raw_price
-        except Exception as e:
-            print(f"Error fetching price for {coin_name}: {e}")
-        return None, None
+    def fetch_all_prices(self, symbols=(), deadline=None, cancel_event=None):
+        """Fetch prices from every source in one fan-out and refresh the currency graph rates from them."""
+        prices = self.fetch_shared_or_local(symbols, deadline, cancel_event)
+        if prices is None:
+            logger.error("Error fetching prices: no price source answered")
+            return None
+        if self.currency_graph is not None:
+            try:
+                self.currency_graph.load_exchange_info(self.binance_api.get_exchange_info())
+            except Exception as e:
+                logger.error("Error loading exchange info: %s", e)
+            self.currency_graph.update_prices(prices)
+        return prices
 
-    def format_price(self, raw_price):
-        for threshold, decimals in self.thresholds:
-            if raw_price >= threshold:
-                return self.truncate_price(raw_price, decimals)
-        return None
+    def fetch_shared_or_local(self, symbols, deadline=None, cancel_event=None):
+        """Read prices from the shared snapshot when another instance is fetching, otherwise fetch them."""
+        snapshot = self.price_snapshot
+        if snapshot is None:
+            return self.price_engine.fetch(symbols, deadline, cancel_event)
+        if not snapshot.try_become_writer():
+            prices = snapshot.read_prices()
+            if prices is not None:
+                missing = [symbol for symbol in symbols if symbol not in prices]
+                if missing:
+                    # The writer doesn't keep these fresh (e.g. only this instance's vault holds them)
+                    local_prices = self.price_engine.fetch(missing, deadline, cancel_event)
+                    if local_prices:
+                        prices.update(local_prices)
+                return prices
+            # The writer stopped publishing but still holds the lock, fetch locally until it recovers
+            return self.price_engine.fetch(symbols, deadline, cancel_event)
+        prices = self.price_engine.fetch(symbols, deadline, cancel_event)
+        if prices:
+            snapshot.publish(prices)
+        return prices
+
+    def lookup_price(self, coin_name, prices):
+        """Return (formatted, raw) for a coin from a bulk price mapping."""
+        raw_price = prices.get(normalize_symbol(coin_name))
+        if raw_price is None:
+            return None, None
+        return self.format_price(raw_price), raw_price
 
-    def truncate_price(self, raw_price, decimals):
-        truncated_price = round(raw_price, decimals)
-        return f"{truncated_price:,.2f}" if truncated_price >= 1 else f"{truncated_price:.2f}"
+    def format_price(self, raw_price):
+        return format_price(raw_price)
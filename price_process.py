@@ -0,0 +1,228 @@
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+from api import BinanceAPI
+from price_snapshot import PriceSnapshotLayout
+from price_sources import BinancePriceSource, PriceSourceEngine
+
+logger = logging.getLogger(__name__)
+
+
+def build_price_engine(binance_api, options):
+    """The app's PriceSourceEngine: Binance first, then the extra REST sources from options."""
+    sources = [BinancePriceSource(binance_api)]
+    sources += PriceSourceEngine.parse_rest_sources(options.get("extra_sources", ""))
+    return PriceSourceEngine(sources, strategy=options.get("strategy", PriceSourceEngine.PRIORITY),
+                             hedge_after=options.get("hedge_after"))
+
+
+def create_engine(options):
+    """Default engine factory for the engine process; returns (binance_api, engine)."""
+    binance_api = BinanceAPI(options.get("api_key"), options.get("api_secret"))
+    return binance_api, build_price_engine(binance_api, options)
+
+
+def compact_exchange_info(exchange_info):
+    """Exchange info cut down to the fields CurrencyGraph, SymbolIndex and BinanceAPI read."""
+    return {"symbols": [
+        {key: symbol[key] for key in ("symbol", "baseAsset", "quoteAsset", "status") if key in symbol}
+        for symbol in exchange_info.get("symbols", [])
+    ]}
+
+
+def run_engine_process(shared_memory_name, capacity, connection, factory, options):
+    """Engine process main loop: fetch on request, write prices to shared memory, answer on the pipe.
+
+    Messages from the UI process are ("fetch", request id, symbols, budget seconds) and ("stop",).
+    Answers are ("done", request id, priced count or None) once the prices are in the shared table,
+    and ("exchange_info", compact info) whenever the cached exchange info was downloaded again.
+    """
+    # Spawned children share the UI process's resource tracker, which unlinks the block if both die
+    memory = shared_memory.SharedMemory(name=shared_memory_name)
+    layout = PriceSnapshotLayout(memory.buf, capacity)
+    binance_api, engine = factory(options)
+    sent_exchange_info = None
+    warned_capacity = False
+
+    def send_exchange_info():
+        nonlocal sent_exchange_info
+        if binance_api is None:
+            return
+        try:
+            exchange_info = binance_api.get_exchange_info()
+        except Exception as e:
+            connection.send(("error", f"Error loading exchange info: {e}"))
+            return
+        if exchange_info is not sent_exchange_info:
+            sent_exchange_info = exchange_info
+            connection.send(("exchange_info", compact_exchange_info(exchange_info)))
+
+    try:
+        send_exchange_info()
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break  # UI process is gone
+            if message[0] == "stop":
+                break
+            _, request_id, symbols, budget = message
+            prices = engine.fetch(symbols, deadline=engine.clock() + budget if budget else None)
+            if prices:
+                skipped = layout.write(prices, time.time(), os.getpid())
+                if skipped and not warned_capacity:
+                    warned_capacity = True
+                    connection.send(("error", f"Price table is full, {skipped} symbols left out; raise its capacity"))
+            connection.send(("done", request_id, None if prices is None else len(prices)))
+            send_exchange_info()  # After the answer, so an hourly download never delays prices
+    except (BrokenPipeError, ConnectionResetError, KeyboardInterrupt):
+        pass
+    finally:
+        engine.shutdown()
+        layout.release()
+        memory.close()
+
+
+class PriceEngineProcess:
+    """Runs the price engine in a separate, supervised process so the Tk process only renders.
+
+    Drop-in for PriceSourceEngine.fetch: each call sends the symbol list down a pipe, and the engine
+    process fetches, parses and writes the prices into a shared-memory PriceSnapshotLayout (symbol
+    slots behind a seqlock) before answering. The UI process copies the slots written for the
+    request. The process is restarted with a doubling backoff when it dies, closes the pipe or misses
+    max_missed deadlines in a row; fetch returns None meanwhile, which the fetch loop treats as a
+    failed sweep.
+    """
+
+    CANCEL_POLL = 0.1
+
+    def __init__(self, options=None, factory=create_engine, binance_api=None, capacity=8192, clock=time.monotonic,
+                 max_missed=3, base_backoff=1.0, max_backoff=60.0):
+        self.options = dict(options or {})
+        self.factory = factory
+        self.binance_api = binance_api
+        self.capacity = capacity
+        self.clock = clock
+        self.max_missed = max_missed
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.backoff = base_backoff
+        self.unlisted_sources = bool(PriceSourceEngine.parse_rest_sources(self.options.get("extra_sources", "")))
+        self.next_start = 0.0
+        self.restarts = 0
+        self.missed = 0
+        self.request_id = 0
+        self.process = None
+        self.connection = None
+        self.context = multiprocessing.get_context("spawn")  # Never fork a process that has Tk loaded
+        self.memory = shared_memory.SharedMemory(create=True, size=PriceSnapshotLayout.size_for(capacity))
+        self.layout = PriceSnapshotLayout(self.memory.buf, capacity)
+        self.layout.initialize(os.getpid())
+        if binance_api is not None:
+            # The engine process keeps this copy fresh, so the UI process never downloads it again itself
+            binance_api.exchange_info_max_age = float("inf")
+
+    def start(self):
+        parent_connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(
+            target=run_engine_process, name="price-engine", daemon=True,
+            args=(self.memory.name, self.capacity, child_connection, self.factory, self.options)
+        )
+        self.process.start()
+        child_connection.close()
+        self.connection = parent_connection
+        self.missed = 0
+
+    def ensure_running(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                return True
+            self.restart(f"exited with code {self.process.exitcode}")
+        if self.clock() < self.next_start:
+            return False
+        self.start()
+        return True
+
+    def restart(self, reason):
+        """Stop the engine process and schedule a new one after the current backoff."""
+        logger.warning("Price engine process %s, restarting in %gs", reason, self.backoff)
+        self.stop_process()
+        self.next_start = self.clock() + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+        self.restarts += 1
+
+    def stop_process(self):
+        if self.connection is not None:
+            try:
+                self.connection.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process is not None:
+            self.process.join(0.5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(0.5)
+            self.process = None
+        self.layout.recover(os.getpid())  # Reopen the seqlock if the process died mid-write
+
+    def fetch(self, symbols, deadline=None, cancel_event=None):
+        if not self.ensure_running():
+            return None
+        symbols = list(symbols)
+        self.request_id += 1
+        sent_at = time.time()
+        budget = max(deadline - self.clock(), 0.0) if deadline is not None else None
+        try:
+            self.connection.send(("fetch", self.request_id, symbols, budget))
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                timeout = self.CANCEL_POLL
+                if deadline is not None:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.missed += 1
+                        if self.missed >= self.max_missed:
+                            self.restart(f"missed {self.missed} deadlines")
+                        return None
+                    timeout = min(timeout, remaining)
+                if not self.connection.poll(timeout):
+                    continue
+                message = self.connection.recv()
+                if message[0] == "exchange_info":
+                    if self.binance_api is not None:
+                        self.binance_api.load_exchange_info(message[1])
+                elif message[0] == "error":
+                    logger.error("Price engine process: %s", message[1])
+                elif message[0] == "done" and message[1] == self.request_id:
+                    priced = message[2]
+                    break
+                # Any other "done" answers a request that was already abandoned at its deadline
+        except (EOFError, OSError) as e:
+            self.restart(f"pipe closed ({e or type(e).__name__})")
+            return None
+        self.missed = 0
+        self.backoff = self.base_backoff
+        if priced is None:
+            return None
+        # Every slot written for this request, not only the rows' symbols: like the in-process engine this
+        # includes the whole bulk ticker, which the currency graph needs for cross rates
+        entries = self.layout.read()
+        if entries is None:
+            return None
+        # Slots keep older prices too; only the ones written for this request count as fetched
+        return {symbol: price for symbol, (price, timestamp) in entries.items() if price and timestamp >= sent_at}
+
+    def has_unlisted_sources(self):
+        return self.unlisted_sources
+
+    def shutdown(self):
+        self.stop_process()
+        self.layout.release()
+        self.memory.close()
+        self.memory.unlink()
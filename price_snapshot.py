@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class PriceSnapshotLayout:
+    """Fixed binary layout for a table of symbol prices living in a shared buffer.
+
+    header | symbol index (capacity x 16 bytes) | float64 prices | float64 timestamps
+
+    The header carries a sequence counter used as a seqlock: the writer makes it odd before touching
+    the slots and even again afterwards, and a reader only keeps a copy taken while the counter was
+    even and unchanged. Slots are append-only, so a symbol keeps its slot for the life of the buffer.
+    """
+
+    MAGIC = b"IVPS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIIQQd")  # magic, version, capacity, count, sequence, writer pid, heartbeat
+    HEADER_SIZE = 64
+    SYMBOL_SIZE = 16
+    SEQUENCE_OFFSET = 16
+
+    def __init__(self, buffer, capacity):
+        self.buffer = buffer
+        self.capacity = capacity
+        self.index_offset = self.HEADER_SIZE
+        self.prices_offset = self.index_offset + capacity * self.SYMBOL_SIZE
+        self.timestamps_offset = self.prices_offset + capacity * 8
+        self._view = memoryview(buffer)
+        # Zero-copy float64 views straight into the shared buffer
+        self.prices = self._view[self.prices_offset:self.timestamps_offset].cast("d")
+        self.timestamps = self._view[self.timestamps_offset:self.timestamps_offset + capacity * 8].cast("d")
+        self.slots = {}  # symbol -> slot, rebuilt incrementally from the index
+        self._indexed = 0
+
+    @classmethod
+    def size_for(cls, capacity):
+        return cls.HEADER_SIZE + capacity * (cls.SYMBOL_SIZE + 16)
+
+    def read_header(self):
+        return self.HEADER.unpack_from(self.buffer, 0)
+
+    def is_initialized(self):
+        magic, version, capacity = self.read_header()[:3]
+        return magic == self.MAGIC and version == self.VERSION and capacity == self.capacity
+
+    def initialize(self, pid=0):
+        self.HEADER.pack_into(self.buffer, 0, self.MAGIC, self.VERSION, self.capacity, 0, 0, pid, 0.0)
+        self.slots = {}
+        self._indexed = 0
+
+    def recover(self, pid=0):
+        """Close a write left half-done by a writer that died, so readers stop retrying."""
+        magic, version, capacity, count, sequence, _, heartbeat = self.read_header()
+        if sequence % 2:
+            self.HEADER.pack_into(self.buffer, 0, magic, version, capacity, count, sequence + 1, pid, heartbeat)
+
+    def sequence(self):
+        return struct.unpack_from("<Q", self.buffer, self.SEQUENCE_OFFSET)[0]
+
+    def heartbeat(self):
+        return self.read_header()[6]
+
+    def writer_pid(self):
+        return self.read_header()[5]
+
+    def _sync_index(self, count):
+        for slot in range(self._indexed, count):
+            start = self.index_offset + slot * self.SYMBOL_SIZE
+            symbol = bytes(self.buffer[start:start + self.SYMBOL_SIZE]).rstrip(b"\0").decode("ascii", "ignore")
+            self.slots[symbol] = slot
+        self._indexed = max(self._indexed, count)
+
+    def write(self, prices, timestamp, pid=0):
+        """Publish {symbol: price}; symbols that don't fit in the index are skipped and counted in the result."""
+        magic, version, capacity, count, sequence, _, _ = self.read_header()
+        skipped = 0
+        self._sync_index(count)
+        self.HEADER.pack_into(self.buffer, 0, magic, version, capacity, count, sequence + 1, pid, timestamp)
+        for symbol, price in prices.items():
+            slot = self.slots.get(symbol)
+            if slot is None:
+                encoded = symbol.encode("ascii", "ignore")[:self.SYMBOL_SIZE]
+                if count >= self.capacity or not encoded:
+                    skipped += 1
+                    continue
+                slot = count
+                start = self.index_offset + slot * self.SYMBOL_SIZE
+                self.buffer[start:start + self.SYMBOL_SIZE] = encoded.ljust(self.SYMBOL_SIZE, b"\0")
+                self.slots[symbol] = slot
+                count += 1
+            self.prices[slot] = price
+            self.timestamps[slot] = timestamp
+        self._indexed = count
+        self.HEADER.pack_into(self.buffer, 0, magic, version, capacity, count, sequence + 2, pid, timestamp)
+        return skipped
+
+    def read(self, symbols=None, retries=100):
+        """Consistent {symbol: (price, timestamp)} copy, or None if the writer kept the table busy."""
+        for _ in range(retries):
+            before = self.sequence()
+            if before % 2:
+                time.sleep(0)  # Writer is mid-update, yield and retry
+                continue
+            count = self.read_header()[3]
+            self._sync_index(count)
+            if symbols is None:
+                result = {symbol: (self.prices[slot], self.timestamps[slot]) for symbol, slot in self.slots.items()}
+            else:
+                result = {}
+                for symbol in symbols:
+                    slot = self.slots.get(symbol)
+                    if slot is not None:
+                        result[symbol] = (self.prices[slot], self.timestamps[slot])
+            if self.sequence() == before:
+                return result
+        return None
+
+    def release(self):
+        self.prices.release()
+        self.timestamps.release()
+        self._view.release()
+
+
+class SharedPriceSnapshot:
+    """Price table shared between app instances through a memory-mapped file.
+
+    The instance holding the lock file is the writer: it fetches prices and publishes them here.
+    Every other instance reads the table instead of calling the API. The OS drops the lock when the
+    writer exits, so the next instance to ask takes over. Readers treat a heartbeat older than
+    stale_after as a missing writer and fall back to fetching locally.
+    """
+
+    def __init__(self, path, capacity=8192, stale_after=15.0, clock=time.time):
+        self.path = path
+        self.capacity = capacity
+        self.stale_after = stale_after
+        self.clock = clock
+        self.is_writer = False
+        self._lock_file = None
+        size = PriceSnapshotLayout.size_for(capacity)
+        with open(path, "a+b") as file:
+            if os.path.getsize(path) < size:
+                file.truncate(size)
+        self._file = open(path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self.layout = PriceSnapshotLayout(self._mmap, capacity)
+
+    def try_become_writer(self):
+        """Take the writer role if no live process holds it; returns whether this instance is the writer."""
+        if self.is_writer:
+            return True
+        lock_file = open(self.path + ".lock", "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self.is_writer = True
+        if not self.layout.is_initialized():
+            self.layout.initialize(os.getpid())
+        else:
+            self.layout.recover(os.getpid())
+        return True
+
+    def publish(self, prices):
+        if self.is_writer and prices:
+            self.layout.write(prices, self.clock(), os.getpid())
+
+    def writer_alive(self):
+        return self.layout.is_initialized() and self.clock() - self.layout.heartbeat() <= self.stale_after
+
+    def read_prices(self, symbols=None):
+        """{symbol: price} from the shared table, or None when there is no live writer to trust.
+
+        Slots the writer stopped refreshing (older than stale_after before its last write) are left
+        out, so a symbol it no longer asks for is fetched by the reader instead of served as current.
+        """
+        if not self.writer_alive():
+            return None
+        entries = self.layout.read(symbols)
+        if entries is None:
+            return None
+        oldest = self.layout.heartbeat() - self.stale_after
+        return {symbol: price for symbol, (price, timestamp) in entries.items() if price and timestamp >= oldest}
+
+    def close(self):
+        self.layout.release()
+        self._mmap.close()
+        self._file.close()
+        if self._lock_file is not None:
+            self._lock_file.close()  # Closing the descriptor releases the writer lock
+            self._lock_file = None
+        self.is_writer = False
@@ -0,0 +1,372 @@
+import json
+import logging
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_symbol(symbol):
+    return symbol.strip().upper().replace(" ", "").replace("-", "").replace("_", "").replace("/", "")
+
+
+class PriceSource:
+    """Base class for price sources; subclasses return {symbol: price} for the requested symbols."""
+
+    def __init__(self, name, priority=0, timeout=5.0):
+        self.name = name
+        self.priority = priority  # Lower value wins when several sources price the same symbol
+        self.timeout = timeout
+
+    def fetch_prices(self, symbols):
+        raise NotImplementedError
+
+
+class BinancePriceSource(PriceSource):
+    """Prices every Binance symbol with one bulk ticker request through BinanceAPI."""
+
+    def __init__(self, binance_api, name="binance", priority=0, timeout=5.0):
+        super().__init__(name, priority, timeout)
+        self.binance_api = binance_api
+
+    def fetch_prices(self, symbols):
+        # The bulk endpoint costs the same whatever is requested, and the currency graph needs every rate
+        return self.binance_api.get_all_prices()
+
+
+class RestTickerPriceSource(PriceSource):
+    """Generic REST ticker adapter.
+
+    With a "{symbol}" placeholder in the url one request is made per symbol and the price is read from
+    price_path. Without it the url is treated as a bulk endpoint returning a list of tickers (found at
+    list_path) with the symbol at symbol_path and the price at price_path.
+    """
+
+    def __init__(self, name, url, priority=1, timeout=5.0, price_path=("price",), symbol_path=("symbol",),
+                 list_path=(), symbol_format=None):
+        super().__init__(name, priority, timeout)
+        self.url = url
+        self.price_path = tuple(price_path)
+        self.symbol_path = tuple(symbol_path)
+        self.list_path = tuple(list_path)
+        self.symbol_format = symbol_format  # Maps BTCUSDT to the exchange's own notation, e.g. BTC-USDT
+
+    def fetch_prices(self, symbols):
+        if "{symbol}" in self.url:
+            prices = {}
+            for symbol in symbols:
+                remote_symbol = self.symbol_format(symbol) if self.symbol_format else symbol
+                payload = self._get_json(self.url.format(symbol=remote_symbol))
+                price = self._to_float(self._dig(payload, self.price_path))
+                if price is not None:
+                    prices[symbol] = price
+            return prices
+
+        prices = {}
+        for ticker in self._dig(self._get_json(self.url), self.list_path) or []:
+            symbol = self._dig(ticker, self.symbol_path)
+            price = self._to_float(self._dig(ticker, self.price_path))
+            if symbol and price is not None:
+                prices[normalize_symbol(str(symbol))] = price
+        return prices
+
+    def _get_json(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": "IndoVaultTrippleGrid"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    @staticmethod
+    def _dig(payload, path):
+        for key in path:
+            if payload is None:
+                return None
+            payload = payload.get(key) if isinstance(payload, dict) else None
+        return payload
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            price = float(value)
+        except (TypeError, ValueError):
+            return None
+        return price if price > 0 else None
+
+
+class FakePriceSource(PriceSource):
+    """In-process source with settable prices, latency and failures, for tests and offline runs."""
+
+    def __init__(self, name="fake", prices=None, priority=0, timeout=5.0, delay=0.0, fail=False):
+        super().__init__(name, priority, timeout)
+        self.prices = dict(prices or {})
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def set_price(self, symbol, price):
+        self.prices[symbol] = price
+
+    def fetch_prices(self, symbols):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.name} is unavailable")
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+
+class SourceHealth:
+    """Rolling health record for a single price source."""
+
+    def __init__(self, failure_threshold=3, base_cooldown=15.0, max_cooldown=300.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_latency = None
+        self.last_error = None
+        self.last_success = None
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency, now):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.last_latency = latency
+        self.last_success = now
+        self.cooldown_until = 0.0
+
+    def record_failure(self, error, now):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= self.failure_threshold:
+            # Back off exponentially while the source keeps failing
+            exponent = self.consecutive_failures - self.failure_threshold
+            self.cooldown_until = now + min(self.base_cooldown * (2 ** exponent), self.max_cooldown)
+
+    def is_available(self, now):
+        return now >= self.cooldown_until
+
+    @property
+    def healthy(self):
+        return self.consecutive_failures < self.failure_threshold
+
+
+class SymbolHealthTracker:
+    """Per-symbol negative cache and circuit breaker, so bad symbols stop costing requests.
+
+    A symbol the exchange doesn't list is negatively cached and re-checked after exponentially growing
+    intervals. A listed symbol that repeatedly goes unpriced trips a breaker (a SourceHealth per
+    symbol) and is left out of requests until its cooldown ends. A price from any source clears both.
+    """
+
+    def __init__(self, clock=time.monotonic, invalid_recheck=60.0, max_invalid_recheck=3600.0,
+                 failure_threshold=3, base_cooldown=15.0, max_cooldown=300.0):
+        self.clock = clock
+        self.invalid_recheck = invalid_recheck
+        self.max_invalid_recheck = max_invalid_recheck
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.invalid = {}  # symbol -> (recheck at, interval)
+        self.breakers = {}  # symbol -> SourceHealth
+
+    def should_request(self, symbol, now=None):
+        now = self.clock() if now is None else now
+        invalid = self.invalid.get(symbol)
+        if invalid is not None and now < invalid[0]:
+            return False
+        breaker = self.breakers.get(symbol)
+        return breaker is None or breaker.is_available(now)
+
+    def is_invalid(self, symbol):
+        return symbol in self.invalid
+
+    def record_priced(self, symbol):
+        if self.invalid.pop(symbol, None) is not None:
+            logger.info("%s is priced again, removed from the invalid symbol cache", symbol)
+        breaker = self.breakers.pop(symbol, None)
+        if breaker is not None and not breaker.healthy:
+            logger.info("%s is priced again, circuit closed", symbol)
+
+    def record_invalid(self, symbol, now=None):
+        now = self.clock() if now is None else now
+        previous = self.invalid.get(symbol)
+        if previous is not None and now < previous[0]:
+            return  # Still cached, this sweep didn't re-check it
+        interval = self.invalid_recheck if previous is None else min(previous[1] * 2, self.max_invalid_recheck)
+        self.invalid[symbol] = (now + interval, interval)
+        if previous is None:
+            logger.warning("%s is not listed on the exchange, re-checking in %.0fs", symbol, interval)
+
+    def record_failure(self, symbol, reason="no price", now=None):
+        now = self.clock() if now is None else now
+        breaker = self.breakers.get(symbol)
+        if breaker is None:
+            breaker = self.breakers[symbol] = SourceHealth(self.failure_threshold, self.base_cooldown,
+                                                           self.max_cooldown)
+        if not breaker.is_available(now):
+            return  # Open circuit, the symbol wasn't asked for
+        was_healthy = breaker.healthy
+        breaker.record_failure(reason, now)
+        if was_healthy and not breaker.healthy:
+            logger.warning("%s failed %d times (%s), circuit open", symbol, breaker.consecutive_failures, reason)
+
+    def status(self, symbol, now=None):
+        """Short cell text explaining why a symbol isn't being requested, or None if it is."""
+        now = self.clock() if now is None else now
+        invalid = self.invalid.get(symbol)
+        if invalid is not None and now < invalid[0]:
+            return f"Invalid ({self._format_wait(invalid[0] - now)})"
+        breaker = self.breakers.get(symbol)
+        if breaker is not None and not breaker.is_available(now):
+            return f"No price ({self._format_wait(breaker.cooldown_until - now)})"
+        return None
+
+    @staticmethod
+    def _format_wait(seconds):
+        return f"{seconds / 60:.0f}m" if seconds >= 60 else f"{seconds:.0f}s"
+
+
+class PriceSourceEngine:
+    """Fans a price request out to every available source concurrently and merges the answers.
+
+    "priority" resolves each symbol from the lowest-priority-value source that priced it, while
+    "fastest" takes the first valid price that arrives. Each source gets its own timeout, capped by
+    the caller's deadline for the whole cycle; sources that keep failing are cooled down before they
+    are asked again. With hedge_after set, a source that hasn't answered after that many seconds gets
+    a duplicate request and whichever copy answers first is used.
+    """
+
+    PRIORITY = "priority"
+    FASTEST = "fastest"
+    CANCEL_POLL = 0.1  # How often a blocked fetch checks its cancel event
+
+    def __init__(self, sources, strategy=PRIORITY, clock=time.monotonic, hedge_after=None):
+        if strategy not in (self.PRIORITY, self.FASTEST):
+            raise ValueError(f"Unknown price source strategy: {strategy}")
+        self.sources = sorted(sources, key=lambda source: source.priority)
+        self.strategy = strategy
+        self.clock = clock
+        self.hedge_after = hedge_after
+        self.health = {source.name: SourceHealth() for source in self.sources}
+        self.last_origin = {}  # symbol -> name of the source that supplied its last price
+        # Room for one hedged duplicate per source
+        self.executor = ThreadPoolExecutor(max_workers=max(2 * len(self.sources), 1),
+                                           thread_name_prefix="price-source")
+
+    def fetch(self, symbols, deadline=None, cancel_event=None):
+        """Return {symbol: price} merged across sources, or None when every source failed.
+
+        deadline is an absolute time on self.clock after which sources still pending are abandoned;
+        setting cancel_event abandons them straight away. Abandoned calls finish in the background and
+        their answers are dropped.
+        """
+        symbols = list(dict.fromkeys(normalize_symbol(symbol) for symbol in symbols))
+        now = self.clock()
+        sources = [source for source in self.sources if self.health[source.name].is_available(now)]
+        if not sources:
+            sources = self.sources  # Everything is cooling down, better to try than to show nothing
+
+        started = self.clock()
+        pending = {self.executor.submit(source.fetch_prices, symbols): source for source in sources}
+        deadlines = {source.name: started + source.timeout if deadline is None else min(started + source.timeout, deadline)
+                     for source in sources}
+        hedge_at = {} if self.hedge_after is None else {source.name: started + self.hedge_after for source in sources}
+        answers = []  # (source, prices) in completion order
+
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            now = self.clock()
+            for future in [future for future, source in pending.items() if deadlines[source.name] <= now]:
+                source = pending.pop(future)
+                future.cancel()
+                if source not in pending.values():
+                    self.health[source.name].record_failure("timeout", now)
+            for source in [source for source in set(pending.values()) if hedge_at.get(source.name, now + 1) <= now]:
+                del hedge_at[source.name]  # Hedge each source at most once per fetch
+                pending[self.executor.submit(source.fetch_prices, symbols)] = source
+            if not pending:
+                break
+            wake_at = min([deadlines[source.name] for source in pending.values()] + list(hedge_at.values()))
+            timeout = max(wake_at - now, 0)
+            if cancel_event is not None:
+                timeout = min(timeout, self.CANCEL_POLL)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = pending.pop(future, None)
+                if source is None:
+                    continue  # Its hedged twin already answered
+                finished = self.clock()
+                try:
+                    prices = future.result()
+                except Exception as e:
+                    if source not in pending.values():
+                        self.health[source.name].record_failure(str(e), finished)
+                    continue
+                self.health[source.name].record_success(finished - started, finished)
+                hedge_at.pop(source.name, None)
+                for twin in [twin for twin, other in pending.items() if other is source]:
+                    del pending[twin]
+                    twin.cancel()
+                answers.append((source, prices or {}))
+            if self._resolved(symbols, answers, pending):
+                break
+
+        for future in pending:
+            future.cancel()  # Late answers are not needed, let them finish in the background
+        if not answers:
+            return None
+        return self._merge(answers)
+
+    def _resolved(self, symbols, answers, pending):
+        if self.strategy == self.FASTEST:
+            priced = set()
+            for _, prices in answers:
+                priced.update(prices)
+            return all(symbol in priced for symbol in symbols)
+        # Priority: done once every symbol is priced by a source that outranks everything still pending
+        best_pending = min((source.priority for source in pending.values()), default=None)
+        if best_pending is None:
+            return True
+        for symbol in symbols:
+            if not any(symbol in prices and source.priority <= best_pending for source, prices in answers):
+                return False
+        return True
+
+    def _merge(self, answers):
+        if self.strategy == self.PRIORITY:
+            answers = sorted(answers, key=lambda answer: answer[0].priority)
+        merged = {}
+        for source, prices in answers:
+            for symbol, price in prices.items():
+                if symbol not in merged and price:
+                    merged[symbol] = price
+                    self.last_origin[symbol] = source.name
+        return merged
+
+    def has_unlisted_sources(self):
+        """Whether a source besides Binance may price symbols the exchange doesn't list."""
+        return any(not isinstance(source, BinancePriceSource) for source in self.sources)
+
+    def health_report(self):
+        return {name: {"healthy": health.healthy, "successes": health.successes, "failures": health.failures,
+                       "last_latency": health.last_latency, "last_error": health.last_error}
+                for name, health in self.health.items()}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def parse_rest_sources(text, timeout=5.0):
+        """Build bulk RestTickerPriceSources from "name=url,name=url" (Binance-style ticker lists)."""
+        sources = []
+        for priority, item in enumerate((text or "").split(","), start=1):
+            if "=" not in item:
+                continue
+            name, url = item.split("=", 1)
+            sources.append(RestTickerPriceSource(name.strip(), url.strip(), priority=priority, timeout=timeout))
+        return sources
@@ -1,71 +1,145 @@
+import math
+
+from currency_graph import CurrencyGraph
+from number_format import format_money, parse_number
+from price_sources import normalize_symbol
+from valuation import ValuationKernel
+from wallet_aggregates import WalletAggregates
+
+STALE_MARKER = "~"
+
+
 class PriceUpdater:
-    def __init__(self, entry_data, grid_manager, root, get_deposited_value_func=None):
+    def __init__(self, entry_data, grid_manager, root, get_deposited_value_func=None, currency_graph=None,
+                 reporting_currency="USDT"):
         self.entry_data = entry_data
         self.grid_manager = grid_manager
         self.root = root
         self.get_deposited_value = get_deposited_value_func  # Receive the function reference
+        self.currency_graph = currency_graph
+        self.reporting_currency = reporting_currency
+        self.currency_prefix = CurrencyGraph.currency_prefix(reporting_currency)
+        self.kernel = ValuationKernel(30)
+        self.last_valuation = None
+        self.wallet_aggregates = WalletAggregates()
 
     def update_price(self, row, formatted_price, raw_price):
-        self.grid_manager.create_value_label(row, 2, f"${formatted_price}")
+        self.update_prices({row: (formatted_price, raw_price)})
 
-        invested, holdings = self.get_invested_and_holdings(row)
+    def update_prices(self, updates, stale_rows=()):
+        """Apply a sweep of {row: (formatted_price, raw_price)} and revalue the whole portfolio once.
 
-        if invested != 0 and holdings != 0:
-            break_even, balance, profit = self.calculate_values(invested, holdings, raw_price)
-            self.update_labels(row, break_even, balance, profit)
-            self.update_total_profit()
-        else:
-            self.update_labels(row, "Invalid", "Invalid", "Invalid")
-            self.update_total_profit()
+        Rows in stale_rows carry a last known price rather than a fresh one and are shown with a "~".
+        """
+        for row, (formatted_price, raw_price) in updates.items():
+            marker = STALE_MARKER if row in stale_rows else ""
+            self.grid_manager.create_value_label(row, 2, f"{marker}${formatted_price}")
+            self.kernel.set_price(row, raw_price)
+
+        valuation = self.revalue()
+        for row in updates:
+            self.update_row_labels(row, valuation)
+            self.update_wallet_row(row, valuation)
+        self.update_total_profit(valuation)
 
         # Force UI update
         self.root.update_idletasks()
 
+    def clear_price(self, row):
+        self.kernel.set_price(row, None)
+        self.wallet_aggregates.remove_row(row)
+
+    def update_wallet_row(self, row, valuation):
+        # Only rows that count towards the portfolio totals count towards their wallet
+        if not valuation.counted[row]:
+            self.wallet_aggregates.remove_row(row)
+            return
+        self.wallet_aggregates.update_row(
+            row, self.entry_data.get(f"row_{row}_column_8_middle", ""), float(valuation.balance[row]),
+            float(self.kernel.invested[row] * self.kernel.rates[row]), float(valuation.profit[row])
+        )
+
+    def revalue(self):
+        """Sync positions and rates into the kernel and value every row in one pass."""
+        for row in range(self.kernel.size):
+            self.kernel.sync_position(row, self.entry_data.get(f"row_{row}_invested", 0),
+                                      self.entry_data.get(f"row_{row}_holdings", 0), self._parse_input_value)
+            self.kernel.set_rate(row, self.get_conversion_rate(row))
+        self.last_valuation = self.kernel.compute()
+        return self.last_valuation
+
+    def update_row_labels(self, row, valuation):
+        if math.isnan(self.kernel.rates[row]):
+            self.update_labels(row, "No rate", "No rate", "No rate")
+        elif self.kernel.invested[row] != 0 and self.kernel.holdings[row] != 0:
+            self.update_labels(row, float(valuation.break_even[row]), float(valuation.balance[row]),
+                               float(valuation.profit[row]))
+        else:
+            self.update_labels(row, "Invalid", "Invalid", "Invalid")
+
     def get_invested_and_holdings(self, row):
         invested = self.entry_data.get(f"row_{row}_invested", 0)
         holdings = self.entry_data.get(f"row_{row}_holdings", 0)
         return self._parse_input_value(invested), self._parse_input_value(holdings)
 
-    def calculate_values(self, invested, holdings, raw_price):
+    def get_conversion_rate(self, row):
+        """Rate from the row's quote asset into the reporting currency, None if it can't be converted."""
+        if self.currency_graph is None:
+            return 1.0
+        quote = self.currency_graph.quote_asset(self.entry_data.get(f"row_{row}_name", ""))
+        if quote is None:
+            # Pairs are only known once exchange info loads, and symbols priced by other sources never
+            # appear in it; a symbol quoted in the reporting currency (or any, when reporting in USDT,
+            # as before) needs no rate, anything else shows "No rate" rather than a guess
+            symbol = normalize_symbol(self.entry_data.get(f"row_{row}_name", ""))
+            if self.reporting_currency == "USDT" or symbol.endswith(self.reporting_currency):
+                return 1.0
+            return None
+        return self.currency_graph.rate(quote, self.reporting_currency)
+
+    def to_reporting_currency(self, amount):
+        """A USDT amount such as the deposit in the reporting currency, None when there is no rate yet."""
+        if amount is None or self.currency_graph is None or self.reporting_currency == "USDT":
+            return amount
+        return self.currency_graph.convert(amount, "USDT", self.reporting_currency)
+
+    def calculate_values(self, invested, holdings, raw_price, rate=1.0):
+        # Scalar form of ValuationKernel.compute, keep the two in step
+        # Break even stays in the quote asset so it compares with the price column
         break_even = invested / holdings if holdings != 0 else 0
-        balance = raw_price * holdings
-        profit = balance - invested
+        balance = raw_price * holdings * rate
+        profit = balance - invested * rate
         return break_even, balance, profit
 
     def update_labels(self, row, break_even, balance, profit):
+        prefix = self.currency_prefix
         self.grid_manager.create_value_label(
-            row, 3, f"${break_even:,.2f}" if break_even != "Invalid" else "Invalid"
+            row, 3, format_money(break_even) if not isinstance(break_even, str) else break_even
         )
         self.grid_manager.create_value_label(
-            row, 4, f"${balance:,.2f}" if balance != "Invalid" else "Invalid"
+            row, 4, format_money(balance, prefix) if not isinstance(balance, str) else balance
         )
         self.grid_manager.create_value_label(
-            row, 5, f"${profit:,.2f}" if profit != "Invalid" else "Invalid"
+            row, 5, format_money(profit, prefix) if not isinstance(profit, str) else profit
         )
 
-    def update_total_profit(self):
-        total_profit = 0
-        for row in range(30):
-            invested, holdings = self.get_invested_and_holdings(row)
-            raw_price = self._parse_input_value(self.entry_data.get(f"row_{row}_price", 0))
-            profit = (raw_price * holdings) - invested
-            if invested > 0 and holdings > 0:
-                self.entry_data[f"row_{row}_profit"] = f"${profit:,.2f}"
-                total_profit += profit
+    def update_total_profit(self, valuation=None):
+        if valuation is None:
+            valuation = self.revalue()
+        for row in valuation.counted.nonzero()[0].tolist():
+            self.entry_data[f"row_{row}_profit"] = format_money(float(valuation.profit[row]), self.currency_prefix)
+        total_profit = valuation.total_profit
 
         # Check if deposited_value is callable and fetch its value
         if self.get_deposited_value:
             deposited_value = self.get_deposited_value(self.grid_manager.deposited_entry) if self.grid_manager.deposited_entry else 0
         else:
             deposited_value = 0  # Set to 0 if the function is not passed or if grid_manager.deposited_entry is None
+        deposited_value = self.to_reporting_currency(deposited_value)  # Deposits are entered in USD
 
         # Update net value if grid_manager is available
         if self.grid_manager:
             self.grid_manager.update_net_value(deposited_value=deposited_value, total_profit=total_profit)
 
     def _parse_input_value(self, value):
-        try:
-            value = str(value).strip().replace('$', '').replace(',', '')
-            return float(value) if value else 0.0
-        except ValueError:
-            return 0.0
+        return parse_number(value)
@@ -1,5 +1,8 @@
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 
 class ProgressLogger:
     def __init__(self):
@@ -17,8 +20,10 @@ class ProgressLogger:
             self.minute_counter += 1
             self.total_fetches += self.total_fetches_last_minute
             self.total_attempts += self.total_attempts_last_minute
-            print(f"Minute {self.minute_counter}: {self.total_fetches_last_minute} prices fetched in {self.total_attempts_last_minute} attempts")
-            print(f"Total fetches: {self.total_fetches} in total attempts {self.total_attempts}")
+            logger.info("Minute %d: %d prices fetched in %d attempts (total %d in %d attempts)", self.minute_counter,
+                        self.total_fetches_last_minute, self.total_attempts_last_minute, self.total_fetches,
+                        self.total_attempts, extra={"fetched": self.total_fetches_last_minute,
+                                                    "attempts": self.total_attempts_last_minute})
             self.total_fetches_last_minute = 0
             self.total_attempts_last_minute = 0
             self.start_time = time.time()
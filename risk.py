@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+from functools import reduce
+
+import numpy as np
+
+from candles import DEFAULT_BACKFILL, INTERVALS
+from number_format import format_money
+from price_sources import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+# One-sided normal quantiles for parametric VaR
+VAR_Z = {0.95: 1.6448536269514722, 0.99: 2.3263478740408408}
+BENCHMARK = "BTCUSDT"
+
+
+def align_closes(series):
+    """Closes of several symbols on their common timestamps: (timestamps, T x n matrix)."""
+    common = reduce(np.intersect1d, (timestamps for timestamps, _ in series))
+    columns = [closes[np.searchsorted(timestamps, common)] for timestamps, closes in series]
+    return common, np.column_stack(columns) if columns else np.empty((0, 0))
+
+
+class RollingMoments:
+    """Running sums of the last `window` return vectors and of their outer products.
+
+    push() adds one period and drops the one leaving the window in O(n^2), so the covariance matrix
+    never has to be rebuilt from the whole window. The sums are recomputed exactly once per window
+    to keep floating point drift from building up.
+    """
+
+    def __init__(self, window, size):
+        self.window = window
+        self.returns = np.zeros((window, size))
+        self.count = 0
+        self.position = 0  # Next slot to write in the ring of returns
+        self.pushes = 0
+        self.sum = np.zeros(size)
+        self.outer = np.zeros((size, size))
+
+    def extend(self, returns):
+        """Seed from a T x n matrix of returns in one vectorized pass; only the last window rows are kept."""
+        rows = returns[-self.window:]
+        self.count = rows.shape[0]
+        self.returns[:self.count] = rows
+        self.position = self.count % self.window
+        self.resum()
+
+    def push(self, returns):
+        if self.count == self.window:
+            leaving = self.returns[self.position]
+            self.sum -= leaving
+            self.outer -= np.outer(leaving, leaving)
+        self.returns[self.position] = returns
+        self.sum += returns
+        self.outer += np.outer(returns, returns)
+        self.position = (self.position + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            self.resum()
+
+    def resum(self):
+        rows = self.returns[:self.count]
+        self.sum = rows.sum(axis=0)
+        self.outer = rows.T @ rows
+
+    def covariance(self):
+        count = self.count
+        mean = self.sum / count
+        return (self.outer - count * np.outer(mean, mean)) / (count - 1)
+
+    def ordered_returns(self):
+        """Returns in the window, oldest first."""
+        if self.count < self.window:
+            return self.returns[:self.count]
+        return np.roll(self.returns, -self.position, axis=0)
+
+
+class RiskModel:
+    """Volatility, drawdown, beta, correlation and VaR of the held symbols over a rolling window.
+
+    Built once from aligned closes (e.g. cached daily candles); each later close only pushes one
+    vector of log returns into the rolling moments.
+    """
+
+    def __init__(self, symbols, timestamps, closes, window=90, periods_per_year=365, benchmark=BENCHMARK):
+        self.symbols = list(symbols)
+        self.index = {symbol: column for column, symbol in enumerate(self.symbols)}
+        self.periods_per_year = periods_per_year
+        self.benchmark = benchmark
+        self.last_timestamp = int(timestamps[-1])
+        self.last_closes = closes[-1].copy()
+        self.moments = RollingMoments(window, len(self.symbols))
+        self.moments.extend(np.diff(np.log(closes), axis=0))
+
+    def push_closes(self, timestamp, closes):
+        self.moments.push(np.log(closes / self.last_closes))
+        self.last_closes = closes.copy()
+        self.last_timestamp = timestamp
+
+    def metrics(self, values, confidence=0.95):
+        """Risk figures for a portfolio holding `values` (reporting currency per symbol, in model order)."""
+        covariance = self.moments.covariance()
+        deviations = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(deviations, deviations)
+        total = values.sum()
+        weights = values / total if total else np.zeros_like(values)
+        portfolio_deviation = float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+
+        portfolio_returns = self.moments.ordered_returns() @ weights
+        growth = np.exp(np.cumsum(portfolio_returns))
+        drawdowns = growth / np.maximum.accumulate(np.maximum(growth, 1.0)) - 1.0
+        historical_loss = -float(np.percentile(portfolio_returns, (1 - confidence) * 100))
+
+        metrics = {
+            "volatility": dict(zip(self.symbols, (deviations * np.sqrt(self.periods_per_year)).tolist())),
+            "portfolio_volatility": portfolio_deviation * np.sqrt(self.periods_per_year),
+            "max_drawdown": float(drawdowns.min()) if drawdowns.size else 0.0,
+            "correlation": correlation,
+            "var_parametric": VAR_Z[confidence] * portfolio_deviation * total,
+            "var_historical": max(historical_loss, 0.0) * total,
+            "beta": {},
+            "portfolio_beta": None,
+        }
+        benchmark = self.index.get(self.benchmark)
+        if benchmark is not None and covariance[benchmark, benchmark] > 0:
+            betas = covariance[:, benchmark] / covariance[benchmark, benchmark]
+            metrics["beta"] = dict(zip(self.symbols, betas.tolist()))
+            metrics["portfolio_beta"] = float(weights @ betas)
+        return metrics
+
+
+class RiskWorker:
+    """Background thread that keeps a RiskModel current and reports a one-line summary.
+
+    submit() is called from the fetch thread with each sweep's prices and position values and only
+    replaces the pending request, so the fetch loop never waits and a slow pass skips stale sweeps.
+    The model is rebuilt from the candle cache when the held symbols change; otherwise a sweep that
+    opens a new candle period pushes the previous period's last prices as one incremental close.
+    """
+
+    def __init__(self, candle_service, on_summary, interval="1d", window=90, confidence=0.95, currency_prefix="$",
+                 benchmark=BENCHMARK, retry_interval=60.0):
+        self.candle_service = candle_service
+        self.on_summary = on_summary
+        self.interval = interval
+        self.step = INTERVALS[interval] // 1000
+        self.window = window
+        self.confidence = confidence
+        self.currency_prefix = currency_prefix
+        self.benchmark = benchmark
+        self.retry_interval = retry_interval
+        self.periods_per_year = 365 * 86400 // self.step
+        # Same lookback as the startup backfill, or enough days to fill the window
+        self.backfill_days = dict(DEFAULT_BACKFILL).get(interval, -(-(window + 1) * self.step // 86400))
+        self.model = None
+        self.last_build_attempt = 0.0
+        self.period_closes = None  # (period start, {symbol: last price seen in it})
+        self.last_metrics = None
+        self.condition = threading.Condition()
+        self.request = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def submit(self, timestamp, prices, values):
+        """Queue the latest {symbol: price} and {symbol: position value}; replaces any request not yet taken."""
+        with self.condition:
+            self.request = (timestamp, prices, values)
+            self.condition.notify()
+
+    def submit_valuation(self, valuation, entry_data, price_cache):
+        values = {}
+        for row in valuation.counted.nonzero()[0].tolist():
+            symbol = normalize_symbol(str(entry_data.get(f"row_{row}_name", "")))
+            if symbol:
+                values[symbol] = values.get(symbol, 0.0) + float(valuation.balance[row])
+        prices = {symbol: price_cache.price(symbol) for symbol in list(values) + [self.benchmark]}
+        self.submit(time.time(), {symbol: price for symbol, price in prices.items() if price}, values)
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.request is not None or not self.running)
+                if not self.running:
+                    return
+                request, self.request = self.request, None
+            try:
+                self.process(*request)
+            except Exception as e:
+                logger.exception("Error computing risk metrics: %s", e)
+
+    def process(self, timestamp, prices, values):
+        symbols = sorted(set(values) | {self.benchmark})
+        if self.model is None or self.model.symbols != symbols:
+            if timestamp - self.last_build_attempt < self.retry_interval:
+                return
+            self.last_build_attempt = timestamp
+            self.model = self.build_model(symbols)
+            self.period_closes = None
+            if self.model is None:
+                return
+        self.advance(timestamp, prices)
+        vector = np.array([values.get(symbol, 0.0) for symbol in self.model.symbols])
+        self.last_metrics = self.model.metrics(vector, self.confidence)
+        self.on_summary(self.format_summary(self.last_metrics))
+
+    def build_model(self, symbols):
+        missing = [symbol for symbol in symbols if len(self.candle_service.closes(symbol, self.interval)[0]) < 3]
+        if missing:
+            # Bought after startup (or never backfilled), fetch their candles here off the fetch thread
+            self.candle_service.backfill_all(missing, ((self.interval, self.backfill_days),))
+        series = []
+        for symbol in symbols:
+            timestamps, closes = self.candle_service.closes(symbol, self.interval)
+            if len(timestamps) < 3:
+                return None  # Backfill failed (or not listed); retried after retry_interval
+            series.append((timestamps, closes))
+        timestamps, closes = align_closes(series)
+        if len(timestamps) < 3:
+            return None
+        return RiskModel(symbols, timestamps, closes, self.window, self.periods_per_year, self.benchmark)
+
+    def advance(self, timestamp, prices):
+        """Push the last prices of a finished period into the model once a sweep lands in a newer one."""
+        period = int(timestamp) - int(timestamp) % self.step
+        if self.period_closes is not None and period > self.period_closes[0]:
+            closed_period, closes = self.period_closes
+            if closed_period > self.model.last_timestamp and all(symbol in closes for symbol in self.model.symbols):
+                self.model.push_closes(closed_period, np.array([closes[symbol] for symbol in self.model.symbols]))
+            self.period_closes = None
+        if self.period_closes is None:
+            self.period_closes = (period, {})
+        self.period_closes[1].update(prices)
+
+    def format_summary(self, metrics):
+        parts = [f"VOL {metrics['portfolio_volatility']:.0%}", f"MDD {metrics['max_drawdown']:.0%}"]
+        if metrics["portfolio_beta"] is not None:
+            parts.append(f"β {metrics['portfolio_beta']:.2f}")
+        parts.append(f"VaR{int(self.confidence * 100)} {format_money(metrics['var_historical'], self.currency_prefix, 0)}")
+        return "  ".join(parts)
@@ -0,0 +1,118 @@
+import numpy as np
+
+from number_format import parse_number
+from price_sources import normalize_symbol
+
+# Group names a shock can target besides a symbol or base asset
+ALL = "ALL"
+ALTS = "ALTS"  # Everything except BTC and stablecoins
+STABLES = "STABLES"
+STABLECOINS = frozenset(("USDT", "USDC", "BUSD", "FDUSD", "TUSD", "DAI", "USDP"))
+QUOTE_ASSETS = ("USDT", "USDC", "FDUSD", "BUSD", "TUSD", "BTC", "ETH", "BNB", "EUR", "TRY", "BRL")
+
+
+def parse_scenarios(text):
+    """[{target: shock}] from "BTC -30%, alts -50%; all -20%" (";" separates scenarios, shocks are fractions)."""
+    scenarios = []
+    for part in text.split(";"):
+        shocks = {}
+        for item in part.split(","):
+            words = item.split()
+            if not words:
+                continue
+            if len(words) != 2 or not words[1].endswith("%"):
+                raise ValueError(f"Expected '<symbol or group> <change>%', got '{item.strip()}'")
+            change = parse_number(words[1][:-1], None)
+            if change is None:
+                raise ValueError(f"Not a percentage: '{words[1]}'")
+            shocks[words[0].upper()] = change / 100
+        if shocks:
+            scenarios.append(shocks)
+    return scenarios
+
+
+class ScenarioResult:
+    """Outcome of a batch: one row per scenario."""
+
+    def __init__(self, net_value, total_profit, total_balance, row_profit, counted):
+        self.net_value = net_value  # (scenarios,)
+        self.total_profit = total_profit  # (scenarios,)
+        self.total_balance = total_balance  # (scenarios,)
+        self.row_profit = row_profit  # (scenarios, rows)
+        self.counted = counted  # (rows,) rows that take part in the totals
+
+
+class ScenarioEngine:
+    """Values many price-shock scenarios against a frozen copy of the positions at once.
+
+    A batch is a (scenarios x rows) matrix of fractional price changes; every scenario's balances,
+    profits and net value come out of a few broadcast NumPy operations using the same formulas as
+    ValuationKernel.compute. The engine copies the arrays it is built from, so live state is never
+    touched and no price is fetched.
+    """
+
+    def __init__(self, symbols, bases, prices, holdings, invested, rates, deposited_value=0.0):
+        self.symbols = list(symbols)
+        self.bases = list(bases)
+        self.prices = np.array(prices, dtype=float)
+        self.invested_value = np.array(invested, dtype=float) * np.array(rates, dtype=float)
+        # Value of a unit price change per row, shocks scale it directly
+        self.exposure = np.array(holdings, dtype=float) * np.array(rates, dtype=float)
+        holdings = np.array(holdings, dtype=float)
+        self.counted = (np.array(invested, dtype=float) > 0) & (holdings > 0) & np.isfinite(self.prices * self.exposure)
+        self.deposited_value = deposited_value
+        self.masks = self.build_masks()
+
+    @classmethod
+    def from_updater(cls, price_updater, deposited_value=0.0):
+        """Snapshot the positions a PriceUpdater last valued."""
+        kernel = price_updater.kernel
+        pairs = price_updater.currency_graph.pairs if price_updater.currency_graph is not None else {}
+        symbols = [normalize_symbol(str(price_updater.entry_data.get(f"row_{row}_name", "")))
+                   for row in range(kernel.size)]
+        bases = [pairs[symbol][0] if symbol in pairs else cls.base_asset(symbol) for symbol in symbols]
+        return cls(symbols, bases, kernel.prices, kernel.holdings, kernel.invested, kernel.rates, deposited_value)
+
+    @staticmethod
+    def base_asset(symbol):
+        for quote in QUOTE_ASSETS:
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return symbol[:-len(quote)]
+        return symbol
+
+    def build_masks(self):
+        """Row masks for every target a shock can name, most general first."""
+        symbols = np.array(self.symbols, dtype=object)
+        bases = np.array(self.bases, dtype=object)
+        stables = np.isin(bases, list(STABLECOINS))
+        masks = {ALL: np.ones(len(self.symbols), dtype=bool), STABLES: stables, ALTS: ~stables & (bases != "BTC")}
+        for base in set(self.bases):
+            masks.setdefault(base, bases == base)
+        for symbol in set(self.symbols):
+            masks[symbol] = symbols == symbol
+        return masks
+
+    def shock_matrix(self, scenarios):
+        """(scenarios x rows) fractional changes; a symbol beats its base asset, which beats a group, which beats ALL."""
+        matrix = np.zeros((len(scenarios), len(self.symbols)))
+        rank = {ALL: 0, ALTS: 1, STABLES: 1}
+        for index, shocks in enumerate(scenarios):
+            for target in sorted(shocks, key=lambda name: rank.get(name, 3 if name in self.symbols else 2)):
+                mask = self.masks.get(target)
+                if mask is not None:
+                    matrix[index, mask] = shocks[target]
+        return matrix
+
+    def evaluate_matrix(self, shocks):
+        """Value a (scenarios x rows) matrix of fractional price changes."""
+        shocks = np.atleast_2d(shocks)
+        prices = np.where(self.counted, self.prices, 0.0) * (1.0 + shocks)
+        row_profit = prices * self.exposure - self.invested_value
+        row_profit[:, ~self.counted] = 0.0
+        total_profit = row_profit.sum(axis=1)
+        total_balance = (prices * self.exposure)[:, self.counted].sum(axis=1)
+        return ScenarioResult(total_profit - self.deposited_value, total_profit, total_balance, row_profit, self.counted)
+
+    def evaluate(self, scenarios):
+        """Value [{target: shock}] scenarios, see shock_matrix."""
+        return self.evaluate_matrix(self.shock_matrix(scenarios))
@@ -0,0 +1,227 @@
+"""Soak test: drive the fetch-and-value pipeline through hours of simulated time and watch for leaks.
+
+    python soak.py --hours 24 --max-growth-mb 8 --max-after-ids 200
+
+Each simulated sweep runs PriceFetcher.fetch_cycle against a Binance-only engine whose fake client
+serves a random walk, with the price cache, symbol health, P&L history and alerts all on a simulated
+clock. tracemalloc snapshots, pending Tk after ids and entry data sizes are sampled as it runs, and
+the exit status is non-zero when any of them grows past its limit, or when the unlisted symbol never
+reaches the negative cache. Without a display the grid is replaced by a recorder, so only the Tk
+after-id check is skipped.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import tracemalloc
+
+from alerts import AlertEngine
+from api import BinanceAPI
+from config import Config
+from currency_graph import CurrencyGraph
+from pnl_history import PnLHistory
+from price_cache import PriceCache
+from price_fetcher import PriceFetcher
+from price_sources import BinancePriceSource, PriceSourceEngine, SymbolHealthTracker
+
+SOAK_SYMBOLS = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "DOGEUSDT", "DOTUSDT",
+                "LINKUSDT", "ETHBTC", "AVAXUSDT", "ATOMUSDT")
+# Missing from the fake exchange info; with Binance as the only source it stays in the negative cache
+UNLISTED_SYMBOL = "NOTACOINUSDT"
+WALLETS = ("TREZOR", "BINANCE", "EXODUS", "")
+
+
+class SimClock:
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeExchangeClient:
+    """Just enough of the Binance client for BinanceAPI's exchange info cache and bulk ticker."""
+
+    def __init__(self, symbols, seed=7):
+        self.exchange_info = {"symbols": [
+            {"symbol": symbol, "baseAsset": symbol[:-4] if symbol.endswith("USDT") else symbol[:-3],
+             "quoteAsset": "USDT" if symbol.endswith("USDT") else symbol[-3:], "status": "TRADING"}
+            for symbol in symbols
+        ]}
+        self.prices = {symbol: random.Random(symbol).uniform(0.05, 60_000) for symbol in symbols}
+        self.random = random.Random(seed)
+
+    def get_exchange_info(self):
+        return self.exchange_info
+
+    def get_all_tickers(self):
+        return [{"symbol": symbol, "price": str(price)} for symbol, price in self.prices.items()]
+
+    def step(self):
+        """Move every price one random-walk step."""
+        for symbol, price in self.prices.items():
+            self.prices[symbol] = max(price * (1 + self.random.gauss(0, 0.002)), 1e-8)
+
+
+class RecordingRoot:
+    def update_idletasks(self):
+        pass
+
+    def update(self):
+        pass
+
+
+class RecordingGrid:
+    """Headless stand-in for the middle grid: keeps the latest text per cell."""
+
+    def __init__(self):
+        self.cells = {}
+        self.deposited_entry = None
+
+    def create_value_label(self, row, col, text="", bg_color=None):
+        self.cells[(row, col)] = text
+
+    def update_net_value(self, deposited_value=None, total_profit=None):
+        self.cells["net_value"] = (deposited_value, total_profit)
+
+
+class TkGrid:
+    """The real label grid from UIGridHelper on a withdrawn root, so flash callbacks are exercised."""
+
+    def __init__(self, root, entry_data_middle):
+        from classes import UIGridHelper
+        config = Config(root, 1920, 1080, 108, 213, 213, 480, {}, entry_data_middle, {})
+        self.helper = UIGridHelper(root, config, None, None)
+        self.deposited_entry = None
+
+    def create_value_label(self, row, col, text="", bg_color=None):
+        return self.helper.create_value_label(row, col, text=text, bg_color=bg_color)
+
+    def update_net_value(self, deposited_value=None, total_profit=None):
+        pass
+
+
+def make_root():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"No display ({e}), running headless without the Tk after-id check")
+        return None
+    root.withdraw()
+    return root
+
+
+def pending_after_ids(root):
+    return len(root.tk.splitlist(root.tk.call("after", "info"))) if root is not None else 0
+
+
+def build_entry_data(random_source):
+    entry_data = {}
+    for row, symbol in enumerate(SOAK_SYMBOLS + (UNLISTED_SYMBOL,)):
+        entry_data[f"row_{row}_name"] = symbol
+        entry_data[f"row_{row}_invested"] = f"${random_source.uniform(100, 5000):,.2f}"
+        entry_data[f"row_{row}_holdings"] = f"{random_source.uniform(0.01, 50):.4f}"
+        entry_data[f"row_{row}_column_8_middle"] = WALLETS[row % len(WALLETS)]
+    return entry_data
+
+
+def run(hours=6.0, sweep_seconds=2.0, sample_minutes=30.0, warmup_minutes=30.0, max_growth_mb=8.0,
+        max_after_ids=200, seed=7):
+    clock = SimClock()
+    random_source = random.Random(seed)
+    client = FakeExchangeClient(SOAK_SYMBOLS, seed)
+    binance_api = BinanceAPI(None, None, client=client)
+    engine = PriceSourceEngine([BinancePriceSource(binance_api)], clock=clock)
+    entry_data = build_entry_data(random_source)
+
+    root = make_root()
+    grid = TkGrid(root, entry_data) if root is not None else RecordingGrid()
+    fetcher = PriceFetcher(binance_api, entry_data, grid, None, root or RecordingRoot(),
+                           currency_graph=CurrencyGraph(), price_engine=engine, price_cache=PriceCache(clock))
+    fetcher.symbol_health = SymbolHealthTracker(clock=clock)
+
+    alerts_fired = []
+
+    class CountingSink:
+        def send(self, alert):
+            alerts_fired.append(alert.rule.rule_id)
+            del alerts_fired[:-100]  # The sink itself must not be what grows
+
+    alert_engine = AlertEngine([CountingSink()], clock=clock)
+    for symbol in SOAK_SYMBOLS[:4]:
+        alert_engine.create_rule(f"{symbol} price move 1%")
+    alert_engine.create_rule("net_value below 0")
+
+    with tempfile.TemporaryDirectory(prefix="indovault-soak-") as history_dir:
+        history = PnLHistory(history_dir, clock=clock)
+        fetcher.add_valuation_listener(lambda valuation: history.record_valuation(valuation, entry_data))
+        fetcher.add_valuation_listener(
+            lambda valuation: alert_engine.on_valuation(valuation, entry_data, fetcher.price_cache))
+
+        sweeps = int(hours * 3600 / sweep_seconds)
+        warmup_sweeps = int(warmup_minutes * 60 / sweep_seconds)
+        sample_every = max(int(sample_minutes * 60 / sweep_seconds), 1)
+        tracemalloc.start()
+        baseline = baseline_snapshot = None
+        baseline_keys = len(entry_data)
+        max_pending = 0
+        failures = []
+
+        print(f"{'sim hours':>9} {'traced MB':>10} {'growth MB':>10} {'after ids':>10} {'keys':>6} {'alerts':>7}")
+        for sweep in range(1, sweeps + 1):
+            client.step()
+            fetcher.fetch_cycle()
+            if root is not None:
+                root.update()
+            clock.advance(sweep_seconds)
+            max_pending = max(max_pending, pending_after_ids(root))
+
+            if sweep == warmup_sweeps:
+                baseline = tracemalloc.get_traced_memory()[0]
+                baseline_snapshot = tracemalloc.take_snapshot()
+            if sweep % sample_every and sweep != sweeps:
+                continue
+            current = tracemalloc.get_traced_memory()[0]
+            growth = (current - baseline) / 1e6 if baseline is not None else 0.0
+            print(f"{sweep * sweep_seconds / 3600:>9.1f} {current / 1e6:>10.2f} {growth:>10.2f} "
+                  f"{pending_after_ids(root):>10} {len(entry_data):>6} {len(alerts_fired):>7}")
+
+        if baseline is not None:
+            growth = (tracemalloc.get_traced_memory()[0] - baseline) / 1e6
+            if growth > max_growth_mb:
+                failures.append(f"traced memory grew {growth:.2f} MB after warmup (limit {max_growth_mb} MB)")
+                for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")[:10]:
+                    print(f"  {stat}")
+        if root is not None and max_pending > max_after_ids:
+            failures.append(f"{max_pending} Tk after callbacks pending at once (limit {max_after_ids})")
+        if not fetcher.symbol_health.is_invalid(UNLISTED_SYMBOL):
+            failures.append(f"{UNLISTED_SYMBOL} never reached the negative cache")
+        if len(entry_data) > baseline_keys + 30 * 2:  # Per-row price and profit keys are expected
+            failures.append(f"entry data grew from {baseline_keys} to {len(entry_data)} keys")
+        tracemalloc.stop()
+        engine.shutdown()
+
+    if root is not None:
+        root.destroy()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"PASS: {sweeps} sweeps over {hours:g} simulated hours")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=6.0, help="simulated hours to run")
+    parser.add_argument("--sweep-seconds", type=float, default=2.0, help="simulated seconds between sweeps")
+    parser.add_argument("--sample-minutes", type=float, default=30.0, help="simulated minutes between samples")
+    parser.add_argument("--warmup-minutes", type=float, default=30.0, help="simulated minutes before the baseline")
+    parser.add_argument("--max-growth-mb", type=float, default=8.0, help="allowed traced memory growth")
+    parser.add_argument("--max-after-ids", type=int, default=200, help="allowed pending Tk after callbacks")
+    arguments = parser.parse_args()
+    sys.exit(0 if run(arguments.hours, arguments.sweep_seconds, arguments.sample_minutes, arguments.warmup_minutes,
+                      arguments.max_growth_mb, arguments.max_after_ids) else 1)
@@ -0,0 +1,189 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import tkinter as tk
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolIndex:
+    """Prefix index over the exchange's symbol table for autocomplete.
+
+    Symbols are kept in one sorted list plus one per quote asset, so the matches for a prefix are the
+    contiguous slice found by two bisects. Only that slice is ranked, and only the top few are fully
+    sorted. The table is written to cache_path so suggestions also work offline.
+    """
+
+    PREFERRED_QUOTES = ("USDT", "USDC", "FDUSD", "BTC", "ETH", "BNB", "EUR", "TRY")
+
+    def __init__(self, cache_path=None, preferred_quote="USDT"):
+        self.cache_path = cache_path
+        quotes = [preferred_quote] + [quote for quote in self.PREFERRED_QUOTES if quote != preferred_quote]
+        self.quote_rank = {quote: rank for rank, quote in enumerate(quotes)}
+        self.symbols = []
+        self.by_quote = {}  # quote asset -> sorted symbols
+        self.info = {}  # symbol -> (base, quote, trading)
+        self.lock = threading.Lock()
+
+    def build(self, entries):
+        """Replace the index with [(symbol, base, quote, trading)] entries."""
+        info = {symbol.upper(): (base.upper(), quote.upper(), bool(trading)) for symbol, base, quote, trading in entries}
+        by_quote = {}
+        for symbol, (_, quote, _) in info.items():
+            by_quote.setdefault(quote, []).append(symbol)
+        for symbols in by_quote.values():
+            symbols.sort()
+        with self.lock:
+            self.info = info
+            self.symbols = sorted(info)
+            self.by_quote = by_quote
+
+    def load_exchange_info(self, exchange_info):
+        entries = [(symbol['symbol'], symbol.get('baseAsset', ''), symbol.get('quoteAsset', ''),
+                    symbol.get('status', 'TRADING') == 'TRADING')
+                   for symbol in exchange_info.get('symbols', []) if symbol.get('symbol')]
+        if entries:
+            self.build(entries)
+            self.save_cache()
+
+    def load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                self.build(json.load(file))
+            return True
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable symbol cache %s: %s", self.cache_path, e)
+            return False
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with self.lock:
+            entries = [[symbol, base, quote, trading] for symbol, (base, quote, trading) in self.info.items()]
+        temporary_path = self.cache_path + ".tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(temporary_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Could not write symbol cache %s: %s", self.cache_path, e)
+
+    def refresh_async(self, binance_api):
+        """Rebuild from fresh exchange info in the background; the cached table serves until then."""
+        def refresh():
+            try:
+                self.load_exchange_info(binance_api.get_exchange_info())
+            except Exception as e:
+                logger.warning("Symbol list refresh failed, using cached symbols: %s", e)
+        threading.Thread(target=refresh, name="symbol-index-refresh", daemon=True).start()
+
+    def suggest(self, text, quote=None, limit=8):
+        """Ranked symbols starting with text.
+
+        "ETH/US" searches ETH-prefixed symbols whose quote asset starts with US; quote restricts the
+        search to one quote asset. Exact matches come first, then trading pairs, preferred quotes and
+        shorter symbols.
+        """
+        text = text.strip().upper().replace(" ", "")
+        prefix, _, quote_prefix = text.partition("/")
+        if not prefix:
+            return []
+        with self.lock:
+            symbols = self.by_quote.get(quote.upper(), []) if quote else self.symbols
+            info = self.info
+        start = bisect_left(symbols, prefix)
+        end = bisect_left(symbols, prefix + "\uffff", start)
+        matches = symbols[start:end]
+        if quote_prefix:
+            matches = [symbol for symbol in matches
+                       if info[symbol][0].startswith(prefix) and info[symbol][1].startswith(quote_prefix)]
+        return heapq.nsmallest(limit, matches, key=lambda symbol: self._rank(symbol, prefix, info))
+
+    def _rank(self, symbol, prefix, info):
+        _, quote, trading = info[symbol]
+        return (symbol != prefix, not trading, self.quote_rank.get(quote, len(self.quote_rank)), len(symbol), symbol)
+
+
+class SymbolAutocomplete:
+    """Dropdown of SymbolIndex suggestions under a coin entry.
+
+    Suggestions refresh on every key release. Down moves into the list; Return, Tab or a double click
+    takes the highlighted symbol and submits the entry as if Return had been pressed there.
+    """
+
+    IGNORED_KEYS = {"Return", "KP_Enter", "Escape", "Up", "Down", "Tab", "Shift_L", "Shift_R",
+                    "Control_L", "Control_R", "Alt_L", "Alt_R", "Left", "Right"}
+
+    def __init__(self, root, symbol_index, limit=8, font=("Helvetica", 14, "bold")):
+        self.root = root
+        self.symbol_index = symbol_index
+        self.limit = limit
+        self.entry = None
+        self.listbox = tk.Listbox(root, font=font, activestyle="dotbox", exportselection=False, relief="solid", bd=1)
+        self.listbox.bind("<Return>", self.accept)
+        self.listbox.bind("<Tab>", self.accept)
+        self.listbox.bind("<Double-Button-1>", self.accept)
+        self.listbox.bind("<Escape>", self.hide)
+        self.listbox.bind("<FocusOut>", self._hide_unless_focused)
+
+    def attach(self, entry):
+        entry.bind("<KeyRelease>", lambda event: self.on_key_release(event, entry), add="+")
+        entry.bind("<Down>", lambda event: self.focus_list(entry), add="+")
+        entry.bind("<Escape>", self.hide, add="+")
+        entry.bind("<Return>", self.hide, add="+")
+        entry.bind("<FocusOut>", self._hide_unless_focused, add="+")
+
+    def on_key_release(self, event, entry):
+        if event.keysym in self.IGNORED_KEYS:
+            return
+        suggestions = self.symbol_index.suggest(entry.get(), limit=self.limit)
+        if not suggestions or suggestions == [entry.get().strip().upper()]:
+            self.hide()
+            return
+        self.entry = entry
+        self.listbox.delete(0, tk.END)
+        for symbol in suggestions:
+            self.listbox.insert(tk.END, symbol)
+        self._place(entry, len(suggestions))
+
+    def _place(self, entry, count):
+        entry.update_idletasks()
+        row_height = entry.winfo_height()
+        height = row_height * count
+        y = entry.winfo_y() + row_height
+        if y + height > self.root.winfo_height():
+            y = max(entry.winfo_y() - height, 0)  # Open upwards near the bottom of the grid
+        self.listbox.place(x=entry.winfo_x(), y=y, width=entry.winfo_width(), height=height)
+        self.listbox.lift()
+
+    def focus_list(self, entry):
+        if self.entry is entry and self.listbox.winfo_ismapped():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+            return "break"
+
+    def accept(self, event=None):
+        selection = self.listbox.curselection()
+        entry = self.entry
+        self.hide()
+        if entry is None or not selection:
+            return "break"
+        entry.delete(0, tk.END)
+        entry.insert(0, self.listbox.get(selection[0]))
+        entry.focus_set()
+        entry.event_generate("<Return>")
+        return "break"
+
+    def hide(self, event=None):
+        self.listbox.place_forget()
+
+    def _hide_unless_focused(self, event=None):
+        # Focus moves between the entry and the list while navigating, so check once it has settled
+        self.root.after(100, lambda: self.root.focus_get() in (self.entry, self.listbox) or self.hide())
@@ -0,0 +1,51 @@
+from api import BinanceAPI
+from candles import INTERVALS, CandleService, FakeKlineClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_service(clock, directory):
+    client = FakeKlineClient(clock)
+    return CandleService(BinanceAPI(None, None, client=client), directory, clock=clock, page_limit=100), client
+
+
+def test_backfill_fetches_only_the_gap(tmp_path):
+    clock = FakeClock()
+    service, client = make_service(clock, str(tmp_path))
+    added = service.backfill("BTCUSDT", "1h", 10)
+    assert added == 241  # Ten days back from the newest closed candle, both ends included
+    assert client.calls == 3  # In pages of 100
+
+    assert service.backfill("BTCUSDT", "1h", 10) == 0
+    assert client.calls == 3  # Nothing missing, nothing asked
+
+    clock.now += 5 * 3600
+    assert service.backfill("BTCUSDT", "1h", 10) == 5
+    assert client.calls == 4
+    open_times = service.candles("BTCUSDT", "1h")["open_time"]
+    assert len(open_times) == 246
+    assert (open_times[1:] - open_times[:-1] == INTERVALS["1h"]).all()
+
+    # A new process reads the columns back from disk and only fetches what it is missing
+    reloaded, reloaded_client = make_service(clock, str(tmp_path))
+    assert reloaded.backfill("BTCUSDT", "1h", 10) == 0
+    assert reloaded_client.calls == 0
+    assert list(reloaded.closes("BTCUSDT", "1h")[1]) == list(service.closes("BTCUSDT", "1h")[1])
+
+
+def test_longer_lookback_prepends_older_candles(tmp_path):
+    clock = FakeClock()
+    service, client = make_service(clock, str(tmp_path))
+    service.backfill("ETHUSDT", "1d", 30)
+    calls = client.calls
+    assert service.backfill("ETHUSDT", "1d", 60) == 30
+    assert client.calls == calls + 1
+    open_times = service.candles("ETHUSDT", "1d")["open_time"]
+    assert len(open_times) == 61
+    assert (open_times[1:] - open_times[:-1] == INTERVALS["1d"]).all()
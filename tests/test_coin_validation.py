@@ -0,0 +1,79 @@
+import queue
+import threading
+
+from coin_validation import CoinValidator
+from price_cache import PriceCache
+
+
+class FakeRoot:
+    """Collects root.after callbacks so the test runs them as the Tk loop would."""
+
+    def __init__(self):
+        self.callbacks = queue.Queue()
+
+    def after(self, delay, callback, *args):
+        self.callbacks.put((callback, args))
+
+    def run_next(self, timeout=5):
+        callback, args = self.callbacks.get(timeout=timeout)
+        callback(*args)
+
+
+class FakeAPI:
+    def __init__(self):
+        self.symbols = {"BTCUSDT", "ETHUSDT"}
+        self.gates = {}  # symbol -> Event the check waits on
+
+    def known_symbols(self):
+        return set()  # Exchange info not loaded, every check goes to the pool
+
+    def is_valid_coin_pair(self, symbol):
+        gate = self.gates.get(symbol)
+        if gate is not None:
+            gate.wait(5)
+        return symbol in self.symbols
+
+    def get_coin_price(self, symbol):
+        return {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0}.get(symbol)
+
+
+def test_superseded_result_is_dropped():
+    root, api = FakeRoot(), FakeAPI()
+    api.gates["BTCUSDT"] = threading.Event()
+    validator = CoinValidator(root, api, PriceCache())
+    results = []
+    try:
+        validator.validate(0, "BTCUSDT", lambda *result: results.append(result))
+        validator.validate(0, "ETHUSDT", lambda *result: results.append(result))
+        root.run_next()  # ETHUSDT answers first
+        api.gates["BTCUSDT"].set()
+        root.run_next()  # The older BTCUSDT check arrives late and must not overwrite the cell
+        assert results == [(0, "ETHUSDT", True, 3000.0)]
+    finally:
+        validator.shutdown()
+
+
+def test_known_and_priced_symbol_answers_without_a_thread():
+    root, api = FakeRoot(), FakeAPI()
+    api.known_symbols = lambda: {"BTCUSDT"}
+    cache = PriceCache()
+    cache.update({"BTCUSDT": 61000.0})
+    validator = CoinValidator(root, api, cache)
+    results = []
+    try:
+        assert validator.validate(3, "btc usdt", lambda *result: results.append(result)) is None
+        assert results == [(3, "BTCUSDT", True, 61000.0)]
+    finally:
+        validator.shutdown()
+
+
+def test_invalid_symbol_is_reported():
+    root, api = FakeRoot(), FakeAPI()
+    validator = CoinValidator(root, api, PriceCache())
+    results = []
+    try:
+        validator.validate(1, "NOPEUSDT", lambda *result: results.append(result))
+        root.run_next()
+        assert results == [(1, "NOPEUSDT", False, None)]
+    finally:
+        validator.shutdown()
@@ -0,0 +1,15 @@
+from dashboard import DashboardSnapshot
+
+
+def test_quote_columns_keep_dollar_prefix_in_other_reporting_currency():
+    data = {
+        "timestamp": 0,
+        "rows": [{"symbol": "ETHBTC", "wallet": "", "price": 0.05, "holdings": 2.0, "invested": 0.08,
+                  "break_even": 0.04, "balance": 150.0, "profit": 30.0}],
+        "totals": {"balance": 150.0, "invested": 120.0, "profit": 30.0, "deposited": 100.0, "net_value": -70.0},
+    }
+    table = DashboardSnapshot.render_table(data, "€")
+    assert "<td>$0.05</td>" in table  # Invested, break even and price are in the quote asset
+    assert "<td>$0.04</td>" in table
+    assert "<td>€150.00</td>" in table  # Balance and profit are converted
+    assert "Net value €-70.00" in table
@@ -0,0 +1,35 @@
+import logging
+
+from logging_setup import DedupFilter
+
+
+def make_record(name, message, *args, level=logging.WARNING):
+    return logging.LogRecord(name, level, __file__, 1, message, args, None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_dedup_keys_on_formatted_message():
+    clock = FakeClock()
+    dedup = DedupFilter(interval=60.0, clock=clock)
+    assert dedup.filter(make_record("api", "Error fetching price for %s", "AAAUSDT"))
+    assert dedup.filter(make_record("api", "Error fetching price for %s", "BBBUSDT"))
+    assert not dedup.filter(make_record("api", "Error fetching price for %s", "AAAUSDT"))
+    assert not dedup.filter(make_record("api", "Error fetching price for %s", "AAAUSDT"))
+
+    clock.now = 61.0
+    record = make_record("api", "Error fetching price for %s", "AAAUSDT")
+    assert dedup.filter(record)
+    assert record.repeated == 2
+
+
+def test_exempt_loggers_are_never_dropped():
+    dedup = DedupFilter(interval=60.0, clock=FakeClock(), exempt=("alerts.fired",))
+    for _ in range(3):
+        assert dedup.filter(make_record("alerts.fired", "ALERT %s: %s", "12:00:00", "BTCUSDT moved 5%"))
@@ -0,0 +1,29 @@
+import pytest
+
+from lots import AVERAGE, LotBook
+
+
+def test_seed_opens_hand_entered_position(tmp_path):
+    path = str(tmp_path / "lots.jsonl")
+    book = LotBook(path)
+    book.seed("BTCUSDT", 1.0, 30000.0)
+    ledger = book.record("BUY", "BTCUSDT", 0.1, 60000.0)
+    assert ledger.open_quantity == pytest.approx(1.1)
+    assert ledger.open_cost == pytest.approx(36000.0)
+
+    ledger = book.record("SELL", "BTCUSDT", 0.2, 70000.0)
+    assert ledger.realized == pytest.approx(0.2 * (70000.0 - 30000.0))  # FIFO sells the opening lot first
+
+    # Seeding again is a no-op once the ledger has trades, and the opening lot survives a replay
+    book.seed("BTCUSDT", 5.0, 1.0)
+    replayed = LotBook(path, AVERAGE).ledger("BTCUSDT")
+    assert replayed.open_quantity == pytest.approx(0.9)
+    assert replayed.trades == 3
+
+
+def test_seed_ignores_empty_rows(tmp_path):
+    book = LotBook(str(tmp_path / "lots.jsonl"))
+    assert book.seed("ETHUSDT", 0.0, 0.0) is None
+    assert book.positions() == {}
+    with pytest.raises(ValueError):
+        book.record("SELL", "ETHUSDT", 0.2, 2000.0)
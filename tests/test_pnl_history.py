@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from pnl_history import BucketSeries, PnLHistory
+
+
+def file_sizes(directory):
+    return {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+
+
+def test_flush_writes_each_bucket_once(tmp_path):
+    directory = str(tmp_path)
+    history = PnLHistory(directory, clock=lambda: 0.0)
+    timestamp = 0.0
+    for minute in range(120):
+        for second in range(0, 60, 10):
+            timestamp = minute * 60 + second
+            history.record("net_value", float(minute * 60 + second), timestamp)
+        history.flush()
+        # The still-open bucket is overwritten in place, so every file holds each bucket exactly once
+        for label, _, _ in PnLHistory.RESOLUTIONS:
+            buckets = len(history.series["net_value"][label].starts)
+            assert file_sizes(directory)[f"net_value@{label}.bin"] == buckets * BucketSeries.RECORD.size
+
+    reloaded = PnLHistory(directory, clock=lambda: timestamp)
+    for label, _, _ in PnLHistory.RESOLUTIONS:
+        original = history.series["net_value"][label]
+        copy = reloaded.series["net_value"][label]
+        assert list(copy.starts) == list(original.starts)
+        assert list(copy.closes) == list(original.closes)
+        assert list(copy.highs) == list(original.highs)
+
+
+def test_trimmed_series_is_compacted(tmp_path):
+    directory = str(tmp_path)
+    history = PnLHistory(directory, clock=lambda: 0.0)
+    history.RESOLUTIONS = (("1m", 60, 20),)
+    history.series = {}
+    for minute in range(100):
+        history.record("net_value", float(minute), minute * 60.0)
+        history.flush()
+    series = history.series["net_value"]["1m"]
+    assert len(series.starts) <= 22
+    path = os.path.join(directory, "net_value@1m.bin")
+    assert os.path.getsize(path) <= (len(series.starts) + 2) * BucketSeries.RECORD.size
+
+    reloaded = BucketSeries(60, 20)
+    with open(path, "rb") as file:
+        reloaded.load_bytes(file.read())
+    assert list(reloaded.starts) == list(series.starts)[-20:]
+    assert reloaded.closes[-1] == pytest.approx(99.0)
+
+
+def test_failed_flush_keeps_series_dirty(tmp_path):
+    directory = str(tmp_path / "history")
+    history = PnLHistory(directory, clock=lambda: 0.0)
+    history.record("net_value", 1.0, 0.0)
+    with open(directory, "w"):
+        pass  # A file where the directory should be, so the write fails
+    with pytest.raises(OSError):
+        history.flush()
+    assert history.dirty == {"net_value"}
+    assert history.series["net_value"]["1m"].written == 0
+
+    os.remove(directory)
+    history.flush()
+    assert not history.dirty
+    assert file_sizes(directory)["net_value@1m.bin"] == BucketSeries.RECORD.size
@@ -0,0 +1,51 @@
+import pytest
+
+from portfolio_io import _amount, import_positions
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("0.5000ETH", (0.5, "ETH")),
+    ("2EOS", (2.0, "EOS")),
+    ("1.5EGLD", (1.5, "EGLD")),
+    ("100EUR", (100.0, "EUR")),
+    ("1,234.5 USDT", (1234.5, "USDT")),
+    ("1e-3BTC", (0.001, "BTC")),
+    ("2E5", (200000.0, "")),
+])
+def test_amount_keeps_leading_e_with_asset(text, expected):
+    assert _amount(text) == expected
+
+
+def test_import_binance_fills_with_e_assets(tmp_path):
+    path = tmp_path / "trades.csv"
+    path.write_text(
+        "Date(UTC),Pair,Side,Price,Executed,Amount,Fee\n"
+        "2024-01-01 00:00:00,ETHUSDT,BUY,2000,0.5ETH,1000USDT,0.0005ETH\n"
+        "2024-01-01 00:01:00,ETHUSDT,BUY,2200,0.5ETH,1100USDT,1.1USDT\n"
+        "2024-01-01 00:02:00,EOSUSDT,BUY,0.5,2EOS,1USDT,0USDT\n"
+        "2024-01-01 00:03:00,EURUSDT,BUY,1.1,100EUR,110USDT,0USDT\n"
+        "2024-01-01 00:04:00,EGLDUSDT,BUY,40,1.5EGLD,60USDT,0USDT\n"
+        "2024-01-01 00:05:00,BTCUSDT,BUY,60000,0.1BTC,6000USDT,0USDT\n",
+        encoding="utf-8",
+    )
+    result = import_positions(str(path))
+    assert result.skipped == 0
+    assert set(result.positions) == {("ETHUSDT", ""), ("EOSUSDT", ""), ("EURUSDT", ""), ("EGLDUSDT", ""),
+                                     ("BTCUSDT", "")}
+    assert result.positions[("ETHUSDT", "")] == pytest.approx([2101.1, 0.9995])
+    assert result.positions[("EOSUSDT", "")] == pytest.approx([1.0, 2.0])
+    assert result.positions[("EURUSDT", "")] == pytest.approx([110.0, 100.0])
+    assert result.positions[("EGLDUSDT", "")] == pytest.approx([60.0, 1.5])
+
+
+def test_import_newest_first_export_in_time_order(tmp_path):
+    path = tmp_path / "trades.csv"
+    path.write_text(
+        "Date(UTC),Pair,Side,Price,Executed,Amount,Fee\n"
+        "2024-01-03 00:00:00,BTCUSDT,SELL,70000,0.1BTC,7000USDT,0USDT\n"
+        "2024-01-02 00:00:00,BTCUSDT,BUY,60000,0.1BTC,6000USDT,0USDT\n"
+        "2024-01-01 00:00:00,BTCUSDT,BUY,50000,0.2BTC,10000USDT,0USDT\n",
+        encoding="utf-8",
+    )
+    result = import_positions(str(path))
+    assert result.positions[("BTCUSDT", "")] == pytest.approx([16000 * 2 / 3, 0.2])
@@ -0,0 +1,40 @@
+from price_fetcher import PriceFetcher
+from price_sources import BinancePriceSource, FakePriceSource, PriceSourceEngine
+
+
+class FakeBinanceAPI:
+    def known_symbols(self):
+        return {"BTCUSDT", "ETHUSDT"}
+
+    def get_all_prices(self):
+        return {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0}
+
+
+def make_fetcher(sources):
+    api = FakeBinanceAPI()
+    engine = PriceSourceEngine([BinancePriceSource(api)] + sources)
+    return PriceFetcher(api, {}, None, None, None, price_engine=engine)
+
+
+def test_unlisted_symbol_is_cached_invalid_with_binance_only():
+    fetcher = make_fetcher([])
+    fetcher.record_symbol_health(["BTCUSDT", "NOTLISTED"], {"BTCUSDT": 60000.0})
+    assert fetcher.symbol_health.is_invalid("NOTLISTED")
+
+
+def test_unlisted_symbol_only_trips_breaker_with_extra_source():
+    fetcher = make_fetcher([FakePriceSource("extra", priority=1)])
+    fetcher.record_symbol_health(["BTCUSDT", "DEXONLY"], {"BTCUSDT": 60000.0})
+    assert not fetcher.symbol_health.is_invalid("DEXONLY")
+    assert fetcher.symbol_health.should_request("DEXONLY")  # One miss doesn't open the breaker
+    for _ in range(3):
+        fetcher.record_symbol_health(["DEXONLY"], {})
+    assert not fetcher.symbol_health.should_request("DEXONLY")
+    assert not fetcher.symbol_health.is_invalid("DEXONLY")
+
+
+def test_row_name_with_separator_is_priced():
+    fetcher = make_fetcher([])
+    formatted, raw = fetcher.worker.lookup_price("btc-usdt", {"BTCUSDT": 60000.0})
+    assert raw == 60000.0
+    assert formatted is not None
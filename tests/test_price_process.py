@@ -0,0 +1,26 @@
+from price_process import PriceEngineProcess
+from price_sources import FakePriceSource, PriceSourceEngine
+
+TICKER = {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0, "BNBUSDT": 500.0, "SOLBTC": 0.0025, "ADAETH": 0.0002}
+
+
+class BulkFakeSource(FakePriceSource):
+    """Answers with every price it has, like Binance's bulk ticker."""
+
+    def fetch_prices(self, symbols):
+        super().fetch_prices(symbols)
+        return dict(self.prices)
+
+
+def bulk_engine_factory(options):
+    # Module level so the spawned engine process can import it
+    return None, PriceSourceEngine([BulkFakeSource(prices=TICKER)])
+
+
+def test_process_fetch_returns_whole_bulk_ticker():
+    engine = PriceEngineProcess(factory=bulk_engine_factory)
+    try:
+        prices = engine.fetch(["SOLBTC"], deadline=engine.clock() + 30)
+        assert prices == TICKER  # Cross rates arrive even though only SOLBTC is a row
+    finally:
+        engine.shutdown()
@@ -0,0 +1,33 @@
+from price_fetcher_worker import PriceFetcherWorker
+from price_snapshot import SharedPriceSnapshot
+from price_sources import FakePriceSource, PriceSourceEngine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reader_skips_slots_the_writer_stopped_refreshing(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "prices.bin")
+    writer = SharedPriceSnapshot(path, capacity=16, stale_after=15.0, clock=clock)
+    reader = SharedPriceSnapshot(path, capacity=16, stale_after=15.0, clock=clock)
+    try:
+        assert writer.try_become_writer()
+        writer.publish({"BTCUSDT": 60000.0, "OLDUSDT": 1.0})
+        clock.now += 60
+        writer.publish({"BTCUSDT": 61000.0})  # OLDUSDT no longer refreshed
+        assert reader.read_prices() == {"BTCUSDT": 61000.0}
+
+        engine = PriceSourceEngine([FakePriceSource(prices={"OLDUSDT": 2.0})])
+        worker = PriceFetcherWorker(None, {}, None, None, price_engine=engine, price_snapshot=reader)
+        reader.try_become_writer = lambda: False  # The lock is held by the writer above
+        assert worker.fetch_shared_or_local(["BTCUSDT", "OLDUSDT"]) == {"BTCUSDT": 61000.0, "OLDUSDT": 2.0}
+        engine.shutdown()
+    finally:
+        reader.close()
+        writer.close()
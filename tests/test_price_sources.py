@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from price_sources import FakePriceSource, PriceSourceEngine, SourceHealth, SymbolHealthTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowFirstSource(FakePriceSource):
+    """Its first request stalls until released, later ones answer at once, like a stuck connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def fetch_prices(self, symbols):
+        if self.calls == 0:
+            self.calls += 1
+            self.release.wait(5)
+            return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+        return super().fetch_prices(symbols)
+
+
+def test_priority_prefers_lower_priority_value_even_when_slower():
+    primary = FakePriceSource("primary", {"BTCUSDT": 1.0}, priority=0, delay=0.2)
+    secondary = FakePriceSource("secondary", {"BTCUSDT": 2.0, "DEXUSDT": 3.0}, priority=1)
+    engine = PriceSourceEngine([secondary, primary])
+    try:
+        prices = engine.fetch(["BTCUSDT", "DEXUSDT"])
+        assert prices == {"BTCUSDT": 1.0, "DEXUSDT": 3.0}  # DEXUSDT filled in by the source that has it
+        assert engine.last_origin == {"BTCUSDT": "primary", "DEXUSDT": "secondary"}
+    finally:
+        engine.shutdown()
+
+
+def test_fastest_takes_first_answer():
+    slow = FakePriceSource("slow", {"BTCUSDT": 1.0}, priority=0, delay=1.0)
+    fast = FakePriceSource("fast", {"BTCUSDT": 2.0}, priority=1)
+    engine = PriceSourceEngine([slow, fast], strategy=PriceSourceEngine.FASTEST)
+    try:
+        started = time.monotonic()
+        assert engine.fetch(["BTCUSDT"]) == {"BTCUSDT": 2.0}
+        assert time.monotonic() - started < 0.5
+    finally:
+        engine.shutdown()
+
+
+def test_deadline_abandons_sources_still_pending():
+    slow = FakePriceSource("slow", {"BTCUSDT": 1.0}, priority=0, delay=1.0)
+    fast = FakePriceSource("fast", {"ETHUSDT": 2.0}, priority=1)
+    engine = PriceSourceEngine([slow, fast])
+    try:
+        started = time.monotonic()
+        assert engine.fetch(["BTCUSDT", "ETHUSDT"], deadline=started + 0.2) == {"ETHUSDT": 2.0}
+        assert time.monotonic() - started < 0.6
+        assert engine.health["slow"].failures == 1  # Missing the deadline counts as a timeout
+
+    finally:
+        engine.shutdown()
+
+    engine = PriceSourceEngine([slow])
+    try:
+        started = time.monotonic()
+        assert engine.fetch(["BTCUSDT"], deadline=started + 0.2) is None
+        assert time.monotonic() - started < 0.6
+    finally:
+        engine.shutdown()
+
+
+def test_hedged_request_answers_for_a_stalled_one():
+    source = SlowFirstSource("stalls", {"BTCUSDT": 1.0})
+    engine = PriceSourceEngine([source], hedge_after=0.1)
+    try:
+        started = time.monotonic()
+        assert engine.fetch(["BTCUSDT"]) == {"BTCUSDT": 1.0}
+        assert time.monotonic() - started < 1.0
+        assert source.calls == 2
+    finally:
+        source.release.set()
+        engine.shutdown()
+
+
+def test_failing_source_is_cooled_down_and_retried():
+    clock = FakeClock()
+    failing = FakePriceSource("failing", {"BTCUSDT": 1.0}, priority=0, fail=True)
+    backup = FakePriceSource("backup", {"BTCUSDT": 2.0}, priority=1)
+    engine = PriceSourceEngine([failing, backup], clock=clock)
+    try:
+        for _ in range(3):
+            assert engine.fetch(["BTCUSDT"]) == {"BTCUSDT": 2.0}
+        assert not engine.health["failing"].healthy
+        engine.fetch(["BTCUSDT"])
+        assert failing.calls == 3  # Cooling down, not asked
+
+        clock.now += 15
+        failing.fail = False
+        assert engine.fetch(["BTCUSDT"]) == {"BTCUSDT": 1.0}
+        assert engine.health["failing"].healthy
+    finally:
+        engine.shutdown()
+
+
+def test_source_health_cooldown_doubles():
+    health = SourceHealth(failure_threshold=3, base_cooldown=15.0, max_cooldown=40.0)
+    for _ in range(3):
+        health.record_failure("down", 0.0)
+    assert not health.is_available(14.9)
+    assert health.is_available(15.0)
+    health.record_failure("down", 15.0)
+    assert health.cooldown_until == pytest.approx(45.0)
+    health.record_failure("down", 45.0)
+    assert health.cooldown_until == pytest.approx(85.0)  # Capped at max_cooldown
+
+
+def test_symbol_breaker_opens_and_closes():
+    clock = FakeClock()
+    tracker = SymbolHealthTracker(clock=clock)
+    for _ in range(3):
+        tracker.record_failure("FLAKYUSDT")
+    assert not tracker.should_request("FLAKYUSDT")
+    assert tracker.status("FLAKYUSDT").startswith("No price")
+    clock.now += 15
+    assert tracker.should_request("FLAKYUSDT")
+    tracker.record_priced("FLAKYUSDT")
+    assert tracker.status("FLAKYUSDT") is None
+
+    tracker.record_invalid("GONEUSDT")
+    assert not tracker.should_request("GONEUSDT")
+    clock.now += 60
+    assert tracker.should_request("GONEUSDT")
@@ -0,0 +1,42 @@
+import pytest
+
+from currency_graph import CurrencyGraph
+from price_updater import PriceUpdater
+
+
+def make_updater(reporting_currency, graph):
+    entry_data = {"row_0_name": "BTCUSDT", "row_1_name": "SOLBTC", "row_2_name": "NEWCOINUSDT"}
+    return PriceUpdater(entry_data, None, None, currency_graph=graph, reporting_currency=reporting_currency)
+
+
+def make_graph():
+    graph = CurrencyGraph()
+    graph.add_pair("BTCUSDT", "BTC", "USDT")
+    graph.add_pair("SOLBTC", "SOL", "BTC")
+    graph.update_prices({"BTCUSDT": 60000.0, "SOLBTC": 0.0025})
+    graph.set_rate("USDT", "IDR", 16250.0)
+    return graph
+
+
+def test_unknown_pair_has_no_rate():
+    updater = make_updater("IDR", make_graph())
+    assert updater.get_conversion_rate(0) == pytest.approx(16250.0)
+    assert updater.get_conversion_rate(1) == pytest.approx(60000.0 * 16250.0)
+    assert updater.get_conversion_rate(2) is None  # Not in exchange info yet, never valued as IDR
+
+
+def test_deposit_is_converted_into_reporting_currency():
+    assert make_updater("IDR", make_graph()).to_reporting_currency(100.0) == pytest.approx(1_625_000.0)
+    assert make_updater("USDT", make_graph()).to_reporting_currency(100.0) == 100.0
+    assert make_updater("EUR", make_graph()).to_reporting_currency(100.0) is None  # No EUR rate yet
+
+
+def test_unknown_pair_keeps_working_in_its_own_quote():
+    updater = make_updater("USDT", CurrencyGraph())  # Exchange info not loaded yet
+    assert updater.get_conversion_rate(0) == 1.0
+    assert updater.get_conversion_rate(2) == 1.0  # e.g. priced only by an extra source
+
+    idr = make_updater("IDR", CurrencyGraph())
+    idr.entry_data["row_3_name"] = "BTCIDR"
+    assert idr.get_conversion_rate(3) == 1.0
+    assert idr.get_conversion_rate(0) is None
@@ -0,0 +1,19 @@
+from api import BinanceAPI
+from candles import CandleService, FakeKlineClient
+from risk import BENCHMARK, RiskWorker
+
+
+def test_model_backfills_symbols_without_candles():
+    clock = lambda: 1_700_000_000.0
+    client = FakeKlineClient(clock)
+    service = CandleService(BinanceAPI(None, None, client=client), clock=clock)
+    worker = RiskWorker(service, lambda text: None)
+
+    model = worker.build_model(sorted({"ETHUSDT", BENCHMARK}))
+    assert model is not None
+    assert model.symbols == ["BTCUSDT", "ETHUSDT"]
+    assert len(service.closes(BENCHMARK, "1d")[0]) == 366  # The startup lookback, both ends included
+
+    calls = client.calls
+    assert worker.build_model(sorted({"ETHUSDT", BENCHMARK})) is not None
+    assert client.calls == calls  # Already cached, nothing fetched
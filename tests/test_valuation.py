@@ -0,0 +1,30 @@
+import numpy as np
+
+from valuation import ValuationKernel, _scalar_valuation
+
+
+def test_kernel_matches_row_at_a_time_totals():
+    generator = np.random.default_rng(7)
+    prices = generator.uniform(0.01, 70000, 1000)
+    holdings = generator.uniform(0, 5, 1000)
+    invested = generator.uniform(0, 10000, 1000)
+    holdings[::7] = 0  # Empty rows don't count
+    prices[::11] = np.nan  # Nor do rows without a price
+    kernel = ValuationKernel(0)
+    kernel.load_arrays(prices, holdings, invested)
+    valuation = kernel.compute()
+    counted = (invested > 0) & (holdings > 0) & np.isfinite(prices)
+    assert (valuation.counted == counted).all()
+    assert valuation.total_profit == _scalar_valuation(prices[counted], holdings[counted], invested[counted])
+
+
+def test_missing_rate_leaves_row_out():
+    kernel = ValuationKernel(2)
+    kernel.set_position(0, 100.0, 2.0)
+    kernel.set_position(1, 100.0, 2.0)
+    kernel.set_price(0, 60.0)
+    kernel.set_price(1, 60.0)
+    kernel.set_rate(1, None)
+    valuation = kernel.compute()
+    assert valuation.counted.tolist() == [True, False]
+    assert valuation.total_profit == 20.0
@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+
+
+class Valuation:
+    """Result of one valuation pass: per-row arrays plus the portfolio totals."""
+
+    def __init__(self, break_even, balance, profit, counted, total_balance, total_invested, total_profit):
+        self.break_even = break_even
+        self.balance = balance
+        self.profit = profit
+        self.counted = counted  # Rows that take part in the totals
+        self.total_balance = total_balance
+        self.total_invested = total_invested
+        self.total_profit = total_profit
+
+
+class ValuationKernel:
+    """Keeps prices, holdings, invested amounts and conversion rates in NumPy arrays.
+
+    compute() values every position and the portfolio totals in one vectorized pass, using the same
+    per-row formulas as PriceUpdater.calculate_values so results match the scalar code exactly.
+    Unknown prices and rates are stored as NaN and keep a row out of the totals.
+    """
+
+    def __init__(self, size=30):
+        self.prices = np.full(size, np.nan)
+        self.holdings = np.zeros(size)
+        self.invested = np.zeros(size)
+        self.rates = np.ones(size)
+        self._position_source = [None] * size  # Raw entry values the floats were parsed from
+
+    @property
+    def size(self):
+        return self.prices.shape[0]
+
+    def resize(self, size):
+        if size == self.size:
+            return
+        count = min(size, self.size)
+        for name, fill in (("prices", np.nan), ("holdings", 0.0), ("invested", 0.0), ("rates", 1.0)):
+            array = np.full(size, fill)
+            array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self._position_source = (self._position_source + [None] * size)[:size]
+
+    def set_price(self, row, price):
+        self.prices[row] = np.nan if price is None else price
+
+    def set_rate(self, row, rate):
+        self.rates[row] = np.nan if rate is None else rate
+
+    def set_position(self, row, invested, holdings):
+        self.invested[row] = invested
+        self.holdings[row] = holdings
+
+    def sync_position(self, row, raw_invested, raw_holdings, parse):
+        """Re-parse a row's entry strings only when they changed since the last sync."""
+        source = (raw_invested, raw_holdings)
+        if self._position_source[row] == source:
+            return
+        self._position_source[row] = source
+        self.set_position(row, parse(raw_invested), parse(raw_holdings))
+
+    def load_arrays(self, prices, holdings, invested, rates=None):
+        self.prices = np.asarray(prices, dtype=float).copy()
+        self.holdings = np.asarray(holdings, dtype=float).copy()
+        self.invested = np.asarray(invested, dtype=float).copy()
+        self.rates = np.ones(self.prices.shape[0]) if rates is None else np.asarray(rates, dtype=float).copy()
+        self._position_source = [None] * self.prices.shape[0]
+
+    def compute(self):
+        holdings, invested, rates = self.holdings, self.invested, self.rates
+        with np.errstate(divide="ignore", invalid="ignore"):
+            break_even = np.where(holdings != 0, invested / np.where(holdings != 0, holdings, 1.0), 0.0)
+        balance = self.prices * holdings * rates
+        profit = balance - invested * rates
+        counted = (invested > 0) & (holdings > 0) & np.isfinite(profit)
+        return Valuation(
+            break_even, balance, profit, counted,
+            self._ordered_sum(balance[counted]),
+            self._ordered_sum((invested * rates)[counted]),
+            self._ordered_sum(profit[counted]),
+        )
+
+    @staticmethod
+    def _ordered_sum(values):
+        # cumsum adds strictly left to right, so the total matches a Python loop bit for bit
+        # (np.sum uses pairwise summation, which rounds differently)
+        return float(np.cumsum(values)[-1]) if values.shape[0] else 0.0
+
+
+def _scalar_valuation(prices, holdings, invested):
+    """The row-at-a-time math PriceUpdater used before the kernel, kept for benchmarking."""
+    total_profit = 0.0
+    for price, amount, cost in zip(prices, holdings, invested):
+        balance = price * amount
+        profit = balance - cost
+        if cost > 0 and amount > 0:
+            total_profit += profit
+    return total_profit
+
+
+def benchmark(sizes=(1_000, 10_000, 50_000, 100_000), repeat=5):
+    """Time the kernel against the scalar loop and report the per-position cost at each size."""
+    generator = np.random.default_rng(7)
+    print(f"{'positions':>10} {'scalar ms':>10} {'kernel ms':>10} {'ns/position':>12} {'same total':>11}")
+    for size in sizes:
+        prices = generator.uniform(0.0001, 70_000, size)
+        holdings = generator.uniform(0, 50, size)
+        invested = generator.uniform(0, 100_000, size)
+        kernel = ValuationKernel(size)
+        kernel.load_arrays(prices, holdings, invested)
+        price_list, holding_list, invested_list = prices.tolist(), holdings.tolist(), invested.tolist()
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scalar_total = _scalar_valuation(price_list, holding_list, invested_list)
+        scalar_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            valuation = kernel.compute()
+        kernel_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        print(f"{size:>10} {scalar_ms:>10.2f} {kernel_ms:>10.3f} {kernel_ms * 1e6 / size:>12.1f} "
+              f"{str(valuation.total_profit == scalar_total):>11}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,122 @@
+import threading
+import tkinter as tk
+
+from classes import UIHelper
+from number_format import format_money
+
+UNASSIGNED = "UNASSIGNED"
+
+
+class WalletAggregates:
+    """Balance, invested and profit totals per wallet, maintained row by row.
+
+    Each row's last contribution is remembered, so a changed price or wallet assignment subtracts the
+    old contribution and adds the new one: O(1) per changed row, whatever the number of rows or
+    wallets. Reading a wallet's share of the portfolio is a single division.
+    """
+
+    def __init__(self):
+        self.rows = {}  # row -> (wallet, balance, invested, profit)
+        self.wallets = {}  # wallet -> [balance, invested, profit, row count]
+        self.total_balance = 0.0
+        self.lock = threading.Lock()
+
+    def update_row(self, row, wallet, balance, invested, profit):
+        wallet = (wallet or "").strip().upper() or UNASSIGNED
+        contribution = (wallet, balance, invested, profit)
+        with self.lock:
+            previous = self.rows.get(row)
+            if previous == contribution:
+                return
+            if previous is not None:
+                self._apply(previous, -1)
+            self.rows[row] = contribution
+            self._apply(contribution, 1)
+
+    def remove_row(self, row):
+        with self.lock:
+            previous = self.rows.pop(row, None)
+            if previous is not None:
+                self._apply(previous, -1)
+
+    def _apply(self, contribution, sign):
+        wallet, balance, invested, profit = contribution
+        totals = self.wallets.setdefault(wallet, [0.0, 0.0, 0.0, 0])
+        totals[3] += sign
+        if totals[3] == 0:
+            del self.wallets[wallet]
+        else:
+            totals[0] += sign * balance
+            totals[1] += sign * invested
+            totals[2] += sign * profit
+        # Reset once no rows are left so rounding error can't build up across a session
+        self.total_balance = self.total_balance + sign * balance if self.rows else 0.0
+
+    def wallet(self, name):
+        """(balance, invested, profit, share of total balance) for one wallet."""
+        with self.lock:
+            balance, invested, profit, _ = self.wallets.get(name, (0.0, 0.0, 0.0, 0))
+            share = balance / self.total_balance if self.total_balance else 0.0
+        return balance, invested, profit, share
+
+    def breakdown(self):
+        """[(wallet, balance, invested, profit, share)] sorted by balance, largest first."""
+        with self.lock:
+            total = self.total_balance
+            rows = [(name, balance, invested, profit, balance / total if total else 0.0)
+                    for name, (balance, invested, profit, _) in self.wallets.items()]
+        return sorted(rows, key=lambda item: item[1], reverse=True)
+
+
+class WalletBreakdownPanel:
+    """Overlay listing each wallet's balance, invested, profit and share, toggled from the dashboard."""
+
+    HEADERS = ("WALLET", "BALANCE", "INVESTED", "PROFIT", "SHARE")
+
+    def __init__(self, root, wallet_aggregates, wallet_colors, currency_prefix="$", width=900):
+        self.root = root
+        self.wallet_aggregates = wallet_aggregates
+        self.wallet_colors = wallet_colors
+        self.currency_prefix = currency_prefix
+        self.width = width
+        self.visible = False
+        self.frame = tk.Frame(root, bg="black", bd=2, relief="solid")
+        self.labels = []
+
+    def toggle(self, event=None):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        self.visible = True
+        self.refresh()
+        self.frame.place(relx=0.5, rely=0.5, anchor="center", width=self.width)
+        self.frame.lift()
+
+    def hide(self):
+        self.visible = False
+        self.frame.place_forget()
+
+    def refresh(self):
+        """Redraw from the current aggregates; does nothing while hidden."""
+        if not self.visible:
+            return
+        for label in self.labels:
+            label.destroy()
+        self.labels = []
+        rows = [self.HEADERS]
+        for name, balance, invested, profit, share in self.wallet_aggregates.breakdown():
+            rows.append((name, format_money(balance, self.currency_prefix),
+                         format_money(invested, self.currency_prefix),
+                         format_money(profit, self.currency_prefix), f"{share * 100:.1f}%"))
+        for row, values in enumerate(rows):
+            bg_color = "purple" if row == 0 else self.wallet_colors.get(values[0], "lightgrey")
+            for col, text in enumerate(values):
+                label = tk.Label(self.frame, text=text, bg=bg_color, font=("Arial", 18, "bold"), anchor="center")
+                UIHelper.adjust_font_color(label, bg_color)
+                label.grid(row=row, column=col, sticky="nsew")
+                self.labels.append(label)
+        for col in range(len(self.HEADERS)):
+            self.frame.grid_columnconfigure(col, weight=1)